@@ -0,0 +1,340 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Balance Tuner Module
+
+This module searches for class and enemy stats that hit target win rates.
+A candidate is a set of stat overrides such as {"Warrior.health": 130,
+"orc.strength": 10}; everything it doesn't mention keeps the value from
+character_manager.CLASS_BASE_STATS or data/enemies.txt.
+
+Each candidate is scored by simulating battles for every class and level
+against the enemy of each level band, and comparing the win rates with the
+band's target. Candidates are spread across worker processes. Every
+candidate is first screened with a few battles; only the best fraction is
+simulated in full, so hopeless parts of the search are dropped early.
+
+Battle randomness is seeded by matchup, not by candidate, so two candidates
+are always compared on the same dice rolls.
+"""
+
+import itertools
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import battle_simulator
+import character_manager
+import combat_system
+
+# ============================================================================
+# TUNING SETTINGS
+# ============================================================================
+
+# (levels, enemy, target win rate) for each level band, with the enemies
+# combat_system.get_random_enemy_for_level picks for those levels
+DEFAULT_TARGETS = (
+    (range(1, 3), "goblin", 0.9),
+    (range(3, 6), "orc", 0.75),
+    (range(6, 11), "dragon", 0.6)
+)
+
+# Stats a candidate may change
+TUNABLE_STATS = ("health", "strength", "magic")
+
+# Share of screened candidates that are simulated in full
+DEFAULT_KEEP_FRACTION = 0.25
+
+# ============================================================================
+# CANDIDATES
+# ============================================================================
+
+def grid_candidates(space):
+    """
+    Every combination of the values in a search space
+
+    Args:
+        space: Dictionary {parameter: sequence of values}, where a parameter
+               is "<class or enemy id>.<stat>", e.g. "Warrior.health"
+
+    Returns: List of candidate dictionaries {parameter: value}
+    """
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def random_candidates(space, count, seed=0):
+    """
+    A random sample of distinct candidates from a search space
+
+    Returns: List of up to count candidate dictionaries (fewer if the space
+             is smaller than count)
+    """
+    rng = random.Random(seed)
+    names = list(space)
+    size = math.prod(len(space[name]) for name in names)
+    if count >= size:
+        return grid_candidates(space)
+
+    seen = set()
+    candidates = []
+    while len(candidates) < count:
+        values = tuple(rng.choice(space[name]) for name in names)
+        if values not in seen:
+            seen.add(values)
+            candidates.append(dict(zip(names, values)))
+    return candidates
+
+
+def parse_parameter(parameter):
+    """
+    Split a parameter name into what it applies to and the stat
+
+    Returns: Tuple (class name or enemy id, stat)
+    Raises: ValueError if the parameter is malformed or names an unknown
+            class, enemy or stat
+    """
+    owner, _, stat = parameter.partition(".")
+    if stat not in TUNABLE_STATS:
+        raise ValueError(f"Parameter '{parameter}' must be '<class or enemy>.<{'|'.join(TUNABLE_STATS)}>'")
+    if owner not in character_manager.CLASS_BASE_STATS and owner not in combat_system.get_enemy_registry():
+        raise ValueError(f"Parameter '{parameter}' names an unknown class or enemy")
+    return owner, stat
+
+# ============================================================================
+# SCORING
+# ============================================================================
+
+def score_candidate(candidate, battles, targets=DEFAULT_TARGETS, seed=0,
+                    special_chance=battle_simulator.DEFAULT_SPECIAL_CHANCE,
+                    class_stats=None, enemy_stats=None):
+    """
+    Simulate a candidate's battles and measure how far it is from the targets
+
+    Args:
+        candidate: Dictionary {parameter: value}
+        battles: Battles per (class, level) in each band
+        targets: (levels, enemy, target win rate) per level band
+        seed: Base seed for the battle dice
+        special_chance: Chance of using the special ability each turn
+        class_stats: Base class stats (CLASS_BASE_STATS if None)
+        enemy_stats: Base enemy stats {enemy_id: enemy dict} (the enemy
+                     registry if None)
+
+    Returns: Dictionary with 'params' (the candidate), 'score' (mean squared
+             difference between win rate and target over every class and
+             band; lower is better) and 'win_rates' {(class, enemy): rate}
+    """
+    class_stats, enemy_stats = _apply_candidate(candidate, class_stats, enemy_stats)
+    gains = character_manager.LEVEL_UP_GAINS
+
+    win_rates = {}
+    squared_error = 0.0
+    for character_class, stats in class_stats.items():
+        for levels, enemy_type, target in targets:
+            enemy = enemy_stats[enemy_type]
+            wins = 0
+            for level in levels:
+                ups = level - 1
+                health = stats["health"] + gains["max_health"] * ups
+                character = {
+                    "name": f"Tune{character_class}",
+                    "class": character_class,
+                    "health": health,
+                    "max_health": health,
+                    "strength": stats["strength"] + gains["strength"] * ups,
+                    "magic": stats["magic"] + gains["magic"] * ups
+                }
+                rng = random.Random(f"{seed}:{character_class}:{level}:{enemy_type}")
+                outcomes = battle_simulator.fight_battles(character, enemy, battles, rng, special_chance)[0]
+                wins += outcomes["player"]
+
+            win_rate = wins / (battles * len(levels)) if battles and levels else 0.0
+            win_rates[(character_class, enemy_type)] = win_rate
+            squared_error += (win_rate - target) ** 2
+
+    return {
+        "params": candidate,
+        "score": squared_error / len(win_rates) if win_rates else 0.0,
+        "win_rates": win_rates
+    }
+
+
+def _apply_candidate(candidate, class_stats=None, enemy_stats=None):
+    """Copies of the base class and enemy stats with the candidate's overrides"""
+    if class_stats is None:
+        class_stats = character_manager.CLASS_BASE_STATS
+    if enemy_stats is None:
+        enemy_stats = _registry_stats()
+
+    class_stats = {name: dict(stats) for name, stats in class_stats.items()}
+    enemy_stats = {name: dict(stats) for name, stats in enemy_stats.items()}
+    for parameter, value in candidate.items():
+        owner, stat = parse_parameter(parameter)
+        if owner in class_stats:
+            class_stats[owner][stat] = value
+        else:
+            enemy_stats[owner][stat] = value
+            if stat == "health":
+                enemy_stats[owner]["max_health"] = value
+    return class_stats, enemy_stats
+
+
+def _registry_stats():
+    """The enemy registry as plain dictionaries (read-only ones can't be pickled)"""
+    return {enemy_id: dict(prototype) for enemy_id, prototype in combat_system.get_enemy_registry().items()}
+
+# ============================================================================
+# SEARCH
+# ============================================================================
+
+def tune(space, battles=200, targets=DEFAULT_TARGETS, samples=None, seed=0,
+         special_chance=battle_simulator.DEFAULT_SPECIAL_CHANCE, screening_battles=None,
+         keep_fraction=DEFAULT_KEEP_FRACTION, top=5, max_workers=None):
+    """
+    Search a stat space for the candidates closest to the target win rates
+
+    Every candidate is screened with screening_battles battles per
+    (class, level); the best keep_fraction of them (at least top) are then
+    scored again with the full number of battles.
+
+    Args:
+        space: Dictionary {parameter: sequence of values} (see grid_candidates)
+        battles: Battles per (class, level) for the full scoring
+        targets: (levels, enemy, target win rate) per level band
+        samples: Candidates to sample at random (the whole grid if None)
+        seed: Seed for the sample and the battle dice
+        special_chance: Chance of using the special ability each turn
+        screening_battles: Battles per (class, level) when screening
+                           (an eighth of battles, at least 10, if None)
+        keep_fraction: Share of screened candidates scored in full
+        top: Number of best candidates to return
+        max_workers: Worker processes (os.cpu_count() if None; 1 runs in
+                     this process without a pool)
+
+    Returns: Dictionary with 'best' (up to top scored candidates, best
+             first), 'sensitivity' (see sensitivity_report), 'screened' and
+             'pruned' (candidate counts)
+    Raises: ValueError if a parameter is invalid
+    """
+    for parameter in space:
+        parse_parameter(parameter)
+
+    if samples is None:
+        candidates = grid_candidates(space)
+    else:
+        candidates = random_candidates(space, samples, seed)
+    if screening_battles is None:
+        screening_battles = max(10, battles // 8)
+
+    class_stats = character_manager.CLASS_BASE_STATS
+    enemy_stats = _registry_stats()
+    common = (targets, seed, special_chance, class_stats, enemy_stats)
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=max_workers) if max_workers > 1 and len(candidates) > 1 else None
+    try:
+        screened = _score_all(executor, max_workers, candidates, screening_battles, common)
+        screened.sort(key=lambda result: result["score"])
+
+        kept = max(top, math.ceil(len(screened) * keep_fraction))
+        finalists = [result["params"] for result in screened[:kept]]
+        scored = _score_all(executor, max_workers, finalists, battles, common)
+        scored.sort(key=lambda result: result["score"])
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return {
+        "best": scored[:top],
+        "sensitivity": sensitivity_report(screened, space),
+        "screened": len(screened),
+        "pruned": len(screened) - len(finalists)
+    }
+
+
+def _score_all(executor, max_workers, candidates, battles, common):
+    """Score candidates in the pool (or in this process if there is none)"""
+    tasks = [(candidate, battles) + common for candidate in candidates]
+    if executor is None:
+        return [_score_task(task) for task in tasks]
+
+    # Several candidates per task keeps the inter-process overhead small
+    chunksize = max(1, len(tasks) // (max_workers * 4))
+    return list(executor.map(_score_task, tasks, chunksize=chunksize))
+
+
+def _score_task(task):
+    """Worker entry point (must be a module-level function to be pickled)"""
+    return score_candidate(*task)
+
+# ============================================================================
+# REPORTING
+# ============================================================================
+
+def sensitivity_report(results, space):
+    """
+    How much each parameter moves the score
+
+    For every value of a parameter, the mean score of the candidates that
+    use it; the spread between the best and worst of those means shows how
+    sensitive the balance is to that parameter.
+
+    Args:
+        results: Scored candidates (see score_candidate)
+        space: The search space they came from
+
+    Returns: List of dictionaries with 'parameter', 'spread', 'best_value'
+             and 'mean_scores' {value: mean score}, most sensitive first
+    """
+    report = []
+    for parameter, values in space.items():
+        totals = {value: [0.0, 0] for value in values}
+        for result in results:
+            bucket = totals[result["params"][parameter]]
+            bucket[0] += result["score"]
+            bucket[1] += 1
+
+        mean_scores = {value: total / count for value, (total, count) in totals.items() if count}
+        if not mean_scores:
+            continue
+        report.append({
+            "parameter": parameter,
+            "spread": max(mean_scores.values()) - min(mean_scores.values()),
+            "best_value": min(mean_scores, key=mean_scores.get),
+            "mean_scores": mean_scores
+        })
+
+    report.sort(key=lambda row: row["spread"], reverse=True)
+    return report
+
+
+# ============================================================================
+# TESTING
+# ============================================================================
+
+if __name__ == "__main__":
+    import time
+
+    print("=== BALANCE TUNER TEST ===")
+
+    space = {
+        "Mage.health": [70, 80, 90, 100],
+        "Rogue.strength": [11, 12, 14, 16],
+        "orc.strength": [9, 10, 12, 14],
+        "dragon.health": [160, 200, 240]
+    }
+
+    start = time.perf_counter()
+    tuning = tune(space, battles=200)
+    elapsed = time.perf_counter() - start
+    print(f"Screened {tuning['screened']} candidates, pruned {tuning['pruned']}, in {elapsed:.2f}s")
+
+    print("\nBest candidates:")
+    for result in tuning["best"]:
+        print(f"  score {result['score']:.4f}: {result['params']}")
+
+    print("\nSensitivity:")
+    for row in tuning["sensitivity"]:
+        print(f"  {row['parameter']:16} spread {row['spread']:.4f}, best value {row['best_value']}")
@@ -0,0 +1,186 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Batch Combat Module
+
+This module resolves many battles at once. N battles are stored as arrays of
+player and enemy stats, and every turn applies combat_system.attack_damage's
+formula (strength - defender_strength // 4, minimum 1) to all battles that
+are still going. With basic attacks only, the results are exactly those of
+SimpleBattle.run with an AttackPolicy.
+
+Requires NumPy.
+"""
+
+import numpy as np
+
+from combat_system import MAX_TURNS
+from custom_exceptions import CharacterDeadError
+
+# ============================================================================
+# RESULT CODES
+# ============================================================================
+
+# Winner codes in the 'winner' array
+WINNER_NONE = 0
+WINNER_PLAYER = 1
+WINNER_ENEMY = 2
+
+# Matching SimpleBattle result names, indexed by code
+WINNER_NAMES = ("none", "player", "enemy")
+
+# ============================================================================
+# BATCH RESOLVER
+# ============================================================================
+
+def resolve_battles(player_health, player_strength, enemy_health, enemy_strength, max_turns=MAX_TURNS):
+    """
+    Fight N attack-only battles at once
+
+    Each round the player attacks and, if the enemy survives, the enemy
+    attacks back. Finished battles drop out of the working arrays once they
+    outnumber the ones still going, so later turns stay cheap.
+
+    Args:
+        player_health, player_strength: Arrays (or sequences) of length N
+        enemy_health, enemy_strength: Arrays (or sequences) of length N
+        max_turns: Rounds before a battle is called a draw
+
+    Returns: Dictionary of length-N arrays: 'winner' (WINNER_* codes),
+             'turns', 'player_health' and 'enemy_health' (health left)
+    Raises: CharacterDeadError if any player starts with no health
+    """
+    player_health = np.array(player_health, dtype=np.int64)
+    enemy_health = np.array(enemy_health, dtype=np.int64)
+    player_strength = np.asarray(player_strength, dtype=np.int64)
+    enemy_strength = np.asarray(enemy_strength, dtype=np.int64)
+
+    if (player_health <= 0).any():
+        raise CharacterDeadError("Character is already dead, cannot start battle.")
+
+    n = len(player_health)
+
+    # attack_damage for both sides; it doesn't change during a battle
+    player_damage = np.maximum(player_strength - enemy_strength // 4, 1)
+    enemy_damage = np.maximum(enemy_strength - player_strength // 4, 1)
+
+    # The loop only has to find the turn each battle ends on; winner and
+    # health left follow from it. rows maps the working arrays back to the
+    # battles they came from. int32 halves the memory traffic when health
+    # can't overflow it.
+    dtype = np.int32
+    if n and int(player_health.max()) + int(enemy_damage.max()) * max_turns >= 2 ** 31:
+        dtype = np.int64
+    if n and int(enemy_health.max()) + int(player_damage.max()) * max_turns >= 2 ** 31:
+        dtype = np.int64
+
+    finished_on = np.zeros(n, dtype=np.int64)
+    rows = np.arange(n)
+    p_health = player_health.astype(dtype)
+    e_health = enemy_health.astype(dtype)
+    p_damage = player_damage.astype(dtype)
+    e_damage = enemy_damage.astype(dtype)
+    survived = np.zeros(n, dtype=dtype)
+    finished = np.zeros(n, dtype=bool)
+    live = n
+
+    # Finished battles keep being stepped (health only goes down, so they
+    # stay finished) until more than half the rows are finished; then they
+    # are dropped. That keeps fancy indexing out of most turns.
+    turn = 0
+    while live and turn < max_turns:
+        turn += 1
+        e_health -= p_damage
+        p_health -= e_damage
+        np.less_equal(e_health, 0, out=finished)
+        finished |= p_health <= 0
+        survived += ~finished
+
+        live = len(rows) - int(np.count_nonzero(finished))
+        if live * 2 < len(rows):
+            finished_on[rows[finished]] = survived[finished] + 1
+            going = ~finished
+            rows = rows[going]
+            p_health = p_health[going]
+            e_health = e_health[going]
+            p_damage = p_damage[going]
+            e_damage = e_damage[going]
+            survived = survived[going]
+            finished = finished[going]
+
+    # Rows still in the working arrays: finished ones that weren't dropped
+    finished_on[rows[finished]] = survived[finished] + 1
+
+    # Player strikes first, so the enemy is dead whenever its health ran out;
+    # in that case the enemy never got its last attack in
+    done = finished_on > 0
+    turns = np.where(done, finished_on, max_turns)
+    enemy_health -= player_damage * turns
+    won = done & (enemy_health <= 0)
+    player_health -= enemy_damage * (turns - won)
+
+    winner = np.full(n, WINNER_NONE, dtype=np.int8)
+    winner[done] = WINNER_ENEMY
+    winner[won] = WINNER_PLAYER
+
+    # apply_damage never goes below zero
+    np.maximum(player_health, 0, out=player_health)
+    np.maximum(enemy_health, 0, out=enemy_health)
+
+    return {
+        "winner": winner,
+        "turns": turns,
+        "player_health": player_health,
+        "enemy_health": enemy_health
+    }
+
+
+def resolve_character_battles(characters, enemies, max_turns=MAX_TURNS):
+    """
+    Fight characters[i] against enemies[i] for every i, attack-only
+
+    Neither list is modified.
+
+    Returns: Same dictionary of arrays as resolve_battles
+    """
+    return resolve_battles(
+        [c["health"] for c in characters],
+        [c["strength"] for c in characters],
+        [e["health"] for e in enemies],
+        [e["strength"] for e in enemies],
+        max_turns
+    )
+
+
+# ============================================================================
+# TESTING
+# ============================================================================
+
+if __name__ == "__main__":
+    import time
+
+    import combat_system
+
+    print("=== BATCH COMBAT TEST ===")
+
+    rng = np.random.default_rng(0)
+    n = 1_000_000
+    stats = (
+        rng.integers(80, 300, size=n), rng.integers(8, 40, size=n),
+        rng.integers(30, 250, size=n), rng.integers(5, 30, size=n)
+    )
+
+    start = time.perf_counter()
+    result = resolve_battles(*stats)
+    batch_rate = n / (time.perf_counter() - start)
+    print(f"Batch: {n:,} battles at {batch_rate:,.0f}/s")
+    print(f"Player win rate: {(result['winner'] == WINNER_PLAYER).mean():.1%}")
+
+    m = 100_000
+    policy = combat_system.AttackPolicy()
+    start = time.perf_counter()
+    for i in range(m):
+        player = {"name": "Hero", "health": int(stats[0][i]), "strength": int(stats[1][i])}
+        enemy = {"name": "Enemy", "health": int(stats[2][i]), "strength": int(stats[3][i])}
+        combat_system.SimpleBattle(player, enemy).run(policy)
+    loop_rate = m / (time.perf_counter() - start)
+    print(f"Python loop: {loop_rate:,.0f}/s ({batch_rate / loop_rate:.0f}x slower)")
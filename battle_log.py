@@ -0,0 +1,183 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Battle Log Module
+
+This module keeps a fixed-size record of what happened in a battle. Events
+are stored as (turn, actor, action, value) tuples in a ring buffer, and
+messages are only formatted when the log is read or echoed, so a battle
+nobody watches never builds a string.
+"""
+
+import sys
+from collections import deque
+
+# ============================================================================
+# EVENT CODES
+# ============================================================================
+
+# Who acted
+ACTOR_PLAYER = 0
+ACTOR_ENEMY = 1
+
+# What happened (and what the value holds)
+EVENT_APPEAR = 0          # battle started; no value
+EVENT_ATTACK = 1          # basic attack; damage dealt
+EVENT_SPECIAL = 2         # special ability; the ability's message
+EVENT_ESCAPE = 3          # ran away; no value
+EVENT_ESCAPE_FAILED = 4   # tried to run away; no value
+EVENT_VICTORY = 5         # actor won the battle; no value
+EVENT_DRAW = 6            # turn limit reached; no value
+EVENT_STATUS_DAMAGE = 7   # status effect hurt the actor; (effect, damage)
+EVENT_STATUS_HEAL = 8     # status effect healed the actor; (effect, health)
+EVENT_ITEM = 9            # used an item; the item's message
+
+# How much a log records
+LOG_OFF = 0       # nothing
+LOG_RESULTS = 1   # battle start and end
+LOG_TURNS = 2     # every action
+
+# Events kept before the oldest are overwritten
+DEFAULT_CAPACITY = 64
+
+# Message for each (actor, action); {player}, {enemy} and {value} are filled in
+_TEMPLATES = {
+    (ACTOR_ENEMY, EVENT_APPEAR): "A wild {enemy} appears!",
+    (ACTOR_PLAYER, EVENT_ATTACK): "{player} attacks for {value} damage.",
+    (ACTOR_ENEMY, EVENT_ATTACK): "The {enemy} attacks you for {value} damage!",
+    (ACTOR_PLAYER, EVENT_SPECIAL): "{value}",
+    (ACTOR_PLAYER, EVENT_ITEM): "{value}",
+    (ACTOR_PLAYER, EVENT_ESCAPE): "You successfully ran away!",
+    (ACTOR_PLAYER, EVENT_ESCAPE_FAILED): "You were not strong enough to escape!",
+    (ACTOR_PLAYER, EVENT_VICTORY): "The {enemy} has been defeated!",
+    (ACTOR_ENEMY, EVENT_VICTORY): "You have been defeated...",
+    (ACTOR_PLAYER, EVENT_DRAW): "The battle drags on with no winner.",
+    (ACTOR_PLAYER, EVENT_STATUS_DAMAGE): "{player} takes {value[1]} {value[0]} damage.",
+    (ACTOR_ENEMY, EVENT_STATUS_DAMAGE): "The {enemy} takes {value[1]} {value[0]} damage.",
+    (ACTOR_PLAYER, EVENT_STATUS_HEAL): "{player} regains {value[1]} health from {value[0]}.",
+    (ACTOR_ENEMY, EVENT_STATUS_HEAL): "The {enemy} regains {value[1]} health from {value[0]}."
+}
+
+# ============================================================================
+# BATTLE LOG
+# ============================================================================
+
+class BattleLog:
+    """
+    Ring buffer of battle events
+
+    Only the last capacity events are kept (a deque with a maxlen). A battle
+    records into the log only what its verbosity asks for; echo (if set) is
+    called with each message as it is recorded, for battles someone is
+    watching.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, verbosity=LOG_TURNS, echo=None, dump_on_error=0):
+        """
+        Args:
+            capacity: Number of events kept
+            verbosity: LOG_OFF, LOG_RESULTS or LOG_TURNS
+            echo: Called with each message as it is recorded (None = silent)
+            dump_on_error: Events written to stderr if a battle using this
+                           log raises an exception (0 = none)
+        """
+        if capacity < 1:
+            raise ValueError("Battle log capacity must be at least 1")
+        self.capacity = capacity
+        self.verbosity = verbosity
+        self.echo = echo
+        self.dump_on_error = dump_on_error
+
+        self.player_name = ""
+        self.enemy_name = ""
+
+        self._events = deque(maxlen=capacity)
+
+    def __len__(self):
+        """Number of events kept"""
+        return len(self._events)
+
+    def __iter__(self):
+        """Kept events, oldest first"""
+        return iter(self.events())
+
+    def begin(self, player_name, enemy_name):
+        """Set the names messages are rendered with"""
+        self.player_name = player_name
+        self.enemy_name = enemy_name
+
+    def record(self, turn, actor, action, value=None):
+        """
+        Add one event, overwriting the oldest if the log is full
+
+        Args:
+            turn: Battle turn the event happened on
+            actor: ACTOR_PLAYER or ACTOR_ENEMY
+            action: One of the EVENT_* codes
+            value: Event detail (see the EVENT_* codes)
+        """
+        self._record_event((turn, actor, action, value))
+
+    def recorder(self):
+        """
+        Get a fast way to record events
+
+        Battles fetch this once and call it every turn. Without an echo it is
+        the ring buffer's own append, so recording costs no Python call.
+
+        Returns: Callable taking one (turn, actor, action, value) tuple
+        """
+        if self.echo is None:
+            return self._events.append
+        return self._record_event
+
+    def _record_event(self, event):
+        self._events.append(event)
+        if self.echo is not None:
+            self.echo(self.render(event))
+
+    def events(self, last=None):
+        """
+        Kept events, oldest first
+
+        Args:
+            last: Only the most recent this many (all kept events if None)
+
+        Returns: List of (turn, actor, action, value) tuples
+        """
+        events = list(self._events)
+        if last is not None:
+            events = events[len(events) - min(last, len(events)):]
+        return events
+
+    def render(self, event):
+        """Format one event as a message"""
+        turn, actor, action, value = event
+        template = _TEMPLATES.get((actor, action))
+        if template is None:
+            return f"Event {action} by actor {actor}: {value}"
+        return template.format(player=self.player_name, enemy=self.enemy_name, value=value)
+
+    def messages(self, last=None):
+        """
+        Kept events as messages, oldest first
+
+        Returns: List of strings
+        """
+        return [self.render(event) for event in self.events(last)]
+
+    def dump(self, last=None, file=None):
+        """
+        Write kept events, with their turn numbers, to a file
+
+        Args:
+            last: Only the most recent this many (all kept events if None)
+            file: Where to write (sys.stderr if None)
+        """
+        if file is None:
+            file = sys.stderr
+        for event in self.events(last):
+            print(f"[turn {event[0]}] {self.render(event)}", file=file)
+
+    def clear(self):
+        """Forget every event"""
+        self._events.clear()
@@ -0,0 +1,249 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Battle Simulator Module
+
+This module runs large numbers of headless battles for every combination of
+character class, level and enemy type, so classes can be balanced from
+numbers instead of by hand. Combinations are spread across worker processes.
+
+Every combination draws from its own random.Random seeded with a string
+built from the seed and the combination, so results are the same whatever
+the number of workers.
+"""
+
+import csv
+import os
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import character_manager
+import combat_system
+
+# ============================================================================
+# SIMULATION SETTINGS
+# ============================================================================
+
+# Classes accepted by character_manager.create_character
+CHARACTER_CLASSES = tuple(character_manager.CLASS_BASE_STATS)
+
+# Chance the simulated player uses their special ability on a turn
+DEFAULT_SPECIAL_CHANCE = 0.3
+
+# Columns written by export_csv
+CSV_FIELDS = (
+    "class", "level", "enemy", "battles", "wins", "losses", "draws", "win_rate",
+    "turns_mean", "turns_p10", "turns_p50", "turns_p90",
+    "hp_left_mean", "hp_left_p10", "hp_left_p50", "hp_left_p90"
+)
+
+# ============================================================================
+# SIMULATION
+# ============================================================================
+
+def run_simulation(battles_per_combination, levels=range(1, 11), classes=CHARACTER_CLASSES,
+                   enemies=None, seed=0, special_chance=DEFAULT_SPECIAL_CHANCE,
+                   max_workers=None):
+    """
+    Simulate battles for every (class, level, enemy) combination
+
+    Args:
+        battles_per_combination: Battles fought for each combination
+        levels: Character levels to simulate
+        classes: Character classes to simulate
+        enemies: Enemy types to simulate (every enemy in the registry if None)
+        seed: Base seed; the same seed gives the same results
+        special_chance: Chance of using the special ability each turn
+        max_workers: Worker processes (os.cpu_count() if None; 1 runs in
+                     this process without a pool)
+
+    Returns: List of result dictionaries, one per combination in
+             (class, level, enemy) order; see simulate_combination
+    """
+    if enemies is None:
+        enemies = tuple(combat_system.get_enemy_registry())
+
+    tasks = [
+        (character_class, level, enemy_type, battles_per_combination, seed, special_chance)
+        for character_class in classes
+        for level in levels
+        for enemy_type in enemies
+    ]
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_workers <= 1 or len(tasks) <= 1:
+        return [_simulate_task(task) for task in tasks]
+
+    # Several combinations per task keeps the inter-process overhead small
+    chunksize = max(1, len(tasks) // (max_workers * 4))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_simulate_task, tasks, chunksize=chunksize))
+
+
+def simulate_combination(character_class, level, enemy_type, battles, seed=0,
+                         special_chance=DEFAULT_SPECIAL_CHANCE):
+    """
+    Fight one combination's battles
+
+    The character is created with create_character and levelled up with
+    gain_experience, so stats follow the game's own rules.
+
+    Returns: Dictionary with 'class', 'level', 'enemy', 'battles', 'wins',
+             'losses', 'draws', 'win_rate', plus Counters 'turns'
+             (turns to kill, wins only) and 'hp_left' (health left, wins only)
+    """
+    rng = random.Random(f"{seed}:{character_class}:{level}:{enemy_type}")
+
+    character = character_manager.create_character(f"Sim{character_class}", character_class)
+    character_manager.gain_experience(character, sum(lvl * 100 for lvl in range(1, level)))
+    enemy = combat_system.create_enemy(enemy_type)
+
+    outcomes, turns, hp_left = fight_battles(character, enemy, battles, rng, special_chance)
+
+    return {
+        "class": character_class,
+        "level": level,
+        "enemy": enemy_type,
+        "battles": battles,
+        "wins": outcomes["player"],
+        "losses": outcomes["enemy"],
+        "draws": outcomes["none"],
+        "win_rate": outcomes["player"] / battles if battles else 0.0,
+        "turns": turns,
+        "hp_left": hp_left
+    }
+
+
+def fight_battles(character, enemy, battles, rng, special_chance=DEFAULT_SPECIAL_CHANCE):
+    """
+    Fight the same battle several times with a RandomPolicy
+
+    Battles that can't vary (only basic attacks, or only a fixed-damage
+    special; see combat_system.predict_battle) are predicted once instead.
+
+    Args:
+        character: Character dictionary (not modified)
+        enemy: Enemy dictionary (not modified)
+        battles: Number of battles
+        rng: random.Random the policy draws from
+        special_chance: Chance of using the special ability each turn
+
+    Returns: Tuple of Counters (outcomes by winner, turns to kill on wins,
+             health left on wins)
+    """
+    outcomes = Counter()
+    turns = Counter()
+    hp_left = Counter()
+
+    # Only basic attacks, or only a fixed-damage special: every battle ends
+    # the same way, so work it out once
+    if special_chance == 0 or (special_chance == 1 and combat_system.can_predict_special(character["class"])):
+        result = combat_system.predict_battle(character, enemy, use_special=special_chance == 1)
+        outcomes[result["winner"]] = battles
+        if result["winner"] == "player" and battles:
+            turns[result["turns"]] = battles
+            hp_left[result["health_left"]] = battles
+    else:
+        policy = combat_system.RandomPolicy(rng, special_chance)
+        simulate_battle = combat_system.simulate_battle
+        for _ in range(battles):
+            result = simulate_battle(character, enemy, policy)
+            outcomes[result["winner"]] += 1
+            if result["winner"] == "player":
+                turns[result["turns"]] += 1
+                hp_left[result["health_left"]] += 1
+
+    return outcomes, turns, hp_left
+
+
+def _simulate_task(task):
+    """Worker entry point (must be a module-level function to be pickled)"""
+    return simulate_combination(*task)
+
+# ============================================================================
+# REPORTING
+# ============================================================================
+
+def summarize(result):
+    """
+    Flatten a combination result into one row of numbers
+
+    Returns: Dictionary with the CSV_FIELDS keys
+    """
+    row = {field: result[field] for field in ("class", "level", "enemy", "battles", "wins", "losses", "draws")}
+    row["win_rate"] = round(result["win_rate"], 4)
+    for name in ("turns", "hp_left"):
+        histogram = result[name]
+        row[f"{name}_mean"] = round(_mean(histogram), 2)
+        row[f"{name}_p10"] = _percentile(histogram, 10)
+        row[f"{name}_p50"] = _percentile(histogram, 50)
+        row[f"{name}_p90"] = _percentile(histogram, 90)
+    return row
+
+
+def export_csv(results, filepath):
+    """
+    Write simulation results to a CSV file, one row per combination
+
+    Returns: Number of rows written
+    """
+    directory = os.path.dirname(filepath)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(filepath, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for result in results:
+            writer.writerow(summarize(result))
+    return len(results)
+
+# ============================================================================
+# HELPER FUNCTIONS
+# ============================================================================
+
+def _mean(histogram):
+    """Mean of a {value: count} histogram (0 if empty)"""
+    total = sum(histogram.values())
+    if total == 0:
+        return 0.0
+    return sum(value * count for value, count in histogram.items()) / total
+
+
+def _percentile(histogram, percent):
+    """Nearest-rank percentile of a {value: count} histogram (None if empty)"""
+    total = sum(histogram.values())
+    if total == 0:
+        return None
+    rank = max(1, -(-total * percent // 100))
+    seen = 0
+    for value in sorted(histogram):
+        seen += histogram[value]
+        if seen >= rank:
+            return value
+
+
+# ============================================================================
+# TESTING
+# ============================================================================
+
+if __name__ == "__main__":
+    import time
+
+    print("=== BATTLE SIMULATOR TEST ===")
+
+    start = time.perf_counter()
+    results = run_simulation(10_000)
+    elapsed = time.perf_counter() - start
+
+    total = sum(result["battles"] for result in results)
+    print(f"Simulated {total:,} battles in {elapsed:.2f}s ({total / elapsed:,.0f}/s)")
+    for result in results:
+        row = summarize(result)
+        if row["level"] in (1, 5, 10):
+            print(f"{row['class']:8} L{row['level']:<2} vs {row['enemy']:6}: "
+                  f"win {row['win_rate']:.1%}, turns p50 {row['turns_p50']}, hp left p50 {row['hp_left_p50']}")
+
+    export_csv(results, "data/battle_balance.csv")
+    print("Wrote data/battle_balance.csv")
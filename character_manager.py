@@ -10,6 +10,10 @@ This module handles character creation, loading, and saving.
 """
 
 import os
+import threading
+import gold_ledger
+from inventory_system import Inventory
+from quest_handler import QuestLog
 from custom_exceptions import (
     InvalidCharacterClassError,
     CharacterNotFoundError,
@@ -18,27 +22,77 @@ from custom_exceptions import (
     CharacterDeadError
 )
 
+# ============================================================================
+# CHARACTER LOCKING
+# ============================================================================
+
+# Guards creating a character's lock the first time it is needed
+_lock_creation = threading.Lock()
+
+
+class CharacterLock(type(threading.RLock())):
+    """
+    Re-entrant lock kept on a character
+
+    A plain RLock can't be copied or pickled, which would make every
+    character that was ever locked fail copy.deepcopy or a trip to a worker
+    process. This one is rebuilt as a new, unlocked lock instead: a copy is
+    a separate character, so it gets its own lock.
+    """
+
+    __slots__ = ()
+
+    def __reduce__(self):
+        return (CharacterLock, ())
+
+
+def character_lock(character):
+    """
+    Get the lock guarding a character's gold and inventory
+    
+    Functions that check and then change a character (buying, selling,
+    using items, adding gold) hold this lock so worker threads serving the
+    same character can't interleave. It is re-entrant, so a locked function
+    can call another one (e.g. a purchase that records gold).
+    
+    The lock is kept under the "_lock" key; keys starting with "_" are
+    runtime-only and are not saved. Copying or pickling the character gives
+    the copy a new lock (see CharacterLock).
+    
+    Returns: CharacterLock
+    """
+    lock = character.get("_lock")
+    if lock is None:
+        with _lock_creation:
+            lock = character.get("_lock")
+            if lock is None:
+                lock = character["_lock"] = CharacterLock()
+    return lock
+
+
 # ============================================================================
 # CHARACTER MANAGEMENT FUNCTIONS
 # ============================================================================
 
+# Level 1 stats for each class (also the list of valid classes)
+CLASS_BASE_STATS = {
+    "Warrior": {"health": 120, "strength": 15, "magic": 5}, 
+    "Mage":    {"health": 80,  "strength": 8,  "magic": 20},
+    "Rogue":   {"health": 90,  "strength": 12, "magic": 10},
+    "Cleric":  {"health": 100, "strength": 10, "magic": 15}
+}
+
+# Stats added on every level up
+LEVEL_UP_GAINS = {"max_health": 10, "strength": 2, "magic": 2}
+
 # character_manager.py
 
 def create_character(name, character_class):
 
-    valid_char_classes = ["Warrior", "Mage", "Rogue", "Cleric"]
-
-    if character_class not in valid_char_classes:
+    if character_class not in CLASS_BASE_STATS:
         raise InvalidCharacterClassError(f"{character_class} is not an available class.")
-    
-    base_stats = {
-        "Warrior": {"health": 120, "strength": 15, "magic": 5}, 
-        "Mage":    {"health": 80,  "strength": 8,  "magic": 20},
-        "Rogue":   {"health": 90,  "strength": 12, "magic": 10},
-        "Cleric":  {"health": 100, "strength": 10, "magic": 15}
-    }
 
-    stats = base_stats[character_class]
+    stats = CLASS_BASE_STATS[character_class]
 
     return {
         "name": name,
@@ -50,9 +104,15 @@ def create_character(name, character_class):
         "magic": stats["magic"],
         "experience": 0, # experience amount begins at 0.
         "gold": 100, # every character starts with 100 gold.
-        "inventory": [], # inventory is empty by default, can be added to later.
-        "active_quests": [], # no active quests by default.
-        "completed_quests": [] # no completed quests by default (no active quests).
+        "inventory": Inventory(), # inventory is empty by default, can be added to later.
+        "active_quests": QuestLog(), # no active quests by default.
+        "completed_quests": QuestLog(), # no completed quests by default (no active quests).
+        # Running quest totals, kept up to date by quest_handler.complete_quest
+        "quests_completed": 0,
+        "quest_xp_earned": 0,
+        "quest_gold_earned": 0,
+        # Objective progress on active quests: {quest_id: count}
+        "quest_progress": {}
     }
 
 
@@ -64,8 +124,19 @@ def save_character(character, save_directory="data/save_games"):
     filepath = os.path.join(save_directory, f"{character['name']}_save.txt")
 
     try:
-        with open(filepath, "w") as f:
+        with character_lock(character), open(filepath, "w") as f:
             for key, value in character.items():
+                # Runtime-only state (locks, trackers) is not saved
+                if key.startswith("_"):
+                    continue
+                # Inventory stacks are written as "item_id*quantity"
+                if isinstance(value, Inventory):
+                    value = value.save_entries()
+                elif isinstance(value, QuestLog):
+                    value = list(value)
+                # Objective progress is written as "quest_id*count"
+                elif isinstance(value, dict):
+                    value = [f"{quest_id}*{count}" for quest_id, count in value.items()]
                 # If the value is a list (like inventory or quests), join it as comma-separated
                 if isinstance(value, list):
                     value = ",".join(value)
@@ -137,8 +208,40 @@ def load_character(character_name, save_directory="data/save_games"):
         # If any issue occurs while reading or parsing the file, raise an error
         raise InvalidSaveDataError(f"Save data format is invalid for {character_name}: {e}")
 
+    # Translate the saved item IDs back into the compact in-memory inventory
+    if "inventory" in character:
+        character["inventory"] = Inventory.from_save_entries(_parse_list_field(character["inventory"]))
+
+    # Quest lists come back as ordered sets for O(1) membership checks
+    for key in ("active_quests", "completed_quests"):
+        if key in character:
+            character[key] = QuestLog(_parse_list_field(character[key]))
+
+    if "quest_progress" in character:
+        progress = {}
+        for entry in _parse_list_field(character["quest_progress"]):
+            quest_id, _, count = entry.rpartition("*")
+            if not quest_id or not count.isdigit():
+                raise InvalidSaveDataError(f"Invalid quest progress entry '{entry}' for {character_name}")
+            progress[quest_id] = int(count)
+        character["quest_progress"] = progress
+
     return character
 
+
+def _parse_list_field(value):
+    """
+    Turn a parsed save value back into a list
+
+    A list with zero or one entries is saved without a comma, so it comes
+    back from load_character as "" or a single value.
+    """
+    if isinstance(value, list):
+        return value
+    if value == "":
+        return []
+    return [str(value)]
+
 def list_saved_characters(save_directory="data/save_games"):
 
     """
@@ -194,27 +297,37 @@ def gain_experience(character, xp_amount):
 
 # The while loop keeps leveling up the character until the experience equals the level * 100
     character["experience"] += xp_amount
+    old_level = character["level"]
     while character["experience"] >= character["level"] * 100:
         level_up_xp = character["level"] * 100
         character["experience"] -= level_up_xp
         character["level"] += 1
-        character["max_health"] += 10
-        character["strength"] += 2
-        character["magic"] += 2
+        for stat, gain in LEVEL_UP_GAINS.items():
+            character[stat] += gain
         character["health"] = character["max_health"]
 
-    
+    # Let the quest tracker (if any) unlock quests for the new level
+    tracker = character.get("_quest_tracker")
+    if tracker is not None and character["level"] != old_level:
+        tracker.level_changed(character, old_level)
+
+
+
+def add_gold(character, amount, reason=gold_ledger.REASON_ADJUSTMENT):
+    # Read, check and write under the character's lock
+    with character_lock(character):
+        current_gold = character.get("gold", 0)
 
-def add_gold(character, amount):
-    current_gold = character.get("gold", 0)
+        # Checks if the new total would be negative
+        total_gold = current_gold + amount
+        if total_gold < 0:
+            raise ValueError("Stack your bread, you out of gold dawg!")
 
-    # Checks if the new total would be negative
-    total_gold = current_gold + amount
-    if total_gold < 0:
-        raise ValueError("Stack your bread, you out of gold dawg!")
+        # Update the character's gold
+        character["gold"] = total_gold
 
-    # Update the character's gold
-    character["gold"] = total_gold
+        # Every gold change goes in the ledger (reason says where it came from)
+        gold_ledger.record_gold_change(character, amount, reason)
 
     return total_gold
     
@@ -289,9 +402,9 @@ def validate_character_data(character):
         "magic": int,
         "experience": int,
         "gold": int,
-        "inventory": list,
-        "active_quests": list,
-        "completed_quests": list
+        "inventory": (list, Inventory),
+        "active_quests": (list, QuestLog),
+        "completed_quests": (list, QuestLog)
     }
 
     for field, expected_type in required_fields.items():
@@ -299,7 +412,8 @@ def validate_character_data(character):
             raise InvalidSaveDataError(f"Missing required field: {field}")
         value = character[field]
         if not isinstance(value, expected_type):
-            raise InvalidSaveDataError(f"Field '{field}' must be of type {expected_type.__name__}")
+            type_name = getattr(expected_type, "__name__", "list")
+            raise InvalidSaveDataError(f"Field '{field}' must be of type {type_name}")
 
     return True
 # ============================================================================
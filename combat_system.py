@@ -10,6 +10,18 @@ AI Usage: This code was developed with assistance from ChatGPT for structure, lo
 Handles combat mechanics
 """
 
+import random
+from types import MappingProxyType
+
+import battle_log
+import game_data
+from cooldowns import CooldownScheduler
+from status_effects import StatusEffects, compile_status_effect
+from battle_log import (
+    ACTOR_PLAYER, ACTOR_ENEMY, LOG_RESULTS, LOG_TURNS,
+    EVENT_APPEAR, EVENT_ATTACK, EVENT_SPECIAL, EVENT_ESCAPE, EVENT_ESCAPE_FAILED,
+    EVENT_VICTORY, EVENT_DRAW, EVENT_STATUS_DAMAGE, EVENT_STATUS_HEAL, EVENT_ITEM
+)
 from custom_exceptions import (
     InvalidTargetError,
     CombatNotActiveError,
@@ -17,66 +29,95 @@ from custom_exceptions import (
     AbilityOnCooldownError
 )
 
+# Player actions a battle policy can choose
+ACTION_ATTACK = "attack"
+ACTION_SPECIAL = "special"
+ACTION_FLEE = "flee"
+ACTION_ITEM = "item"   # use the item the policy put in battle.selected_item
+
+# Battles that last this many rounds end in a draw (e.g. a Cleric healing forever)
+MAX_TURNS = 1000
+
 # ============================================================================
 # ENEMY DEFINITIONS
 # ============================================================================
 
+# Enemy prototypes by lowercase ID (read-only); built by load_enemy_registry()
+_enemy_registry = None
+
+
+def load_enemy_registry(enemies=None, filename="data/enemies.txt"):
+    """
+    Compile enemy templates into the registry create_enemy clones from
+
+    Each template becomes a complete, read-only enemy dictionary, so creating
+    an enemy is a single copy.
+
+    Args:
+        enemies: Templates as returned by game_data.load_enemies (loaded from
+                 filename if None)
+        filename: Enemy data file
+
+    Returns: Read-only mapping {enemy_id: read-only prototype}
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    global _enemy_registry
+
+    if enemies is None:
+        enemies = game_data.load_enemies(filename)
+
+    prototypes = {}
+    for enemy_id, data in enemies.items():
+        prototypes[enemy_id.lower()] = MappingProxyType({
+            "enemy_id": enemy_id.lower(),   # what quest objectives name
+            "name": data["name"],
+            "type": data["name"],
+            "health": data["health"],
+            "max_health": data["health"],
+            "strength": data["strength"],
+            "magic": data["magic"],
+            "xp_reward": data["xp_reward"],
+            "gold_reward": data["gold_reward"]
+        })
+
+    _enemy_registry = MappingProxyType(prototypes)
+    return _enemy_registry
+
+
+def get_enemy_registry():
+    """
+    Get the enemy registry, loading data/enemies.txt the first time
+
+    Returns: Read-only mapping {enemy_id: read-only prototype}
+    """
+    if _enemy_registry is None:
+        return load_enemy_registry()
+    return _enemy_registry
+
+
 def create_enemy(enemy_type):
 
     """
     Create an enemy based on type
     
-    Example enemy types and stats:
-    - goblin: health=50, strength=8, magic=2, xp_reward=25, gold_reward=10
-    - orc: health=80, strength=12, magic=5, xp_reward=50, gold_reward=25
+    Enemy types and stats come from data/enemies.txt, e.g.:
+    - goblin: health=30, strength=5, magic=0, xp_reward=10, gold_reward=5
+    - orc: health=50, strength=12, magic=2, xp_reward=20, gold_reward=12
     - dragon: health=200, strength=25, magic=15, xp_reward=200, gold_reward=100
     
     Returns: Enemy dictionary
     Raises: InvalidTargetError if enemy_type not recognized
     """
-    # TODO: Implement enemy creation
-    # Return dictionary with: name, health, max_health, strength, magic, xp_reward, gold_reward
-
-    enemies = {
-        "goblin": {
-            "name": "Goblin",
-            "type": "Goblin",
-            "health": 30,
-            "max_health": 30,
-            "strength": 5,
-            "magic": 0,
-            "xp_reward": 10,
-            "gold_reward": 5
-        },
-        "orc": {
-            "name": "Orc",
-            "type": "Orc",
-            "health": 50,
-            "max_health": 50,
-            "strength": 12,
-            "magic": 2,
-            "xp_reward": 20,
-            "gold_reward": 12
-        }
-    }
+    registry = _enemy_registry
+    if registry is None:
+        registry = get_enemy_registry()
 
-    enemy_type = enemy_type.lower()  # normalize input
-
-    if enemy_type not in enemies:
+    prototype = registry.get(enemy_type.lower())
+    if prototype is None:
         raise InvalidTargetError(f"Unknown enemy: {enemy_type}")
 
-    # Return a new dictionary so modifications in battle don't affect template
-    e = enemies[enemy_type]
-    return {
-        "name": e["name"],
-        "type": e["type"],
-        "health": e["health"],
-        "max_health": e["max_health"],
-        "strength": e["strength"],
-        "magic": e["magic"],
-        "xp_reward": e["xp_reward"],
-        "gold_reward": e["gold_reward"]
-    }
+    # A new dictionary so modifications in battle don't affect the prototype
+    return prototype.copy()
     
 
 def get_random_enemy_for_level(character_level):
@@ -106,10 +147,147 @@ def get_random_enemy_for_level(character_level):
     
     
 
+# ============================================================================
+# SPECIAL ABILITY DEFINITIONS
+# ============================================================================
+
+# Each class's special ability (read-only); built by load_ability_registry()
+_ability_registry = None
+
+
+def load_ability_registry(abilities=None, filename="data/abilities.txt"):
+    """
+    Compile ability data into a registry keyed by class
+
+    Args:
+        abilities: Abilities as returned by game_data.load_abilities (loaded
+                   from filename if None)
+        filename: Ability data file
+
+    Returns: Read-only mapping {class name: read-only ability dictionary}
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    global _ability_registry
+
+    if abilities is None:
+        abilities = game_data.load_abilities(filename)
+
+    registry = {}
+    for ability in abilities.values():
+        ability = dict(ability)
+        # "poison:3:3" becomes ("poison", 3, 3); None if the ability has no effect
+        ability["status_effect"] = compile_status_effect(ability["effect"]) if ability.get("effect") else None
+        registry[ability["class"]] = MappingProxyType(ability)
+    _ability_registry = MappingProxyType(registry)
+    return _ability_registry
+
+
+def get_class_ability(character_class):
+    """
+    Get a class's special ability, loading data/abilities.txt the first time
+
+    Returns: Ability dictionary ('ability_id', 'name', 'cooldown',
+             'status_effect', ...) or None if the class has none
+    """
+    registry = _ability_registry
+    if registry is None:
+        registry = load_ability_registry()
+    return registry.get(character_class)
+
+
 # ============================================================================
 # COMBAT SYSTEM
 # ============================================================================
 
+def attack_damage(strength, defender_strength):
+    """
+    Damage of a basic attack
+
+    Damage formula: strength - (defender_strength // 4)
+    Minimum damage: 1
+
+    batch_combat applies the same formula to arrays.
+
+    Returns: Integer damage amount
+    """
+    damage = strength - defender_strength // 4
+    if damage < 1:
+        damage = 1
+    return damage
+
+
+# Dictionary keys a Combatant keeps as attributes
+_COMBATANT_ATTRIBUTES = {
+    "name": "name",
+    "class": "class_name",
+    "health": "health",
+    "max_health": "max_health",
+    "strength": "strength",
+    "magic": "magic"
+}
+
+
+class Combatant:
+    """
+    A character's or enemy's stats for the length of a battle
+
+    Battles read and change these every turn, so they are slotted attributes
+    instead of dictionary keys. Item access (combatant["health"]) still works,
+    so special abilities and policies written for dictionaries accept a
+    Combatant too; keys without an attribute are read from the source
+    dictionary.
+    """
+
+    __slots__ = ("source", "name", "class_name", "health", "max_health", "strength", "magic")
+
+    def __init__(self, source):
+        """
+        Args:
+            source: Character or enemy dictionary the stats are taken from
+        """
+        self.source = source
+        self.name = source.get("name", "")
+        self.class_name = source.get("class")
+        self.health = source["health"]
+        self.max_health = source.get("max_health", self.health)
+        self.strength = source.get("strength", 0)
+        self.magic = source.get("magic", 0)
+
+    def __getitem__(self, key):
+        attribute = _COMBATANT_ATTRIBUTES.get(key)
+        if attribute is None:
+            return self.source[key]
+        return getattr(self, attribute)
+
+    def __setitem__(self, key, value):
+        attribute = _COMBATANT_ATTRIBUTES.get(key)
+        if attribute is None:
+            raise KeyError(f"Combatant has no stat '{key}'")
+        setattr(self, attribute, value)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def write_back(self):
+        """
+        Copy the stats a battle can change back to the source
+
+        Damage changes health; items used in battle (e.g. an elixir) can
+        change the others. Stats the source doesn't have are left out.
+        """
+        source = self.source
+        source["health"] = self.health
+        if "max_health" in source:
+            source["max_health"] = self.max_health
+        if "strength" in source:
+            source["strength"] = self.strength
+        if "magic" in source:
+            source["magic"] = self.magic
+
+
 class SimpleBattle:
     """
     Simple turn-based combat system
@@ -117,18 +295,38 @@ class SimpleBattle:
     Manages combat between character and enemy
     """
     
-    def __init__(self, character, enemy):
+    def __init__(self, character, enemy, write_back=True, log=None):
 
     # BELOW: Intitializing Characters and Enemies for battle
         self.character = character 
         self.enemy = enemy
 
+    # BELOW: Stats used during the battle; health is copied back to the
+    # dictionaries when the battle (or a step of it) ends, unless write_back
+    # is False
+        self.player = Combatant(character)
+        self.foe = Combatant(enemy)
+        self.write_back = write_back
+
+    # BELOW: BattleLog events are recorded in (None = none for run(); the
+    # step-by-step methods print to the console)
+        self.log = log
+
     # BELOW: combat_active flag
         self.combat_active = True
 
     # BELOW: turn counter starts at 0 at beginning of the battle
         self.turn_counter = 0
 
+    # BELOW: special ability cooldowns, by turn
+        self.cooldowns = CooldownScheduler()
+
+    # BELOW: poison, burn, regen and other effects lasting several turns
+        self.status_effects = StatusEffects()
+
+    # BELOW: (item_id, item_data) a policy picked for ACTION_ITEM
+        self.selected_item = None
+
         """Initialize battle with character and enemy"""
         # TODO: Implement initialization
         # Store character and enemy
@@ -137,13 +335,17 @@ class SimpleBattle:
         
 
 
-    def start_battle(self):
+    def start_battle(self, policy=None):
 
         """
         Start the combat loop
 
+        Args:
+            policy: Chooses the player's actions (ConsolePolicy if None)
+
         Returns: Dictionary with battle results:
-                {'winner': 'player'|'enemy', 'xp_gained': int, 'gold_gained': int}
+                {'winner': 'player'|'enemy'|'none', 'xp_gained': int,
+                 'gold_gained': int, 'turns': int}
 
         Raises: CharacterDeadError if character is already dead
         """
@@ -154,27 +356,182 @@ class SimpleBattle:
         if is_character_dead(self.character):
             raise CharacterDeadError("Character is already dead, cannot start battle.")
 
-        # Initialize battle results
-        battle_results = {
-            "winner": None,
-            "xp_gained": 0,
-            "gold_gained": 0
-        }
+        if policy is None:
+            policy = ConsolePolicy()
+
+        # Show events as they happen unless the battle has its own log
+        log = self.log
+        if log is None:
+            log = battle_log.BattleLog(echo=display_battle_log)
+        return self.run(policy, log=log)
+
+    def run(self, policy, log=None, max_turns=MAX_TURNS):
+        """
+        Run the whole battle without any input
+
+        Each round the policy picks the player's action, then the enemy
+        attacks. Attacks use attack_damage() on the Combatant attributes and
+        health is written back at the end.
 
-        # Example: turn counter starts at 1
-        self.turn_counter = 1
+        Args:
+            policy: Object with choose_action(battle) returning an ACTION_*
+            log: BattleLog to record events in (the battle's own log if None;
+                 nothing is recorded if there is neither)
+            max_turns: Rounds before the battle is called a draw
 
-        # TODO: Implement actual battle loop here
-        # while self.combat_active:
-        #     self.player_turn()
-        #     self.enemy_turn()
-        #     check for death/winner
+        Returns: Battle result dictionary (see start_battle)
+        Raises: CharacterDeadError if character is already dead
+        """
+        player = self.player
+        foe = self.foe
+        if player.health <= 0:
+            raise CharacterDeadError("Character is already dead, cannot start battle.")
 
-        return battle_results
+        if log is None:
+            log = self.log
+        try:
+            return self._run(policy, log, max_turns)
+        except Exception:
+            # Show what led up to it
+            if log is not None and log.dump_on_error:
+                log.dump(log.dump_on_error)
+            raise
+
+    def _run(self, policy, log, max_turns):
+        """The battle loop behind run()"""
+        player = self.player
+        foe = self.foe
+        choose_action = policy.choose_action
+        advance_cooldowns = self.cooldowns.advance
+        cooldowns = self.cooldowns
+        status_effects = self.status_effects
+        active_effects = status_effects.active
+
+        # Per-turn events are only recorded if the log wants them
+        record = None
+        if log is not None:
+            log.begin(player.name, foe.name)
+            if log.verbosity >= LOG_RESULTS:
+                log.record(self.turn_counter, ACTOR_ENEMY, EVENT_APPEAR)
+            if log.verbosity >= LOG_TURNS:
+                record = log.recorder()
 
+        self.combat_active = True
+        winner = None
+        while self.turn_counter < max_turns:
+            self.turn_counter += 1
+            advance_cooldowns(self.turn_counter)
+
+            # Status effects tick before anyone acts (with none, only the
+            # turn they count from moves on)
+            if active_effects:
+                winner = self._tick_status_effects(record)
+                if winner is not None:
+                    break
+            else:
+                status_effects.turn = self.turn_counter
+
+            # Player's action
+            action = choose_action(self)
+            if action == ACTION_ATTACK:
+                damage = attack_damage(player.strength, foe.strength)
+                foe.health -= damage
+                if foe.health < 0:
+                    foe.health = 0
+                if record:
+                    record((self.turn_counter, ACTOR_PLAYER, EVENT_ATTACK, damage))
+            elif action == ACTION_SPECIAL:
+                message = use_special_ability(player, foe, cooldowns, status_effects)
+                if record:
+                    record((self.turn_counter, ACTOR_PLAYER, EVENT_SPECIAL, message))
+            elif action == ACTION_FLEE:
+                if self.attempt_escape():
+                    if record:
+                        record((self.turn_counter, ACTOR_PLAYER, EVENT_ESCAPE, None))
+                    winner = "none"
+                    break
+                if record:
+                    record((self.turn_counter, ACTOR_PLAYER, EVENT_ESCAPE_FAILED, None))
+            elif action == ACTION_ITEM:
+                message = self.use_selected_item()
+                if record:
+                    record((self.turn_counter, ACTOR_PLAYER, EVENT_ITEM, message))
+            else:
+                raise ValueError(f"Unknown battle action: {action!r}")
+
+            if foe.health <= 0:
+                winner = "player"
+                break
+
+            # Enemy always attacks
+            damage = attack_damage(foe.strength, player.strength)
+            player.health -= damage
+            if player.health < 0:
+                player.health = 0
+            if record:
+                record((self.turn_counter, ACTOR_ENEMY, EVENT_ATTACK, damage))
+
+            if player.health <= 0:
+                winner = "enemy"
+                break
+
+        self.combat_active = False
+        self._write_back()
+        if winner is None:
+            winner = "none"
+            if log is not None and log.verbosity >= LOG_RESULTS:
+                log.record(self.turn_counter, ACTOR_PLAYER, EVENT_DRAW)
+        return self._finish(winner, log)
+
+    def _write_back(self):
+        """Copy the combatants' health back to the dictionaries"""
+        if self.write_back:
+            self.player.write_back()
+            self.foe.write_back()
+
+    def _finish(self, winner, log=None):
+        """Build (and remember) the battle result"""
+        result = {"winner": winner, "xp_gained": 0, "gold_gained": 0, "turns": self.turn_counter}
+        if winner == "player":
+            rewards = get_victory_rewards(self.enemy)
+            result["xp_gained"] = rewards["xp"]
+            result["gold_gained"] = rewards["gold"]
+        if winner != "none" and log is not None and log.verbosity >= LOG_RESULTS:
+            actor = ACTOR_PLAYER if winner == "player" else ACTOR_ENEMY
+            log.record(self.turn_counter, actor, EVENT_VICTORY)
+        self.battle_result = result
+        return result
+
+    def _tick_status_effects(self, record=None):
+        """
+        Tick status effects for this turn
 
+        Args:
+            record: Called with each tick's event tuple (None = not recorded)
 
-    def player_turn(self):
+        Returns: Winner if an effect ended the battle (see check_battle_end)
+        """
+        player = self.player
+        for target, effect, change in self.status_effects.tick(self.turn_counter):
+            if record:
+                actor = ACTOR_PLAYER if target is player else ACTOR_ENEMY
+                if change < 0:
+                    record((self.turn_counter, actor, EVENT_STATUS_DAMAGE, (effect, -change)))
+                else:
+                    record((self.turn_counter, actor, EVENT_STATUS_HEAL, (effect, change)))
+        return self.check_battle_end()
+
+    def _log_step(self, verbosity, actor, action, value=None):
+        """Record an event from the step-by-step methods"""
+        log = self.log
+        if log is None:
+            # Nobody asked for a log: show events on the console
+            log = self.log = battle_log.BattleLog(echo=print)
+            log.begin(self.player.name, self.foe.name)
+        if log.verbosity >= verbosity:
+            log.record(self.turn_counter, actor, action, value)
+
+    def player_turn(self, policy=None):
         
         """
         Handle player's turn
@@ -184,64 +541,58 @@ class SimpleBattle:
         2. Special Ability (if available)
         3. Try to Run
         
+        Args:
+            policy: Chooses the action (ConsolePolicy if None)
+
         Raises: CombatNotActiveError if called outside of battle
         """
-        # TODO: Implement player turn
-        # Check combat is active
-        # Display options
-        # Get player choice
-        # Execute chosen action
-        
-    
-
         if not self.combat_active:
             raise CombatNotActiveError("No battles active.") # Special exception to handle function calls while battle is inactive
         
+        if policy is None:
+            policy = ConsolePolicy()
+
         self.turn_counter += 1 # Adds a turn every time one is taken
+        self.cooldowns.advance(self.turn_counter)
+
+        # Status effects tick at the start of the turn and may end the battle
+        winner = self._tick_status_effects(lambda event: self._log_step(LOG_TURNS, *event[1:]))
+        if winner is not None:
+            self._write_back()
+            self.combat_active = False
+            self._finish(winner, self.log)
+            return
 
         print("\n=== PLAYER TURN ===")
-        print("1. Basic Attack")
-        print("2. Special Ability")
-        print("3. Run Away")
+        action = policy.choose_action(self)
 
-        player_choice = input("Choose your move!:" \
-        "1: Basic Attack" \
-        "2: Heavy Attack (Special Ability) " \
-        "3: Run Away")
+        if action == ACTION_ATTACK: # Basic Attack
+            damage = self.calculate_damage(self.player, self.foe)
+            self.apply_damage(self.foe, damage) # Enemy takes damage based off of Character strength
+            self._log_step(LOG_TURNS, ACTOR_PLAYER, EVENT_ATTACK, damage)
 
-        if player_choice == "1": # Basic Attack
-            damage = self.character["strength"] 
-            self.enemy["health"] -= damage # Enemy takes damage based off of Character strength
-            print(f"{self.character["Name"]} chose Basic attack: Dealt {damage} damage.")
+        elif action == ACTION_SPECIAL: # Class special ability
+            message = use_special_ability(self.player, self.foe, self.cooldowns, self.status_effects)
+            self._log_step(LOG_TURNS, ACTOR_PLAYER, EVENT_SPECIAL, message)
 
-        elif player_choice == "2": # Heavy Attack/Special
-            damage = self.character["strength"]
-            self.enemy["health"] -= damage + 5 # Enemy takes extra damage (heavy attack)
-            print(f"{self.character["Name"]} chose Basic attack: Dealt {damage} damage.")
+        elif action == ACTION_FLEE: # Run Away (Chance)
+            if self.attempt_escape():
+                self._log_step(LOG_TURNS, ACTOR_PLAYER, EVENT_ESCAPE)
+                self._write_back()
+                self._finish("none")
+                return
+            self._log_step(LOG_TURNS, ACTOR_PLAYER, EVENT_ESCAPE_FAILED)
 
-        elif player_choice == "3": # Run Away (Chance)
-            escape_chance = self.enemy["strength"] // 5 # Equation for how your character can escape
+        elif action == ACTION_ITEM: # Consumable from the inventory
+            message = self.use_selected_item()
+            self._log_step(LOG_TURNS, ACTOR_PLAYER, EVENT_ITEM, message)
 
-        if self.character["level"] >= escape_chance: 
-            print("You successfully ran away!")
-            self.combat_active = False
-            self.battle_result = {"winner": "none", "xp_gained": 0, "gold_gained": 0}
-            return
-        else:
-            print("You were not strong enough to escape!")
+        self._write_back()
 
     # CHECK FOR ENEMY DEATH
-        if self.enemy["health"] <= 0:
-            print(f"The {self.enemy['type']} has been defeated!")
-
+        if self.check_battle_end() == "player":
             self.combat_active = False # Fight ended, combat returns false 
-            self.battle_result = {
-            "winner": "player",
-            "xp_gained": self.enemy.get("xp_reward", 20),
-            "gold_gained": self.enemy.get("gold_reward", 10)
-        }
-
-        self.turn_counter += 1
+            self._finish("player", self.log)
 
 
     
@@ -255,52 +606,65 @@ class SimpleBattle:
         
         Raises: CombatNotActiveError if called outside of battle
         """
-        # TODO: Implement enemy turn
-        # Check combat is active
-        # Calculate damage
-        # Apply to character
-        
-
         if not self.combat_active:
             raise CombatNotActiveError("No battles active.")
 
         print("\n=== ENEMY TURN ===")
 
-        # 2. Enemy always attacks
-        damage = self.enemy["strength"]
-        self.character["health"] -= damage
-
-        print(f"The {self.enemy['type']} attacks you for {damage} damage!")
+        # Enemy always attacks
+        damage = self.calculate_damage(self.foe, self.player)
+        self.apply_damage(self.player, damage)
+        self._write_back()
 
-        # 3. Check player death
-        if self.character["health"] <= 0:
-            print("You have been defeated...") # Character receives defeat message
+        self._log_step(LOG_TURNS, ACTOR_ENEMY, EVENT_ATTACK, damage)
 
+        # Check player death
+        if self.check_battle_end() == "enemy":
             self.combat_active = False # Battle is over, combat_active = false
+            self._finish("enemy", self.log) # Character receives defeat message
 
-            # Prints the battle result
-            self.battle_result = {
-            "winner": "enemy",
-            "xp_gained": 0,
-            "gold_gained": 0
-            }
 
+    def use_selected_item(self):
+        """
+        Use the item a policy picked for ACTION_ITEM
+
+        Returns: String describing what happened
+        Raises: ValueError if no item was picked; otherwise as
+                inventory_system.use_item
+        """
+        import inventory_system
+
+        if self.selected_item is None:
+            raise ValueError("ACTION_ITEM chosen without a selected_item")
+        item_id, item_data = self.selected_item
+        self.selected_item = None
+        return inventory_system.use_item(self.character, item_id, item_data, battle=self)
+
+    def special_ready(self):
+        """
+        Check whether the player's special ability is off cooldown
+
+        Returns: True if it can be used this turn
+        """
+        ability = get_class_ability(self.player.class_name)
+        return ability is None or self.cooldowns.is_ready(id(self.player), ability["ability_id"])
+
+    def special_turns_left(self):
+        """Turns until the player's special ability is ready (0 if it is)"""
+        ability = get_class_ability(self.player.class_name)
+        if ability is None:
+            return 0
+        return self.cooldowns.remaining(id(self.player), ability["ability_id"])
 
     def calculate_damage(self, attacker, defender):
         """
         Calculate damage from attack
     
-        Damage formula: attacker['strength'] - (defender['strength'] // 4)
-        Minimum damage: 1
+        Damage formula: see attack_damage()
     
         Returns: Integer damage amount
         """
-        damage_amount = attacker["strength"] - (defender["strength"] // 4) # Used Damage Formula
-
-        if damage_amount < 1:
-            damage_amount = 1 # Minimum amount of damage that can be done
-
-        return int(damage_amount) # Returns integer amount
+        return int(attack_damage(attacker["strength"], defender["strength"]))
     
 
     
@@ -309,7 +673,8 @@ class SimpleBattle:
         """
         Apply damage to a character or enemy
         
-        Reduces health, prevents negative health
+        Reduces health, prevents negative health. The target may be a
+        dictionary or a Combatant.
         """
         # TODO: Implement damage application
 
@@ -329,10 +694,10 @@ class SimpleBattle:
         # TODO: Implement battle end check
 
         
-        if self.character["health"] <= 0:
+        if self.player.health <= 0:
             return "enemy"
         
-        if self.enemy["health"] <= 0:
+        if self.foe.health <= 0:
             return "player"
         
         else:
@@ -348,7 +713,7 @@ class SimpleBattle:
         
         Returns: True if escaped, False if failed
         """
-        if self.character["magic"] > self.enemy["strength"]: # Escapes are based on if character magic is greater than enemy strength
+        if self.player.magic > self.foe.strength: # Escapes are based on if character magic is greater than enemy strength
             self.combat_active = False
             return True
         
@@ -364,7 +729,7 @@ class SimpleBattle:
 # SPECIAL ABILITIES
 # ============================================================================
 
-def use_special_ability(character, enemy):
+def use_special_ability(character, enemy, cooldowns=None, status_effects=None):
     """
     Use character's class-specific special ability
     
@@ -373,29 +738,64 @@ def use_special_ability(character, enemy):
     - Mage: Fireball (2x magic damage)
     - Rogue: Critical Strike (3x strength damage, 50% chance)
     - Cleric: Heal (restore 30 health)
+
+    Cooldowns and status effects (e.g. the Rogue's poison) come from
+    data/abilities.txt and are only used when the battle's CooldownScheduler
+    and StatusEffects are given.
     
+    Args:
+        character: Character dictionary (or Combatant) using the ability
+        enemy: Enemy dictionary (or Combatant)
+        cooldowns: The battle's CooldownScheduler (None = no cooldowns)
+        status_effects: The battle's StatusEffects (None = no effects)
+
     Returns: String describing what happened
     Raises: AbilityOnCooldownError if ability was used recently
     """
+    ability = None
+    if cooldowns is not None or status_effects is not None:
+        ability = get_class_ability(character["class"])
+    if ability is not None and cooldowns is not None:
+        cooldowns.use(id(character), ability["ability_id"], ability["cooldown"])
+
     # TODO: Implement special abilities
     # Check character class
     # Execute appropriate ability
     # Track cooldowns (optional advanced feature)
 
     if character["class"] == "Warrior":
-        return warrior_power_strike(character, enemy)
+        message = warrior_power_strike(character, enemy)
 
     elif character["class"] == "Mage":
-        return mage_fireball(character, enemy)
+        message = mage_fireball(character, enemy)
 
     elif character["class"] == "Rogue":
-        return rogue_critical_strike(character, enemy)
+        message = rogue_critical_strike(character, enemy)
 
     elif character["class"] == "Cleric":
-        return cleric_heal(character)
+        message = cleric_heal(character)
 
     else:
         return "No special ability available."
+
+    if ability is not None and status_effects is not None and ability["status_effect"]:
+        target = status_effects.apply_from(character, enemy, ability["status_effect"])
+        message += " " + describe_status_effect(target, ability["status_effect"])
+    return message
+
+
+def describe_status_effect(target, status):
+    """
+    Describe a status effect being put on a target
+
+    Args:
+        target: Character or enemy dictionary (or Combatant)
+        status: Tuple of (effect, amount, turns)
+
+    Returns: String such as "Goblin has poison (3 a turn) for 3 turns."
+    """
+    effect, amount, turns = status
+    return f'{target["name"]} has {effect} ({amount} a turn) for {turns} turn{"s" if turns != 1 else ""}.'
     
 
 def warrior_power_strike(character, enemy):
@@ -404,7 +804,7 @@ def warrior_power_strike(character, enemy):
     # Double strength damage
 
     damage = character["strength"] * 2
-    enemy["health"] -= damage
+    enemy["health"] = max(0, enemy["health"] - damage)
     return f'{character["name"]} used Power Strike for {damage} damage!'
 
     
@@ -415,7 +815,7 @@ def mage_fireball(character, enemy):
     # Double magic damage
 
     damage = character["magic"] * 2
-    enemy["health"] -= damage
+    enemy["health"] = max(0, enemy["health"] - damage)
     return f'{character["name"]} cast Fireball for {damage} damage!'
 
     
@@ -430,20 +830,258 @@ def rogue_critical_strike(character, enemy):
 
     if crit:
         damage = character["strength"] * 3
-        enemy["health"] -= damage
+        enemy["health"] = max(0, enemy["health"] - damage)
         return f'{character["name"]} landed a CRITICAL STRIKE for {damage} damage!'
     else:
         damage = character["strength"]  # normal damage
-        enemy["health"] -= damage
+        enemy["health"] = max(0, enemy["health"] - damage)
         return f'{character["name"]} attacked for {damage} damage.'
     
     
 
 def cleric_heal(character):
     """Cleric special ability"""
-    # TODO: Implement healing
     # Restore 30 HP (not exceeding max_health)
-    
+    healed = min(30, character["max_health"] - character["health"])
+    character["health"] += healed
+    return f'{character["name"]} used Heal and restored {healed} health!'
+
+
+# ============================================================================
+# BATTLE POLICIES
+# ============================================================================
+
+# A policy picks the player's action each round: choose_action(battle)
+# returns ACTION_ATTACK, ACTION_SPECIAL or ACTION_FLEE, or ACTION_ITEM after
+# setting battle.selected_item to (item_id, item_data).
+
+class AttackPolicy:
+    """Always use a basic attack"""
+
+    def choose_action(self, battle):
+        return ACTION_ATTACK
+
+
+class RandomPolicy:
+    """
+    Pick actions at random with fixed chances (attack gets the rest)
+
+    A special ability picked while it is cooling down becomes an attack.
+    """
+
+    def __init__(self, rng=None, special_chance=0.3, flee_chance=0.0):
+        """
+        Args:
+            rng: random.Random to draw from (a new unseeded one if None)
+            special_chance: Chance of using the special ability
+            flee_chance: Chance of trying to run away
+        """
+        if special_chance + flee_chance > 1:
+            raise ValueError("Action chances cannot add up to more than 1")
+        self.random = (rng or random.Random()).random
+        self.special_limit = special_chance
+        self.flee_limit = special_chance + flee_chance
+
+    def choose_action(self, battle):
+        roll = self.random()
+        if roll < self.special_limit:
+            # Attack instead while the special is cooling down
+            return ACTION_SPECIAL if battle.special_ready() else ACTION_ATTACK
+        if roll < self.flee_limit:
+            return ACTION_FLEE
+        return ACTION_ATTACK
+
+
+class ConsolePolicy:
+    """Ask the player at the console"""
+
+    CHOICES = {"1": ACTION_ATTACK, "2": ACTION_SPECIAL, "3": ACTION_FLEE, "4": ACTION_ITEM}
+
+    def __init__(self, items=None):
+        """
+        Args:
+            items: Item catalog {item_id: item_data}; consumables in it can
+                   be used in battle (no items if None)
+        """
+        self.items = items or {}
+
+    def choose_action(self, battle):
+        display_combat_stats(battle.player, battle.foe)
+        effects = battle.status_effects.effects_on(battle.player)
+        if effects:
+            print("Status: " + ", ".join(f"{effect} ({turns} turns)" for effect, turns in effects.items()))
+        turns_left = battle.special_turns_left()
+        usable = [item_id for item_id in dict.fromkeys(battle.character.get("inventory", ()))
+                  if self.items.get(item_id, {}).get("type") == "consumable"]
+        print("1. Basic Attack")
+        if turns_left:
+            print(f"2. Special Ability (ready in {turns_left} turn{'s' if turns_left != 1 else ''})")
+        else:
+            print("2. Special Ability")
+        print("3. Run Away")
+        if usable:
+            print("4. Use Item")
+        while True:
+            choice = input("Choose your move: ").strip()
+            if choice == "2" and turns_left:
+                print("Your special ability is still cooling down.")
+                continue
+            if choice == "4":
+                if not usable:
+                    print("You have no items to use.")
+                    continue
+                item_id = self._choose_item(usable)
+                if item_id is None:
+                    continue
+                battle.selected_item = (item_id, self.items[item_id])
+            if choice in self.CHOICES:
+                return self.CHOICES[choice]
+            print("Invalid choice, enter 1, 2, 3 or 4.")
+
+    def _choose_item(self, usable):
+        """Ask which consumable to use (None to go back)"""
+        for number, item_id in enumerate(usable, 1):
+            print(f"  {number}. {self.items[item_id]['name']}")
+        choice = input("Which item? (Enter to go back) ").strip()
+        if choice.isdigit() and 1 <= int(choice) <= len(usable):
+            return usable[int(choice) - 1]
+        return None
+
+
+def simulate_battle(character, enemy, policy=None, max_turns=MAX_TURNS, log=None):
+    """
+    Fight one battle headlessly without changing the character or enemy
+
+    Args:
+        character: Character dictionary (not modified)
+        enemy: Enemy dictionary (not modified)
+        policy: Battle policy (AttackPolicy if None)
+        max_turns: Rounds before the battle is called a draw
+        log: BattleLog to record events in (nothing recorded if None)
+
+    Returns: Battle result dictionary, plus 'health_left' for the character
+    """
+    battle = SimpleBattle(character, enemy, write_back=False, log=log)
+    result = battle.run(policy or _ATTACK_POLICY, max_turns=max_turns)
+    result["health_left"] = battle.player.health
+    return result
+
+
+_ATTACK_POLICY = AttackPolicy()
+
+# ============================================================================
+# BATTLE PREDICTION
+# ============================================================================
+
+# Special abilities whose damage depends on neither chance nor the enemy
+# (only predictable while data/abilities.txt gives them no status EFFECT;
+# see can_predict_special)
+FIXED_SPECIAL_DAMAGE = {
+    "Warrior": lambda character: character["strength"] * 2,  # warrior_power_strike
+    "Mage": lambda character: character["magic"] * 2          # mage_fireball
+}
+
+
+def can_predict_special(character_class):
+    """
+    Check whether predict_battle can model a class's special ability
+
+    Returns: True if its damage is fixed (FIXED_SPECIAL_DAMAGE) and it puts
+             no status effect on anyone
+    """
+    if character_class not in FIXED_SPECIAL_DAMAGE:
+        return False
+    ability = get_class_ability(character_class)
+    return ability is None or not ability["status_effect"]
+
+
+def predict_battle(character, enemy, use_special=False, max_turns=MAX_TURNS):
+    """
+    Work out a battle's result without fighting it
+
+    With fixed damage every round, the player lands a killing blow on round
+    ceil(enemy_health / player_damage) and falls on round
+    ceil(health / enemy_damage); the player strikes first, so a tie goes to
+    the player. A special ability with a cooldown of c repeats the same
+    pattern every c + 1 rounds (one special, then c attacks), so its killing
+    round is found the same way per cycle. The result is what
+    simulate_battle gives with an AttackPolicy, or with a policy that uses
+    the special ability whenever it is ready.
+
+    Args:
+        character: Character dictionary (or Combatant)
+        enemy: Enemy dictionary (or Combatant)
+        use_special: Use the special ability whenever it is ready; only for
+                     classes can_predict_special accepts
+        max_turns: Rounds before the battle is called a draw
+
+    Returns: Battle result dictionary like simulate_battle's, plus
+             'enemy_health_left'
+    Raises: CharacterDeadError if character is already dead
+            ValueError if use_special is set for a class whose special
+            ability isn't fixed damage or has a status effect
+    """
+    health = character["health"]
+    enemy_health = enemy["health"]
+    if health <= 0:
+        raise CharacterDeadError("Character is already dead, cannot start battle.")
+
+    player_damage = attack_damage(character["strength"], enemy["strength"])
+    enemy_damage = attack_damage(enemy["strength"], character["strength"])
+
+    # Damage dealt on the first round of each cycle and on the others
+    first_damage = player_damage
+    cooldown = 0
+    if use_special:
+        if not can_predict_special(character.get("class")):
+            raise ValueError(f"{character.get('class')} special ability can't be predicted")
+        first_damage = FIXED_SPECIAL_DAMAGE[character.get("class")](character)
+        ability = get_class_ability(character.get("class"))
+        if ability is not None:
+            cooldown = ability["cooldown"]
+    cycle_damage = first_damage + player_damage * cooldown
+
+    # Rounds until each side is dead (a special for 0 damage never kills)
+    if enemy_health <= 0:
+        kill_round = 1
+    elif cycle_damage <= 0:
+        kill_round = max_turns + 1
+    else:
+        cycles = (enemy_health - 1) // cycle_damage
+        left = enemy_health - cycles * cycle_damage
+        kill_round = cycles * (cooldown + 1) + 1
+        if left > first_damage:
+            kill_round += -(-(left - first_damage) // player_damage)
+    death_round = -(-health // enemy_damage)
+
+    def dealt(rounds):
+        cycles, extra = divmod(rounds, cooldown + 1)
+        return cycles * cycle_damage + (first_damage + (extra - 1) * player_damage if extra else 0)
+
+    if kill_round <= death_round and kill_round <= max_turns:
+        winner, turns = "player", kill_round
+        # The enemy gets one attack fewer than the player
+        health -= enemy_damage * (kill_round - 1)
+        enemy_health = 0
+    elif death_round < kill_round and death_round <= max_turns:
+        winner, turns = "enemy", death_round
+        health = 0
+        enemy_health -= dealt(death_round)
+    else:
+        winner, turns = "none", max_turns
+        health -= enemy_damage * max_turns
+        enemy_health -= dealt(max_turns)
+
+    rewards = get_victory_rewards(enemy) if winner == "player" else {"xp": 0, "gold": 0}
+    return {
+        "winner": winner,
+        "xp_gained": rewards["xp"],
+        "gold_gained": rewards["gold"],
+        "turns": turns,
+        "health_left": health,
+        "enemy_health_left": enemy_health
+    }
+
 
 # ============================================================================
 # COMBAT UTILITIES
@@ -497,12 +1135,9 @@ def display_combat_stats(character, enemy):
     
 
 def display_battle_log(message):
-
-    message = "=== DUEL TIME!! ==="
     """
     Display a formatted battle message
     """
-    # TODO: Implement battle log display
     print(f">>> {message}")
     
 # ============================================================================
@@ -0,0 +1,112 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Cooldowns Module
+
+This module tracks which abilities are cooling down in a battle. Abilities
+on cooldown are kept in a dictionary (so checking one is a single lookup)
+and in a min-heap ordered by the turn they become ready (so advancing a turn
+only touches the cooldowns that end).
+"""
+
+import heapq
+import itertools
+
+from custom_exceptions import AbilityOnCooldownError
+
+# ============================================================================
+# COOLDOWN SCHEDULER
+# ============================================================================
+
+class CooldownScheduler:
+    """
+    Turn-indexed cooldowns for every combatant in one battle
+
+    Cooldowns are keyed by (owner, ability), where owner is any hashable
+    value identifying a combatant. An ability used on turn t with cooldown c
+    is ready again on turn t + c + 1.
+    """
+
+    def __init__(self, turn=0):
+        """
+        Args:
+            turn: Current battle turn
+        """
+        self.turn = turn
+        self._ready_turn = {}   # {(owner, ability): turn it is ready}
+        self._heap = []         # (ready turn, order started, owner, ability)
+        self._order = itertools.count()   # breaks ties so owners are never compared
+
+    def __len__(self):
+        """Number of abilities cooling down"""
+        return len(self._ready_turn)
+
+    def is_ready(self, owner, ability):
+        """Check whether an ability can be used this turn"""
+        return (owner, ability) not in self._ready_turn
+
+    def remaining(self, owner, ability):
+        """
+        Turns until an ability can be used again
+
+        Returns: 0 if it is ready now
+        """
+        ready_turn = self._ready_turn.get((owner, ability))
+        if ready_turn is None:
+            return 0
+        return ready_turn - self.turn
+
+    def start(self, owner, ability, cooldown):
+        """
+        Put an ability on cooldown from this turn
+
+        Args:
+            owner: Combatant the ability belongs to
+            ability: Ability ID
+            cooldown: Turns to wait before it can be used again (0 = none)
+        """
+        if cooldown <= 0:
+            return
+        ready_turn = self.turn + cooldown + 1
+        self._ready_turn[(owner, ability)] = ready_turn
+        heapq.heappush(self._heap, (ready_turn, next(self._order), owner, ability))
+
+    def use(self, owner, ability, cooldown):
+        """
+        Use an ability: check that it is ready, then start its cooldown
+
+        Raises: AbilityOnCooldownError if it is still cooling down
+        """
+        remaining = self.remaining(owner, ability)
+        if remaining:
+            raise AbilityOnCooldownError(f"{ability} is ready in {remaining} turn(s).")
+        self.start(owner, ability, cooldown)
+
+    def advance(self, turn=None):
+        """
+        Move the battle to a later turn, ending cooldowns that are over
+
+        Only the expired cooldowns are looked at, so this costs nothing on a
+        turn where no cooldown ends.
+
+        Args:
+            turn: Turn to move to (the next turn if None)
+
+        Returns: List of (owner, ability) pairs that became ready
+        """
+        self.turn = self.turn + 1 if turn is None else turn
+
+        heap = self._heap
+        expired = []
+        while heap and heap[0][0] <= self.turn:
+            ready_turn, _, owner, ability = heapq.heappop(heap)
+            key = (owner, ability)
+            # Skip entries left behind when a cooldown was restarted
+            if self._ready_turn.get(key) == ready_turn:
+                del self._ready_turn[key]
+                expired.append(key)
+        return expired
+
+    def clear(self):
+        """End every cooldown"""
+        self._ready_turn.clear()
+        self._heap.clear()
@@ -97,6 +97,13 @@ class QuestNotActiveError(QuestError):
     """Raised when trying to complete a quest that isn't active"""
     pass
 
+class QuestCycleError(QuestError):
+    """Raised when quest prerequisites loop back on themselves"""
+
+    def __init__(self, cycle):
+        self.cycle = tuple(cycle)
+        super().__init__("Quest prerequisite cycle: " + " -> ".join(self.cycle + self.cycle[:1]))
+
 # Inventory Exceptions
 class InventoryFullError(InventoryError):
     """Raised when trying to add items to a full inventory"""
@@ -0,0 +1,213 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Economy Simulator Module
+
+This module simulates the gold economy for a large population of characters
+so item costs and quest rewards can be tuned before changing the data files.
+Characters are stored as NumPy arrays and every day is one vectorized step.
+
+Requires NumPy.
+"""
+
+import numpy as np
+
+import game_data
+import quest_handler
+from inventory_system import MAX_INVENTORY_SIZE
+
+# ============================================================================
+# POLICY
+# ============================================================================
+
+class EconomyPolicy:
+    """
+    How simulated characters spend their day
+
+    Each day every character takes one action, chosen with these chances:
+    buy a random catalog item, sell a random owned item, work on their next
+    quest, or do nothing (the remaining chance).
+    """
+
+    def __init__(self, buy_chance=0.3, sell_chance=0.1, quest_chance=0.2, starting_gold=100):
+        if buy_chance + sell_chance + quest_chance > 1:
+            raise ValueError("Action chances cannot add up to more than 1")
+        self.buy_chance = buy_chance
+        self.sell_chance = sell_chance
+        self.quest_chance = quest_chance
+        self.starting_gold = starting_gold
+
+# ============================================================================
+# SIMULATION
+# ============================================================================
+
+def simulate_economy(num_characters, days, item_data_dict=None, quest_data_dict=None,
+                     policy=None, seed=0):
+    """
+    Simulate the economy day by day
+
+    Args:
+        num_characters: Population size
+        days: Number of days to simulate
+        item_data_dict: Item catalog (loaded from data/items.txt if None)
+        quest_data_dict: Quest catalog (loaded from data/quests.txt if None)
+        policy: EconomyPolicy (default chances if None)
+        seed: Random seed; the same seed gives the same result
+
+    Rules follow the game: purchases cost the item's COST, sales return
+    cost // 2, quests pay REWARD_GOLD/REWARD_XP once the character meets the
+    required level, and inventories hold at most MAX_INVENTORY_SIZE slots,
+    where up to STACK_SIZE of an item share a slot.
+
+    Returns: Dictionary with per-day arrays 'money_supply', 'mean_gold',
+             'median_gold', 'inflation', 'gold_created', 'gold_destroyed',
+             plus 'final_gold', 'gold_percentiles' and 'gini'
+    Raises: QuestCycleError if quest prerequisites loop back on themselves
+    """
+    if item_data_dict is None:
+        item_data_dict = game_data.load_items()
+    if quest_data_dict is None:
+        quest_data_dict = game_data.load_quests()
+    if policy is None:
+        policy = EconomyPolicy()
+
+    rng = np.random.default_rng(seed)
+    n = num_characters
+
+    # Catalog as arrays
+    costs = np.array([item["cost"] for item in item_data_dict.values()], dtype=np.int64)
+    sell_prices = costs // 2
+    stack_sizes = np.array([item.get("stack_size", 1) for item in item_data_dict.values()], dtype=np.int64)
+    num_items = len(costs)
+
+    # Quests in prerequisite order, as the game's quest graph orders them
+    quest_order = quest_handler.get_quest_graph(quest_data_dict).order
+    quest_levels = np.array([quest_data_dict[q]["required_level"] for q in quest_order] + [0], dtype=np.int64)
+    quest_gold = np.array([quest_data_dict[q]["reward_gold"] for q in quest_order] + [0], dtype=np.int64)
+    quest_xp = np.array([quest_data_dict[q]["reward_xp"] for q in quest_order] + [0], dtype=np.int64)
+    num_quests = len(quest_order)
+
+    # Population as arrays
+    gold = np.full(n, policy.starting_gold, dtype=np.int64)
+    level = np.ones(n, dtype=np.int64)
+    experience = np.zeros(n, dtype=np.int64)
+    next_quest = np.zeros(n, dtype=np.int64)
+    owned = np.zeros((n, max(num_items, 1)), dtype=np.int16)
+    slots = np.zeros(n, dtype=np.int16)
+
+    money_supply = np.empty(days, dtype=np.int64)
+    mean_gold = np.empty(days)
+    median_gold = np.empty(days)
+    gold_created = np.zeros(days, dtype=np.int64)
+    gold_destroyed = np.zeros(days, dtype=np.int64)
+
+    buy_limit = policy.buy_chance
+    sell_limit = buy_limit + policy.sell_chance
+    quest_limit = sell_limit + policy.quest_chance
+
+    for day in range(days):
+        roll = rng.random(n)
+        item_pick = rng.integers(0, max(num_items, 1), size=n)
+
+        # BUY: enough gold and room on a stack or a free slot
+        if num_items:
+            rows = np.flatnonzero(roll < buy_limit)
+            items = item_pick[rows]
+            # Stacks are kept full, so a new slot is needed when they all are
+            new_slot = owned[rows, items] % stack_sizes[items] == 0
+            ok = (gold[rows] >= costs[items]) & (slots[rows] + new_slot <= MAX_INVENTORY_SIZE)
+            rows, items, new_slot = rows[ok], items[ok], new_slot[ok]
+            gold[rows] -= costs[items]
+            owned[rows, items] += 1
+            slots[rows] += new_slot
+            gold_destroyed[day] = costs[items].sum()
+
+        # SELL: only items the character owns, for half price
+        if num_items:
+            rows = np.flatnonzero((roll >= buy_limit) & (roll < sell_limit))
+            items = item_pick[rows]
+            ok = owned[rows, items] > 0
+            rows, items = rows[ok], items[ok]
+            gold[rows] += sell_prices[items]
+            owned[rows, items] -= 1
+            # Selling the last item of a stack frees its slot
+            slots[rows] -= owned[rows, items] % stack_sizes[items] == 0
+            gold_created[day] += sell_prices[items].sum()
+
+        # QUEST: next quest in the chain, once the level requirement is met
+        rows = np.flatnonzero((roll >= sell_limit) & (roll < quest_limit))
+        quests = next_quest[rows]
+        ok = (quests < num_quests) & (level[rows] >= quest_levels[quests])
+        rows, quests = rows[ok], quests[ok]
+        gold[rows] += quest_gold[quests]
+        experience[rows] += quest_xp[quests]
+        next_quest[rows] += 1
+        gold_created[day] += quest_gold[quests].sum()
+        _level_up(rows, level, experience)
+
+        money_supply[day] = gold.sum()
+        mean_gold[day] = money_supply[day] / n
+        median_gold[day] = np.median(gold)
+
+    # Inflation: day-over-day growth of the money supply
+    previous = np.concatenate(([policy.starting_gold * n], money_supply[:-1]))
+    inflation = np.divide(money_supply - previous, previous,
+                          out=np.zeros(days), where=previous != 0)
+
+    percentiles = (10, 25, 50, 75, 90, 99)
+    return {
+        "money_supply": money_supply,
+        "mean_gold": mean_gold,
+        "median_gold": median_gold,
+        "inflation": inflation,
+        "gold_created": gold_created,
+        "gold_destroyed": gold_destroyed,
+        "final_gold": gold,
+        "gold_percentiles": dict(zip(percentiles, np.percentile(gold, percentiles))),
+        "gini": gini_coefficient(gold)
+    }
+
+# ============================================================================
+# HELPER FUNCTIONS
+# ============================================================================
+
+def gini_coefficient(values):
+    """
+    Gini coefficient of a gold distribution
+
+    Returns: Float between 0 (everyone equal) and 1 (one character has it all)
+    """
+    values = np.sort(np.asarray(values, dtype=np.float64))
+    total = values.sum()
+    if len(values) == 0 or total == 0:
+        return 0.0
+    ranks = np.arange(1, len(values) + 1)
+    return float((2 * ranks - len(values) - 1) @ values / (len(values) * total))
+
+
+def _level_up(rows, level, experience):
+    """Apply gain_experience's level-up rule to the given characters"""
+    while len(rows):
+        needed = level[rows] * 100
+        ready = experience[rows] >= needed
+        rows, needed = rows[ready], needed[ready]
+        experience[rows] -= needed
+        level[rows] += 1
+
+
+# ============================================================================
+# TESTING
+# ============================================================================
+
+if __name__ == "__main__":
+    import time
+
+    print("=== ECONOMY SIMULATOR TEST ===")
+
+    start = time.perf_counter()
+    report = simulate_economy(100_000, 10)
+    elapsed = time.perf_counter() - start
+
+    print(f"Simulated 1,000,000 character-days in {elapsed:.2f}s")
+    print(f"Mean gold on last day: {report['mean_gold'][-1]:.1f}")
+    print(f"Daily inflation: {report['inflation'].round(4)}")
+    print(f"Gini: {report['gini']:.3f}")
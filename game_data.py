@@ -11,12 +11,67 @@ This module handles loading and validating game data from text files.
 """
 
 import os
+import status_effects
 from custom_exceptions import (
     InvalidDataFormatError,
     MissingDataFileError,
     CorruptedDataError
 )
 
+# ============================================================================
+# ITEM ID INTERNING
+# ============================================================================
+
+# Catalog-wide table mapping item IDs to small integers (and back).
+# Filled by load_items(); unknown IDs are added the first time they are seen.
+_item_ids = []
+_item_index = {}
+
+# How many of each item fit in one inventory slot (from STACK_SIZE; default 1)
+_stack_sizes = {}
+
+
+def intern_item_id(item_id):
+    """
+    Get the integer index for an item ID, adding it to the table if new
+
+    Returns: Integer index
+    """
+    index = _item_index.get(item_id)
+    if index is None:
+        index = len(_item_ids)
+        _item_index[item_id] = index
+        _item_ids.append(item_id)
+    return index
+
+
+def lookup_item_index(item_id):
+    """
+    Get the integer index for an item ID without adding it
+
+    Returns: Integer index, or None if the ID has never been interned
+    """
+    return _item_index.get(item_id)
+
+
+def item_id_from_index(index):
+    """
+    Get the item ID for an interned index
+
+    Returns: Item ID string
+    """
+    return _item_ids[index]
+
+
+def get_stack_size(item_id):
+    """
+    Get how many of an item can share one inventory slot
+
+    Returns: Integer stack size (1 for items that don't stack or aren't loaded)
+    """
+    return _stack_sizes.get(item_id, 1)
+
+
 # ============================================================================
 # DATA LOADING FUNCTIONS
 # ============================================================================
@@ -33,6 +88,7 @@ def load_quests(filename="data/quests.txt"):
     REWARD_GOLD: 50
     REQUIRED_LEVEL: 1
     PREREQUISITE: previous_quest_id (or NONE)
+    OBJECTIVE: enemy_defeated:goblin:3 (optional, see parse_quest_objective)
     
     Returns: Dictionary of quests {quest_id: quest_data_dict}
     Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
@@ -77,6 +133,8 @@ def load_quests(filename="data/quests.txt"):
                     value = int(value)
                 except ValueError:
                     raise InvalidDataFormatError(f"Expected integer for {key}, got '{value}'")
+            elif key == "OBJECTIVE":
+                value = parse_quest_objective(value)
             current_quest[key] = value
 
     except InvalidDataFormatError:
@@ -93,6 +151,36 @@ def load_quests(filename="data/quests.txt"):
     # - Corrupted/unreadable data → raise CorruptedDataError
     
 
+def parse_quest_objective(text):
+    """
+    Parse a quest OBJECTIVE field
+
+    Format: "event:targets:count", where targets is one target or several
+    separated by "|", and "*" matches any target. For example
+    "enemy_defeated:goblin:3" or "item_purchased:weapon|armor:1".
+
+    Returns: Dictionary with 'event', 'targets' (tuple) and 'count'
+    Raises: InvalidDataFormatError if the objective is malformed
+    """
+    parts = text.split(":")
+    if len(parts) != 3 or not parts[0] or not parts[1]:
+        raise InvalidDataFormatError(f"Objective must be 'event:targets:count', got '{text}'")
+
+    event, targets, count = parts
+    try:
+        count = int(count)
+    except ValueError:
+        raise InvalidDataFormatError(f"Expected integer count in objective, got '{count}'")
+    if count < 1:
+        raise InvalidDataFormatError(f"Objective count must be at least 1, got {count}")
+
+    return {
+        "event": event,
+        "targets": tuple(target.strip().lower() for target in targets.split("|")),
+        "count": count
+    }
+
+
 def load_items(filename="data/items.txt"):
     """
     Load item data from file
@@ -101,9 +189,12 @@ def load_items(filename="data/items.txt"):
     ITEM_ID: unique_item_name
     NAME: Item Display Name
     TYPE: weapon|armor|consumable
-    EFFECT: stat_name:value (e.g., strength:5 or health:20)
+    EFFECT: stat_name:value (e.g., strength:5 or health:20), or for
+            consumables used in battle a status effect effect:amount:turns
+            (e.g., regen:5:4)
     COST: 100
     DESCRIPTION: Item description
+    STACK_SIZE: 10 (optional, defaults to 1)
     
     Returns: Dictionary of items {item_id: item_data_dict}
     Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
@@ -131,6 +222,7 @@ def load_items(filename="data/items.txt"):
                         if field not in current_item:
                             raise InvalidDataFormatError(f"Missing field '{field}' in item")
                     item_id = current_item["ITEM_ID"]
+                    current_item.setdefault("STACK_SIZE", 1)
                     # Normalize keys to lowercase
                     normalized_item = {k.lower(): v for k, v in current_item.items()}
                     items[item_id] = normalized_item
@@ -143,11 +235,18 @@ def load_items(filename="data/items.txt"):
             key, value = line.split(": ", 1)
             key = key.strip()
             value = value.strip()
-            if key == "COST":
+            if key in ["COST", "STACK_SIZE"]:
                 try:
                     value = int(value)
                 except ValueError:
-                    raise InvalidDataFormatError(f"Expected integer for COST, got '{value}'")
+                    raise InvalidDataFormatError(f"Expected integer for {key}, got '{value}'")
+                if key == "STACK_SIZE" and value < 1:
+                    raise InvalidDataFormatError(f"STACK_SIZE must be at least 1, got {value}")
+            elif key == "EFFECT":
+                try:
+                    status_effects.compile_status_effect(value)
+                except ValueError as e:
+                    raise InvalidDataFormatError(f"Invalid EFFECT '{value}': {e}")
             current_item[key] = value
 
     except InvalidDataFormatError:
@@ -155,8 +254,142 @@ def load_items(filename="data/items.txt"):
     except Exception as e:
         raise CorruptedDataError(f"Could not read item file: {e}")
 
+    # Give every catalog item its integer ID and stack size up front
+    for item_id, item in items.items():
+        intern_item_id(item_id)
+        _stack_sizes[item_id] = item["stack_size"]
+
     return items
 
+
+def load_enemies(filename="data/enemies.txt"):
+    """
+    Load enemy templates from file
+
+    Expected format per enemy (separated by blank lines):
+    ENEMY_ID: unique_enemy_name
+    NAME: Enemy Display Name
+    HEALTH: 50
+    STRENGTH: 8
+    MAGIC: 2
+    XP_REWARD: 25
+    GOLD_REWARD: 10
+
+    Returns: Dictionary of enemies {enemy_id: enemy_data_dict}, IDs lowercase
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    if not os.path.exists(filename):
+        raise MissingDataFileError(f"Enemy file not found: {filename}")
+
+    enemies = {}
+    try:
+        with open(filename, "r") as f:
+            lines = f.read().splitlines()
+
+        current_enemy = {}
+        for line in lines + [""]:
+            line = line.strip()
+            if line == "":
+                if current_enemy:
+                    required_fields = ["ENEMY_ID", "NAME", "HEALTH", "STRENGTH",
+                                       "MAGIC", "XP_REWARD", "GOLD_REWARD"]
+                    for field in required_fields:
+                        if field not in current_enemy:
+                            raise InvalidDataFormatError(f"Missing field '{field}' in enemy")
+                    if current_enemy["HEALTH"] < 1:
+                        raise InvalidDataFormatError(f"HEALTH must be at least 1, got {current_enemy['HEALTH']}")
+                    enemy_id = current_enemy["ENEMY_ID"].lower()
+                    normalized_enemy = {k.lower(): v for k, v in current_enemy.items()}
+                    normalized_enemy["enemy_id"] = enemy_id
+                    enemies[enemy_id] = normalized_enemy
+                    current_enemy = {}
+                continue
+
+            if ": " not in line:
+                raise InvalidDataFormatError(f"Invalid line format: {line}")
+
+            key, value = line.split(": ", 1)
+            key = key.strip()
+            value = value.strip()
+            if key in ["HEALTH", "STRENGTH", "MAGIC", "XP_REWARD", "GOLD_REWARD"]:
+                try:
+                    value = int(value)
+                except ValueError:
+                    raise InvalidDataFormatError(f"Expected integer for {key}, got '{value}'")
+            current_enemy[key] = value
+
+    except InvalidDataFormatError:
+        raise
+    except Exception as e:
+        raise CorruptedDataError(f"Could not read enemy file: {e}")
+
+    return enemies
+
+
+def load_abilities(filename="data/abilities.txt"):
+    """
+    Load class special abilities from file
+
+    Expected format per ability (separated by blank lines):
+    ABILITY_ID: unique_ability_name
+    CLASS: Warrior|Mage|Rogue|Cleric
+    NAME: Ability Display Name
+    COOLDOWN: 2 (turns to wait before using it again; 0 = every turn)
+    EFFECT: poison:3:3 (optional status effect, effect:amount:turns)
+    DESCRIPTION: Ability description
+
+    Returns: Dictionary of abilities {ability_id: ability_data_dict}
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    if not os.path.exists(filename):
+        raise MissingDataFileError(f"Ability file not found: {filename}")
+
+    abilities = {}
+    try:
+        with open(filename, "r") as f:
+            lines = f.read().splitlines()
+
+        current_ability = {}
+        for line in lines + [""]:
+            line = line.strip()
+            if line == "":
+                if current_ability:
+                    required_fields = ["ABILITY_ID", "CLASS", "NAME", "COOLDOWN", "DESCRIPTION"]
+                    for field in required_fields:
+                        if field not in current_ability:
+                            raise InvalidDataFormatError(f"Missing field '{field}' in ability")
+                    ability_id = current_ability["ABILITY_ID"]
+                    abilities[ability_id] = {k.lower(): v for k, v in current_ability.items()}
+                    current_ability = {}
+                continue
+
+            if ": " not in line:
+                raise InvalidDataFormatError(f"Invalid line format: {line}")
+
+            key, value = line.split(": ", 1)
+            key = key.strip()
+            value = value.strip()
+            if key == "COOLDOWN":
+                try:
+                    value = int(value)
+                except ValueError:
+                    raise InvalidDataFormatError(f"Expected integer for {key}, got '{value}'")
+                if value < 0:
+                    raise InvalidDataFormatError(f"COOLDOWN cannot be negative, got {value}")
+            elif key == "EFFECT":
+                try:
+                    status_effects.parse_status_effect(value)
+                except ValueError as e:
+                    raise InvalidDataFormatError(f"Invalid EFFECT '{value}': {e}")
+            current_ability[key] = value
+
+    except InvalidDataFormatError:
+        raise
+    except Exception as e:
+        raise CorruptedDataError(f"Could not read ability file: {e}")
+
+    return abilities
+
     
 
 def validate_quest_data(quest_dict):
@@ -262,6 +495,68 @@ def create_default_data_files():
         except PermissionError:
             print("Permission denied: Cannot create default items.txt")
 
+    # Default enemies file
+    enemies_file = os.path.join(data_dir, "enemies.txt")
+    if not os.path.exists(enemies_file):
+        try:
+            with open(enemies_file, "w") as f:
+                f.write(
+                    "ENEMY_ID: goblin\n"
+                    "NAME: Goblin\n"
+                    "HEALTH: 30\n"
+                    "STRENGTH: 5\n"
+                    "MAGIC: 0\n"
+                    "XP_REWARD: 10\n"
+                    "GOLD_REWARD: 5\n\n"
+                    "ENEMY_ID: orc\n"
+                    "NAME: Orc\n"
+                    "HEALTH: 50\n"
+                    "STRENGTH: 12\n"
+                    "MAGIC: 2\n"
+                    "XP_REWARD: 20\n"
+                    "GOLD_REWARD: 12\n\n"
+                    "ENEMY_ID: dragon\n"
+                    "NAME: Dragon\n"
+                    "HEALTH: 200\n"
+                    "STRENGTH: 25\n"
+                    "MAGIC: 15\n"
+                    "XP_REWARD: 200\n"
+                    "GOLD_REWARD: 100\n\n"
+                )
+        except PermissionError:
+            print("Permission denied: Cannot create default enemies.txt")
+
+    # Default abilities file
+    abilities_file = os.path.join(data_dir, "abilities.txt")
+    if not os.path.exists(abilities_file):
+        try:
+            with open(abilities_file, "w") as f:
+                f.write(
+                    "ABILITY_ID: power_strike\n"
+                    "CLASS: Warrior\n"
+                    "NAME: Power Strike\n"
+                    "COOLDOWN: 2\n"
+                    "DESCRIPTION: Double strength damage\n\n"
+                    "ABILITY_ID: fireball\n"
+                    "CLASS: Mage\n"
+                    "NAME: Fireball\n"
+                    "COOLDOWN: 2\n"
+                    "DESCRIPTION: Double magic damage\n\n"
+                    "ABILITY_ID: critical_strike\n"
+                    "CLASS: Rogue\n"
+                    "NAME: Critical Strike\n"
+                    "COOLDOWN: 1\n"
+                    "EFFECT: poison:3:3\n"
+                    "DESCRIPTION: Triple strength damage half of the time, and poison\n\n"
+                    "ABILITY_ID: heal\n"
+                    "CLASS: Cleric\n"
+                    "NAME: Heal\n"
+                    "COOLDOWN: 3\n"
+                    "DESCRIPTION: Restore 30 health\n\n"
+                )
+        except PermissionError:
+            print("Permission denied: Cannot create default abilities.txt")
+
 
     # TODO: Implement this function
     # Create data/ directory if it doesn't exist
@@ -0,0 +1,201 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Gold Ledger Module
+
+This module keeps an append-only record of every change to a character's gold.
+Entries are held in compact arrays and written to disk in batches.
+"""
+
+import os
+import threading
+import time
+from array import array
+
+# ============================================================================
+# REASON CODES
+# ============================================================================
+
+# Why the gold changed (stored as one byte per entry)
+REASON_ADJUSTMENT = 0
+REASON_PURCHASE = 1
+REASON_SALE = 2
+REASON_QUEST_REWARD = 3
+REASON_BATTLE_REWARD = 4
+REASON_REVIVE = 5
+
+REASON_NAMES = (
+    "adjustment",
+    "purchase",
+    "sale",
+    "quest_reward",
+    "battle_reward",
+    "revive"
+)
+
+# Entries kept in memory before they are written out
+DEFAULT_BATCH_SIZE = 1024
+
+# ============================================================================
+# LEDGER
+# ============================================================================
+
+class GoldLedger:
+    """
+    Append-only gold ledger
+
+    Each entry is (timestamp, character, delta, reason). Pending entries live
+    in four parallel arrays; once batch_size of them pile up they are appended
+    to the ledger file and folded into the hourly totals.
+    """
+
+    def __init__(self, filepath="data/gold_ledger.csv", batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Args:
+            filepath: File the batches are appended to (None = memory only)
+            batch_size: Number of pending entries that triggers a flush
+        """
+        self.filepath = filepath
+        self.batch_size = batch_size
+
+        # Pending entries, one array per column
+        self._times = array("d")
+        self._characters = array("I")
+        self._deltas = array("q")
+        self._reasons = array("B")
+
+        # Character names are stored once and referenced by index
+        self._character_ids = {}
+        self._character_names = []
+
+        # Totals for everything already flushed: {(hour, reason): [gold_in, gold_out]}
+        self._hourly = {}
+
+        self._next_flush = batch_size
+        self.flushed_count = 0
+
+        # The four columns must grow together, even with several threads recording
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Number of entries not yet flushed"""
+        return len(self._deltas)
+
+    def record(self, character_name, delta, reason=REASON_ADJUSTMENT):
+        """
+        Append one gold change
+
+        Args:
+            character_name: Name of the character whose gold changed
+            delta: Gold gained (positive) or spent (negative)
+            reason: One of the REASON_* codes
+        """
+        with self._lock:
+            character_id = self._character_ids.get(character_name)
+            if character_id is None:
+                character_id = len(self._character_names)
+                self._character_ids[character_name] = character_id
+                self._character_names.append(character_name)
+
+            self._times.append(time.time())
+            self._characters.append(character_id)
+            self._deltas.append(delta)
+            self._reasons.append(reason)
+
+            if len(self._deltas) >= self._next_flush:
+                self._flush()
+
+    def flush(self):
+        """
+        Write pending entries to the ledger file and fold them into the totals
+
+        If the file cannot be written the entries stay pending and the next
+        attempt is put off until another full batch has arrived.
+
+        Returns: Number of entries flushed
+        """
+        with self._lock:
+            return self._flush()
+
+    def _flush(self):
+        count = len(self._deltas)
+        if count == 0:
+            return 0
+
+        if self.filepath:
+            names = self._character_names
+            lines = [
+                f"{t:.3f},{names[c]},{d},{REASON_NAMES[r]}\n"
+                for t, c, d, r in zip(self._times, self._characters, self._deltas, self._reasons)
+            ]
+            try:
+                directory = os.path.dirname(self.filepath)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.filepath, "a") as f:
+                    f.writelines(lines)
+            except OSError:
+                self._next_flush = count + self.batch_size
+                return 0
+
+        _add_hourly(self._hourly, self._times, self._deltas, self._reasons)
+
+        del self._times[:]
+        del self._characters[:]
+        del self._deltas[:]
+        del self._reasons[:]
+
+        self._next_flush = self.batch_size
+        self.flushed_count += count
+        return count
+
+    def gold_flow_by_reason_per_hour(self):
+        """
+        Total gold in and out per reason for each hour
+
+        Covers flushed and pending entries.
+
+        Returns: Dictionary {(hour_start, reason_name): {'gold_in', 'gold_out', 'net'}}
+                 where hour_start is a Unix timestamp on the hour
+        """
+        with self._lock:
+            totals = {key: list(value) for key, value in self._hourly.items()}
+            _add_hourly(totals, self._times, self._deltas, self._reasons)
+
+        return {
+            (hour * 3600, REASON_NAMES[reason]): {
+                "gold_in": gold_in,
+                "gold_out": gold_out,
+                "net": gold_in - gold_out
+            }
+            for (hour, reason), (gold_in, gold_out) in sorted(totals.items())
+        }
+
+
+def _add_hourly(totals, times, deltas, reasons):
+    """Fold entries into {(hour, reason): [gold_in, gold_out]} totals"""
+    for t, delta, reason in zip(times, deltas, reasons):
+        key = (int(t // 3600), reason)
+        bucket = totals.get(key)
+        if bucket is None:
+            bucket = totals[key] = [0, 0]
+        if delta >= 0:
+            bucket[0] += delta
+        else:
+            bucket[1] -= delta
+
+# ============================================================================
+# DEFAULT LEDGER
+# ============================================================================
+
+# Ledger shared by the game's gold-changing functions
+default_ledger = GoldLedger()
+
+
+def record_gold_change(character, delta, reason=REASON_ADJUSTMENT):
+    """
+    Record a gold change for a character in the default ledger
+
+    Zero changes are not recorded.
+    """
+    if delta:
+        default_ledger.record(character.get("name", ""), delta, reason)
@@ -9,16 +9,214 @@ AI Usage: This code was developed with assistance from ChatGPT for structure, lo
 This module handles inventory management, item usage, and equipment.
 """
 
+from array import array
+from bisect import bisect_right
+from collections import Counter
+from collections.abc import MutableSequence
+import game_data
+import gold_ledger
+import quest_handler
+import status_effects
 from custom_exceptions import (
     InventoryFullError,
     ItemNotFoundError,
     InsufficientResourcesError,
-    InvalidItemTypeError
+    InvalidItemTypeError,
+    CombatNotActiveError
 )
 
 # Maximum inventory size
 MAX_INVENTORY_SIZE = 20
 
+# ============================================================================
+# INVENTORY STORAGE
+# ============================================================================
+
+class Inventory(MutableSequence):
+    """
+    Compact, stackable inventory backed by arrays of interned item IDs
+
+    Items are kept in slots of (item_id, quantity). A slot holds up to the
+    item's stack size from the catalog (game_data.get_stack_size), and
+    MAX_INVENTORY_SIZE limits the number of slots, not the number of items.
+
+    Each slot is two 2-byte integers (an index from game_data's item ID table
+    and a quantity) rather than one string reference per item. Reads still
+    behave like a list of item ID strings with one entry per item, and saving
+    writes "item_id*quantity" entries (see character_manager.save_character).
+    """
+
+    __slots__ = ("_ids", "_qty")
+
+    def __init__(self, item_ids=()):
+        self._ids = array("H")
+        self._qty = array("H")
+        for item_id in item_ids:
+            self.append(item_id)
+
+    @classmethod
+    def from_save_entries(cls, entries):
+        """
+        Build an inventory from saved "item_id*quantity" entries
+
+        Entries without a quantity (older saves) count as one item.
+        """
+        inventory = cls()
+        for entry in entries:
+            item_id, _, quantity = entry.partition("*")
+            for _ in range(int(quantity or 1)):
+                inventory.append(item_id)
+        return inventory
+
+    def save_entries(self):
+        """Return the slots as "item_id*quantity" strings for saving"""
+        return [item_id if qty == 1 else f"{item_id}*{qty}" for item_id, qty in self.slots()]
+
+    def _store(self, item_id):
+        """Interned index for item_id, widening the array if it won't fit"""
+        index = game_data.intern_item_id(item_id)
+        if index > 0xFFFF and self._ids.typecode == "H":
+            self._ids = array("I", self._ids)
+        return index
+
+    def _last_slot(self, index):
+        """
+        Position of the last slot holding this item, or None
+
+        Items always go into an existing partial stack first and come out of
+        the last stack, so only the last slot of an item can be partial.
+        """
+        ids = self._ids
+        for position in range(len(ids) - 1, -1, -1):
+            if ids[position] == index:
+                return position
+        return None
+
+    # --- slots ---
+
+    def slot_count(self):
+        """Number of slots in use"""
+        return len(self._ids)
+
+    def slots(self):
+        """Return the slots as a list of (item_id, quantity) tuples"""
+        item_id_from_index = game_data.item_id_from_index
+        return [(item_id_from_index(i), q) for i, q in zip(self._ids, self._qty)]
+
+    def room_for(self, item_id, max_slots):
+        """
+        How many more of item_id fit, topping up its stack then using free slots
+
+        Returns: Integer number of items
+        """
+        limit = game_data.get_stack_size(item_id)
+        room = max(max_slots - len(self._ids), 0) * limit
+
+        index = game_data.lookup_item_index(item_id)
+        if index is not None:
+            position = self._last_slot(index)
+            if position is not None:
+                room += max(limit - self._qty[position], 0)
+        return room
+
+    # --- list-like reads (one entry per item) ---
+
+    def __len__(self):
+        return sum(self._qty)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return list(self)[position]
+        if position < 0:
+            position += len(self)
+        if position >= 0:
+            for index, qty in zip(self._ids, self._qty):
+                if position < qty:
+                    return game_data.item_id_from_index(index)
+                position -= qty
+        raise IndexError("inventory index out of range")
+
+    def __iter__(self):
+        item_id_from_index = game_data.item_id_from_index
+        for index, qty in zip(self._ids, self._qty):
+            item_id = item_id_from_index(index)
+            for _ in range(qty):
+                yield item_id
+
+    def __contains__(self, item_id):
+        index = game_data.lookup_item_index(item_id)
+        return index is not None and index in self._ids
+
+    def count(self, item_id):
+        index = game_data.lookup_item_index(item_id)
+        if index is None or index not in self._ids:
+            return 0
+        return sum(q for i, q in zip(self._ids, self._qty) if i == index)
+
+    def __eq__(self, other):
+        if isinstance(other, Inventory):
+            return self.slots() == other.slots()
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Inventory({self.slots()!r})"
+
+    # --- list-like writes ---
+
+    def append(self, item_id):
+        index = self._store(item_id)
+        limit = game_data.get_stack_size(item_id)
+        if limit > 1:
+            position = self._last_slot(index)
+            if position is not None and self._qty[position] < limit:
+                self._qty[position] += 1
+                return
+        self._ids.append(index)
+        self._qty.append(1)
+
+    def remove(self, item_id):
+        index = game_data.lookup_item_index(item_id)
+        position = None if index is None else self._last_slot(index)
+        if position is None:
+            raise ValueError(f"{item_id!r} not in inventory")
+        if self._qty[position] > 1:
+            self._qty[position] -= 1
+        else:
+            del self._ids[position]
+            del self._qty[position]
+
+    def clear(self):
+        del self._ids[:]
+        del self._qty[:]
+
+    def _rebuild(self, item_ids):
+        """Replace the contents with item_ids, restacking them"""
+        self.clear()
+        for item_id in item_ids:
+            self.append(item_id)
+
+    # Positional edits are rare; they go through a plain list and restack
+
+    def __setitem__(self, position, value):
+        items = list(self)
+        items[position] = value
+        self._rebuild(items)
+
+    def __delitem__(self, position):
+        items = list(self)
+        del items[position]
+        self._rebuild(items)
+
+    def insert(self, position, item_id):
+        items = list(self)
+        items.insert(position, item_id)
+        self._rebuild(items)
+
+
 # ============================================================================
 # INVENTORY MANAGEMENT
 # ============================================================================
@@ -32,6 +230,8 @@ def add_item_to_inventory(character, item_id):
         character: Character dictionary
         item_id: Unique item identifier
     
+    Stackable items go onto an existing stack before taking a new slot.
+    
     Returns: True if added successfully
     Raises: InventoryFullError if inventory is at max capacity
     """
@@ -39,14 +239,15 @@ def add_item_to_inventory(character, item_id):
     # Check if inventory is full (>= MAX_INVENTORY_SIZE)
     # Add item_id to character['inventory'] list
 
-    inventory = character.get("inventory", []) # checks character inventory
+    with _lock_for(character):
+        inventory = character.get("inventory", []) # checks character inventory
 
-    if len(inventory) >= MAX_INVENTORY_SIZE:
-        raise InventoryFullError("Character inventory at maximum capacity. Unable to add more items")
+        if _room_for(inventory, item_id) < 1:
+            raise InventoryFullError("Character inventory at maximum capacity. Unable to add more items")
     
-    inventory.append(item_id)
+        inventory.append(item_id)
 
-    character["inventory"] = inventory
+        character["inventory"] = inventory
     
 
 def remove_item_from_inventory(character, item_id):
@@ -64,17 +265,18 @@ def remove_item_from_inventory(character, item_id):
     # Check if item exists in inventory
     # Remove item from list
 
-    inventory = character.get("inventory", [])
+    with _lock_for(character):
+        inventory = character.get("inventory", [])
 
-    # Check if item exists
-    if item_id not in inventory:
-        raise ItemNotFoundError(f"Item '{item_id}' not found in inventory.")
+        # Check if item exists
+        if item_id not in inventory:
+            raise ItemNotFoundError(f"Item '{item_id}' not found in inventory.")
 
-    # Remove it
-    inventory.remove(item_id)
-    character["inventory"] = inventory
+        # Remove it
+        inventory.remove(item_id)
+        character["inventory"] = inventory
 
-    return True
+        return True
 
     
 
@@ -99,6 +301,8 @@ def count_item(character, item_id):
     """
     Count how many of a specific item the character has
     
+    Counts every item in every stack, not slots.
+    
     Returns: Integer count of item
     """
     # TODO: Implement item counting
@@ -112,9 +316,11 @@ def get_inventory_space_remaining(character):
     """
     Calculate how many more items can fit in inventory
     
+    Counts free slots; room left on partial stacks is not included.
+    
     Returns: Integer representing available slots
     """
-    current_size = len(character["inventory"])
+    current_size = _slots_used(character["inventory"])
     return MAX_INVENTORY_SIZE - current_size
 
     # TODO: Implement space calculation
@@ -140,7 +346,7 @@ def clear_inventory(character):
 # ITEM USAGE
 # ============================================================================
 
-def use_item(character, item_id, item_data):
+def use_item(character, item_id, item_data, battle=None):
     """
     Use a consumable item from inventory
     
@@ -148,15 +354,20 @@ def use_item(character, item_id, item_data):
         character: Character dictionary
         item_id: Item to use
         item_data: Item information dictionary from game_data
+        battle: SimpleBattle the character is fighting in, if any (ignored
+                once the battle is over)
     
     Item types and effects:
     - consumable: Apply effect and remove from inventory
+    - consumable with a status effect (e.g. "regen:5:4"): only in battle;
+      puts the effect on the character, or on the enemy if it is harmful
     - weapon/armor: Cannot be "used", only equipped
     
     Returns: String describing what happened
     Raises: 
         ItemNotFoundError if item not in inventory
         InvalidItemTypeError if item type is not 'consumable'
+        CombatNotActiveError if a status effect item is used outside battle
     """
     # TODO: Implement item usage
     # Check if character has the item
@@ -165,21 +376,36 @@ def use_item(character, item_id, item_data):
     # Apply effect to character
     # Remove item from inventory
 
-    if item_id not in character["inventory"]:
-        raise ItemNotFoundError(f"Item '{item_id}' not found in inventory")
+    with _lock_for(character):
+        if item_id not in character["inventory"]:
+            raise ItemNotFoundError(f"Item '{item_id}' not found in inventory")
 
-    if item_data["type"] != "consumable":
-        raise InvalidItemTypeError("Item type cannot be used")
+        if item_data["type"] != "consumable":
+            raise InvalidItemTypeError("Item type cannot be used")
 
-    # Parse effect such as "health:20"
-    stat, value = item_data["effect"].split(":")
-    value = int(value)
+        # A battle that has ended is treated as no battle
+        if battle is not None and not battle.combat_active:
+            battle = None
 
-    character[stat] = min(character.get("max_" + stat, float('inf')), character[stat] + value)
+        status = status_effects.compile_status_effect(item_data["effect"])
+        if status is not None:
+            if battle is None:
+                raise CombatNotActiveError(f"{item_id} can only be used in battle")
+            target = battle.status_effects.apply_from(battle.player, battle.foe, status)
+            character["inventory"].remove(item_id)
+            effect, amount, turns = status
+            return f"Used {item_id}, {target['name']} has {effect} ({amount} a turn) for {turns} turns"
 
-    character["inventory"].remove(item_id)
+        # Effects such as "health:20" are compiled once and reused
+        effect = _compiled_effects.get(item_data["effect"]) or compile_item_effect(item_data["effect"])
+        stat, value, apply = effect
+        # In battle the stats being fought with are the battle's copy, which
+        # is written back to the character when the battle (or turn) ends
+        apply(character if battle is None else battle.player)
+
+        character["inventory"].remove(item_id)
 
-    return f"Used {item_id}, {stat} increased by {value}"
+        return f"Used {item_id}, {stat} increased by {value}"
 
 
 def equip_weapon(character, item_id, item_data):
@@ -382,25 +608,36 @@ def purchase_item(character, item_id, item_data):
         InventoryFullError if inventory is full
     """
     
-    # Get item cost
-    cost = item_data["cost"]
+    # Gold and space are checked and spent under the character's lock
+    with _lock_for(character):
+        # Get item cost
+        cost = item_data["cost"]
 
-    # Check if character has enough gold
-    if character["gold"] < cost:
-        raise InsufficientResourcesError(f"You do not have enough gold to purchase {item_id} (cost: {cost})")
+        # Check if character has enough gold
+        if character["gold"] < cost:
+            raise InsufficientResourcesError(f"You do not have enough gold to purchase {item_id} (cost: {cost})")
 
 
-    # Ensure the inventory key exists
-    if 'inventory' not in character:
-        character['inventory'] = []
+        # Ensure the inventory key exists
+        if 'inventory' not in character:
+            character['inventory'] = []
 
-    if len(character["inventory"]) >= 20:
-        raise InventoryFullError("Your inventory is full. Cannot buy any more items")
+        if _room_for(character["inventory"], item_id) < 1:
+            raise InventoryFullError("Your inventory is full. Cannot buy any more items")
         
-    # Deduct gold (for a successful purchase)
-    character['gold'] -= cost
-    # Add purchased item to inventory
-    character['inventory'].append(item_id)
+        # Deduct gold (for a successful purchase)
+        character['gold'] -= cost
+        gold_ledger.record_gold_change(character, -cost, gold_ledger.REASON_PURCHASE)
+        # Add purchased item to inventory
+        character['inventory'].append(item_id)
+
+        # Purchases can advance quest objectives (and complete quests). This
+        # stays under the lock, as in process_shop_transaction, so concurrent
+        # purchases update the objective tracker one at a time; the lock is
+        # re-entrant, so quest rewards can add gold.
+        quest_handler.notify_quest_event(
+            character, quest_handler.EVENT_ITEM_PURCHASED, (item_id, item_data.get("type", ""))
+        )
     return True
 
 
@@ -424,20 +661,22 @@ def sell_item(character, item_id, item_data):
     Raises: ItemNotFoundError if item not in inventory
     """
     
-    # Ensure inventory exists
-    if 'inventory' not in character or item_id not in character['inventory']:
-        raise ItemNotFoundError(f"Item '{item_id}' not found in inventory.")
+    with _lock_for(character):
+        # Ensure inventory exists
+        if 'inventory' not in character or item_id not in character['inventory']:
+            raise ItemNotFoundError(f"Item '{item_id}' not found in inventory.")
 
-    # Remove item from inventory
-    character['inventory'].remove(item_id)
+        # Remove item from inventory
+        character['inventory'].remove(item_id)
 
-    # Gain half of the item's cost
-    cost = item_data["cost"]
-    gold_gained = cost // 2
+        # Gain half of the item's cost
+        cost = item_data["cost"]
+        gold_gained = cost // 2
     
-    character['gold'] += gold_gained
+        character['gold'] += gold_gained
+        gold_ledger.record_gold_change(character, gold_gained, gold_ledger.REASON_SALE)
 
-    return gold_gained
+        return gold_gained
 
 
     # TODO: Implement selling
@@ -445,12 +684,261 @@ def sell_item(character, item_id, item_data):
     # Calculate sell price (cost // 2)
     # Remove item from inventory
     # Add gold to character
-    
+
+
+def process_shop_transaction(character, item_data_dict, buy=None, sell=None):
+    """
+    Buy and sell a whole basket of items in one all-or-nothing step
+
+    Args:
+        character: Character dictionary
+        item_data_dict: Dictionary of all item data (needs 'cost' per item)
+        buy: Dictionary {item_id: quantity} of items to purchase
+        sell: Dictionary {item_id: quantity} of items to sell
+
+    Sales are counted before purchases, so gold from selling can pay for
+    the items being bought. Gold and inventory space are checked once for
+    the whole basket; if any check fails nothing is changed.
+
+    Returns: Dictionary with 'gold_spent', 'gold_received', 'items_bought'
+             and 'items_sold'
+    Raises:
+        ItemNotFoundError if an item is unknown or not owned in the quantity sold
+        InsufficientResourcesError if the basket costs more gold than available
+        InventoryFullError if the final inventory would exceed MAX_INVENTORY_SIZE
+        ValueError if a quantity is not a positive integer
+    """
+    buy = buy or {}
+    sell = sell or {}
+
+    with _lock_for(character):
+        inventory = character.setdefault("inventory", [])
+
+        # 1. Validate the basket and total it up
+        gold_spent = 0
+        items_bought = 0
+        for item_id, quantity in buy.items():
+            if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity <= 0:
+                raise ValueError(f"Invalid quantity {quantity!r} for '{item_id}'")
+            if item_id not in item_data_dict:
+                raise ItemNotFoundError(f"Item '{item_id}' is not sold here.")
+            gold_spent += item_data_dict[item_id]["cost"] * quantity
+            items_bought += quantity
+
+        gold_received = 0
+        items_sold = 0
+        if sell:
+            owned = Counter(inventory)
+            for item_id, quantity in sell.items():
+                if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity <= 0:
+                    raise ValueError(f"Invalid quantity {quantity!r} for '{item_id}'")
+                if item_id not in item_data_dict or owned[item_id] < quantity:
+                    raise ItemNotFoundError(f"Not enough '{item_id}' in inventory to sell {quantity}.")
+                gold_received += (item_data_dict[item_id]["cost"] // 2) * quantity
+                items_sold += quantity
+
+        # 2. Check gold and space once for the whole basket
+        final_gold = character["gold"] + gold_received - gold_spent
+        if final_gold < 0:
+            raise InsufficientResourcesError(
+                f"Basket costs {gold_spent} gold but only {character['gold'] + gold_received} is available"
+            )
+
+        changes = Counter(buy)
+        changes.subtract(sell)
+        final_size = _slots_after(inventory, changes)
+        if final_size > MAX_INVENTORY_SIZE:
+            raise InventoryFullError(
+                f"Basket needs {final_size} slots but inventory holds {MAX_INVENTORY_SIZE}"
+            )
+
+        # 3. Apply everything (nothing below can fail)
+        if sell:
+            to_remove = dict(sell)
+            kept = []
+            for item_id in inventory:
+                if to_remove.get(item_id, 0) > 0:
+                    to_remove[item_id] -= 1
+                else:
+                    kept.append(item_id)
+            inventory[:] = kept
+
+        for item_id, quantity in buy.items():
+            inventory.extend([item_id] * quantity)
+
+        character["gold"] = final_gold
+        gold_ledger.record_gold_change(character, gold_received, gold_ledger.REASON_SALE)
+        gold_ledger.record_gold_change(character, -gold_spent, gold_ledger.REASON_PURCHASE)
+
+        for item_id, quantity in buy.items():
+            quest_handler.notify_quest_event(
+                character, quest_handler.EVENT_ITEM_PURCHASED,
+                (item_id, item_data_dict[item_id].get("type", "")), quantity
+            )
+
+        return {
+            "gold_spent": gold_spent,
+            "gold_received": gold_received,
+            "items_bought": items_bought,
+            "items_sold": items_sold
+        }
+
+
+class ShopIndex:
+    """
+    Cost-sorted index over the item catalog
+
+    Built once from the loaded items so the shop can answer
+    "items of type T costing at most G gold" with a binary search
+    instead of scanning and printing the whole catalog.
+    """
+
+    def __init__(self, item_data_dict):
+        """
+        Build the index
+
+        Args:
+            item_data_dict: Dictionary of all item data (needs 'cost' and 'type')
+        """
+        self.item_data_dict = item_data_dict
+
+        entries = sorted((item["cost"], item_id) for item_id, item in item_data_dict.items())
+
+        # Parallel lists: costs for bisect, ids for the results
+        self._costs = [cost for cost, _ in entries]
+        self._ids = [item_id for _, item_id in entries]
+
+        # Same layout per item type (entries are already cost-ordered)
+        self._by_type = {}
+        for cost, item_id in entries:
+            item_type = item_data_dict[item_id].get("type")
+            costs, ids = self._by_type.setdefault(item_type, ([], []))
+            costs.append(cost)
+            ids.append(item_id)
+
+    def types(self):
+        """Return the item types present in the catalog"""
+        return sorted(self._by_type)
+
+    def _lists(self, item_type):
+        if item_type is None:
+            return self._costs, self._ids
+        return self._by_type.get(item_type, ([], []))
+
+    def count(self, max_cost=None, item_type=None):
+        """
+        Count items matching the filters
+
+        Returns: Integer number of items of item_type costing <= max_cost
+        """
+        costs, _ = self._lists(item_type)
+        if max_cost is None:
+            return len(costs)
+        return bisect_right(costs, max_cost)
+
+    def affordable(self, max_cost, item_type=None):
+        """
+        Get every item costing at most max_cost gold
+
+        Returns: List of item IDs, cheapest first
+        """
+        costs, ids = self._lists(item_type)
+        return ids[:bisect_right(costs, max_cost)]
+
+    def page(self, page_number, page_size=10, max_cost=None, item_type=None):
+        """
+        Get one page of a filtered, cost-sorted listing
+
+        Args:
+            page_number: Zero-based page to return
+            page_size: Items per page
+            max_cost: Only include items costing at most this much (None = any)
+            item_type: Only include items of this type (None = any)
+
+        Returns: List of (item_id, item_data) tuples for that page
+        """
+        _, ids = self._lists(item_type)
+        end = self.count(max_cost, item_type)
+        start = page_number * page_size
+        return [(item_id, self.item_data_dict[item_id])
+                for item_id in ids[start:min(start + page_size, end)]]
+
 
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
+def _lock_for(character):
+    """The character's lock (see character_manager.character_lock)"""
+    lock = character.get("_lock")
+    if lock is not None:
+        return lock
+    return _character_lock()(character)
+
+
+def _character_lock():
+    """
+    character_manager.character_lock, imported on first use
+
+    character_manager imports this module, so it can't be imported at the
+    top; the function is cached so the hot path never runs an import.
+    """
+    global _character_lock_function
+    if _character_lock_function is None:
+        from character_manager import character_lock
+        _character_lock_function = character_lock
+    return _character_lock_function
+
+
+_character_lock_function = None
+
+
+def get_inventory_slots(character):
+    """
+    Get the character's inventory as slots
+    
+    Returns: List of (item_id, quantity) tuples
+    """
+    inventory = character["inventory"]
+    if isinstance(inventory, Inventory):
+        return inventory.slots()
+    return [(item_id, 1) for item_id in inventory]
+
+
+def _slots_used(inventory):
+    """Slots taken (a plain list uses one slot per item)"""
+    if isinstance(inventory, Inventory):
+        return inventory.slot_count()
+    return len(inventory)
+
+
+def _room_for(inventory, item_id):
+    """How many more of item_id fit in the inventory"""
+    if isinstance(inventory, Inventory):
+        return inventory.room_for(item_id, MAX_INVENTORY_SIZE)
+    return MAX_INVENTORY_SIZE - len(inventory)
+
+
+def _slots_after(inventory, changes):
+    """
+    Slots the inventory would use after adding/removing items
+    
+    Args:
+        inventory: Inventory or plain list
+        changes: Dictionary {item_id: change in quantity}
+    """
+    used = _slots_used(inventory)
+    stacked = isinstance(inventory, Inventory)
+    for item_id, change in changes.items():
+        if change == 0:
+            continue
+        size = game_data.get_stack_size(item_id) if stacked else 1
+        have = inventory.count(item_id)
+        # Stacks are kept full except the last one, so slots = ceil(count / size)
+        used += -(-(have + change) // size) - -(-have // size)
+    return used
+
+
 def parse_item_effect(effect_string):
     """
     Parse item effect string into stat name and value
@@ -464,10 +952,6 @@ def parse_item_effect(effect_string):
     stat, value = effect_string.split(":")
     return stat, int(value)
 
-    # TODO: Implement effect parsing
-    # Split on ":"
-    # Convert value to integer
-    
 
 def apply_stat_effect(character, stat_name, value):
     """
@@ -477,20 +961,85 @@ def apply_stat_effect(character, stat_name, value):
     
     Note: health cannot exceed max_health
     """
+    _compile_stat_effect(stat_name, value)(character)
 
-     # Apply the stat increase
-    character[stat_name] += value
 
-    # Health cannot exceed max_health
-    if stat_name == "health":
-        if character["health"] > character["max_health"]:
-            character["health"] = character["max_health"]
+def compile_item_effect(effect_string):
+    """
+    Compile an effect string into a function that applies it
 
+    Compiled effects are cached by effect string, so every item sharing
+    an effect shares one function.
+
+    Args:
+        effect_string: String in format "stat_name:value"
+
+    Returns: Tuple of (stat_name, value, apply) where apply(character)
+             performs the stat change
+    """
+    stat, value = parse_item_effect(effect_string)
+    effect = (stat, value, _compile_stat_effect(stat, value))
+    _compiled_effects[effect_string] = effect
+    return effect
+
+
+def compile_item_effects(item_data_dict):
+    """
+    Compile the effect of every item in the catalog
+
+    Call once after loading items so use_item never has to parse an effect.
+
+    Returns: Number of distinct effects compiled
+    """
+    for item in item_data_dict.values():
+        effect_string = item.get("effect")
+        if effect_string and effect_string not in _compiled_effects:
+            # Status effects (e.g. "regen:5:4") are compiled by status_effects
+            if status_effects.compile_status_effect(effect_string) is None:
+                compile_item_effect(effect_string)
+    return len(_compiled_effects)
+
+
+# Compiled effects: {effect_string: (stat, value, apply)}
+_compiled_effects = {}
+
+
+def _compile_stat_effect(stat, value):
+    """
+    Function applying one stat change, e.g. ("health", 20), to a character
+
+    Built once per (stat, value) and cached, so apply_stat_effect and every
+    item with that change share it.
+    """
+    apply = _compiled_appliers.get((stat, value))
+    if apply is None:
+        make_apply = _EFFECT_COMPILERS.get(stat)
+        apply = make_apply(value) if make_apply else _compile_add(stat, value)
+        _compiled_appliers[(stat, value)] = apply
+    return apply
+
+
+# Compiled stat changes: {(stat, value): apply}
+_compiled_appliers = {}
+
+
+def _compile_heal(value):
+    def apply(character):
+        health = character["health"] + value
+        max_health = character["max_health"]
+        character["health"] = health if health < max_health else max_health
+    return apply
+
+
+def _compile_add(stat, value):
+    def apply(character):
+        character[stat] += value
+    return apply
+
+
+# Stats whose changes need more than a plain add
+_EFFECT_COMPILERS = {"health": _compile_heal}
 
-    # TODO: Implement stat application
-    # Add value to character[stat_name]
-    # If stat is health, ensure it doesn't exceed max_health
-    
 
 def display_inventory(character, item_data_dict):
     """
@@ -13,11 +13,13 @@ Demonstrates module integration and complete game flow.
 """
 
 # Import all our custom modules
+import atexit
 import character_manager
 import inventory_system
 import quest_handler
 import combat_system
 import game_data
+import gold_ledger
 from custom_exceptions import *
 
 # ============================================================================
@@ -28,8 +30,12 @@ from custom_exceptions import *
 current_character = None
 all_quests = {}
 all_items = {}
+shop_index = None
 game_running = False
 
+# Number of shop items shown per page
+SHOP_PAGE_SIZE = 10
+
 # ============================================================================
 # MAIN MENU
 # ============================================================================
@@ -162,6 +168,8 @@ def load_game():
     try:
         current_character = load_character(character_name)
         print(f"Loaded character: {current_character['name']}")
+        # Resume tracking objectives of the saved active quests
+        quest_handler.get_objective_tracker(current_character, all_quests)
     except CharacterNotFoundError:
         print("Error: Character not found.")
         return
@@ -352,10 +360,11 @@ def view_inventory():
         print("Inventory is empty.")
         return
 
-    # Show inventory with item names
-    for idx, item_id in enumerate(inv, 1):
+    # Show inventory with item names, one line per stack
+    slots = inventory_system.get_inventory_slots(current_character)
+    for idx, (item_id, quantity) in enumerate(slots, 1):
         item_info = all_items.get(item_id, {"name": "UNKNOWN"})
-        print(f"{idx}. {item_info['name']} ({item_info.get('type', 'unknown')})")
+        print(f"{idx}. {item_info['name']} ({item_info.get('type', 'unknown')}) x{quantity}")
 
     print("\nOptions:")
     print("1. Use Item")
@@ -374,7 +383,7 @@ def view_inventory():
 
     try:
         item_choice = int(input("Which item number? ")) - 1
-        item_id = inv[item_choice]
+        item_id = slots[item_choice][0]
         item_data = all_items[item_id]
     except:
         print("Invalid item selection.")
@@ -483,6 +492,23 @@ def quest_menu():
     # Handle exceptions from quest_handler
     
 
+def show_battle_forecast(character, enemy):
+    """Show how the fight goes with basic attacks (and with specials, if predictable)"""
+    options = [("basic attacks", False)]
+    if combat_system.can_predict_special(character["class"]):
+        options.append(("special abilities", True))
+
+    for label, use_special in options:
+        forecast = combat_system.predict_battle(character, enemy, use_special)
+        rounds = f"{forecast['turns']} round" + ("s" if forecast["turns"] != 1 else "")
+        if forecast["winner"] == "player":
+            outcome = f"win in {rounds} with {forecast['health_left']} HP left"
+        elif forecast["winner"] == "enemy":
+            outcome = f"fall in {rounds}"
+        else:
+            outcome = "neither side wins"
+        print(f"Forecast with {label}: {outcome}")
+
 def explore():
     """Find and fight random enemies"""
     global current_character
@@ -491,30 +517,37 @@ def explore():
 
     try:
         # Generate a level-appropriate enemy
-        enemy = combat_system.generate_enemy(current_character["level"])
+        enemy = combat_system.get_random_enemy_for_level(current_character["level"])
         print(f"You encountered a {enemy['name']}!")
+        show_battle_forecast(current_character, enemy)
 
-        # Start combat
+        # Start combat (the player picks each move at the console)
         battle = combat_system.SimpleBattle(current_character, enemy)
-        result = battle.start()
+        result = battle.start_battle(combat_system.ConsolePolicy(all_items))
 
-        if result == "victory":
-            rewards = combat_system.get_victory_rewards(enemy)
-            xp = rewards["xp"]
-            gold = rewards["gold"]
+        if result["winner"] == "player":
+            xp = result["xp_gained"]
+            gold = result["gold_gained"]
 
-            current_character["experience"] += xp
-            current_character["gold"] += gold
+            character_manager.gain_experience(current_character, xp)
+            character_manager.add_gold(current_character, gold, gold_ledger.REASON_BATTLE_REWARD)
 
             print(f"You defeated the {enemy['name']}!")
             print(f"Rewards: +{xp} XP, +{gold} gold")
 
-        elif result == "defeat":
+            # Victories count toward "enemy_defeated" quest objectives
+            finished = quest_handler.notify_quest_event(
+                current_character, quest_handler.EVENT_ENEMY_DEFEATED, (enemy["enemy_id"],)
+            )
+            for reward in finished:
+                print(f"Quest complete: {reward['quest_id']}! +{reward['reward_xp']} XP, +{reward['reward_gold']} gold")
+
+        elif result["winner"] == "enemy":
             print("You were defeated in battle...")
             raise CharacterDeadError("Your character has died.")
 
         else:
-            print("Combat ended unexpectedly.")
+            print("You got away safely.")
 
     except CombatError as e:
         print(f"Combat error: {e}")
@@ -536,21 +569,41 @@ def explore():
 
 def shop():
     """Shop menu for buying/selling items"""
-    global current_character, all_items
+    global current_character, all_items, shop_index
+
+    # The index is normally built by load_game_data(); build it here if not
+    if shop_index is None or shop_index.item_data_dict is not all_items:
+        shop_index = inventory_system.ShopIndex(all_items)
+
+    page = 0
+    type_filter = None
 
     while True:
+        gold = current_character['gold']
+
+        # Only list what the player can afford, one page at a time
+        total = shop_index.count(gold, type_filter)
+        total_pages = max(1, -(-total // SHOP_PAGE_SIZE))
+        page = min(page, total_pages - 1)
+        item_list = shop_index.page(page, SHOP_PAGE_SIZE, gold, type_filter)
+
         print("\n=== SHOP MENU ===")
-        print(f"Your Gold: {current_character['gold']}")
-        print("Items for Sale:")
+        print(f"Your Gold: {gold}")
+        print(f"Items you can afford ({type_filter or 'all types'}, page {page + 1}/{total_pages}):")
 
-        item_list = list(all_items.items())
+        if not item_list:
+            print("(Nothing you can afford.)")
         for index, (item_id, item) in enumerate(item_list, 1):
             print(f"{index}. {item['name']} ({item['type']}), Cost: {item['cost']} gold")
 
         print("\nOptions:")
         print("1. Buy Item")
         print("2. Sell Item")
-        print("3. Back")
+        print("3. Buy in Bulk")
+        print("4. Next Page")
+        print("5. Previous Page")
+        print("6. Filter by Type")
+        print("7. Back")
 
         try:
             choice = int(input("Choose an option: "))
@@ -559,9 +612,24 @@ def shop():
             continue
 
         # Return to previous menu
-        if choice == 3:
+        if choice == 7:
             return
 
+        # PAGING AND FILTERING
+        if choice == 4:
+            page = min(page + 1, total_pages - 1)
+            continue
+        if choice == 5:
+            page = max(page - 1, 0)
+            continue
+        if choice == 6:
+            types = shop_index.types()
+            print(f"Types: {', '.join(types)} (leave blank for all)")
+            wanted = input("Enter type: ").strip().lower()
+            type_filter = wanted if wanted in types else None
+            page = 0
+            continue
+
         # BUY ITEM
         if choice == 1:
             try:
@@ -585,13 +653,14 @@ def shop():
                 continue
 
             print("\nYour Items:")
-            for idx, item_id in enumerate(inv, 1):
+            slots = inventory_system.get_inventory_slots(current_character)
+            for idx, (item_id, quantity) in enumerate(slots, 1):
                 item = all_items[item_id]
-                print(f"{idx}. {item['name']} ({item['type']})")
+                print(f"{idx}. {item['name']} ({item['type']}) x{quantity}")
 
             try:
                 num = int(input("Enter item number to sell: ")) - 1
-                item_id = inv[num]
+                item_id = slots[num][0]
                 item_data = all_items[item_id]
 
                 gold_received = inventory_system.sell_item(current_character, item_id, item_data)
@@ -602,8 +671,27 @@ def shop():
             except Exception as e:
                 print(f"Error: {e}")
 
+        # BUY SEVERAL ITEMS AT ONCE
+        elif choice == 3:
+            try:
+                num = int(input("Enter item number to buy: ")) - 1
+                quantity = int(input("How many? "))
+                item_id, item_data = item_list[num]
+
+                # All-or-nothing: either every copy is bought or none are
+                summary = inventory_system.process_shop_transaction(
+                    current_character, all_items, buy={item_id: quantity}
+                )
+                print(f"Purchased {summary['items_bought']}x {item_data['name']} for {summary['gold_spent']} gold!")
+                save_game()
+
+            except (IndexError, ValueError):
+                print("Invalid item number or quantity.")
+            except Exception as e:
+                print(f"Error: {e}")
+
         else:
-            print("Invalid choice. Pick 1, 2, or 3.")
+            print("Invalid choice. Pick a number from 1-7.")
     
     # TODO: Implement shop
     # Show available items for purchase
@@ -622,6 +710,7 @@ def save_game():
 
     try:
         character_manager.save_character(current_character)
+        gold_ledger.default_ledger.flush()
         print("\nGame saved successfully!\n")
     except Exception as e:
         print(f"[ERROR] Failed to save game: {e}")
@@ -633,12 +722,14 @@ def save_game():
     
 
 def load_game_data():
-    """Load all quest and item data from files"""
-    global all_quests, all_items
+    """Load all quest, item, enemy and ability data from files"""
+    global all_quests, all_items, shop_index
 
     try:
         all_quests = game_data.load_quests()
         all_items = game_data.load_items()
+        combat_system.load_enemy_registry()
+        combat_system.load_ability_registry()
 
     except MissingDataFileError:
         print("[WARNING] Data files missing. Creating default files...")
@@ -648,6 +739,8 @@ def load_game_data():
         try:
             all_quests = game_data.load_quests()
             all_items = game_data.load_items()
+            combat_system.load_enemy_registry()
+            combat_system.load_ability_registry()
         except Exception as e:
             print(f"[ERROR] Failed to load data even after creating defaults: {e}")
             all_quests = {}
@@ -662,6 +755,10 @@ def load_game_data():
         print(f"[ERROR] Unexpected error loading data: {e}")
         all_quests = {}
         all_items = {}
+
+    # Build the shop's price index and item effects once per catalog load
+    shop_index = inventory_system.ShopIndex(all_items)
+    inventory_system.compile_item_effects(all_items)
     
     # TODO: Implement data loading
     # Try to load quests with game_data.load_quests()
@@ -684,8 +781,8 @@ def handle_character_death():
         choice = input("Choose an option: ")
 
         if choice == "1":
-            if current_character.gold >= 50:
-                current_character.gold -= 50
+            if current_character["gold"] >= 50:
+                character_manager.add_gold(current_character, -50, gold_ledger.REASON_REVIVE)
                 character_manager.revive_character(current_character)
                 print("\nYou have been revived!\n")
                 return
@@ -721,6 +818,12 @@ def display_welcome():
 
 def main():
     """Main game execution function"""
+
+    # Ledger entries are written in batches; write the last partial batch
+    # however the game ends (quitting without saving, or an error). Only
+    # registered here so importing the modules (e.g. in tests) never writes
+    # the ledger file.
+    atexit.register(gold_ledger.default_ledger.flush)
     
     # Display welcome message
     display_welcome()
@@ -0,0 +1,317 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Quest Analytics Module
+
+This module answers quest questions for a whole population of characters
+at once, such as "which characters can accept quest X" for matchmaking and
+event targeting. Each character's completed and active quests are stored as
+a row of 64-bit words (one bit per quest, see QuestGraph.quest_bits), so an
+eligibility check is a handful of vectorized bit operations.
+
+Requires NumPy.
+"""
+
+import numpy as np
+
+from custom_exceptions import QuestNotFoundError
+from quest_handler import get_quest_graph
+
+# Characters processed at a time when building eligibility matrices
+DEFAULT_CHUNK_SIZE = 8192
+
+# ============================================================================
+# POPULATION
+# ============================================================================
+
+class QuestPopulation:
+    """
+    Levels and quest bitsets for many characters
+
+    completed and active are uint64 arrays of shape (characters, words);
+    quest i is bit i % 64 of word i // 64.
+    """
+
+    def __init__(self, levels, completed, active, quest_data_dict, names=None):
+        """
+        Args:
+            levels: Array of character levels
+            completed: uint64 array (characters, words) of completed quest bits
+            active: uint64 array (characters, words) of active quest bits
+            quest_data_dict: Quest catalog the bits refer to
+            names: Optional list of character names, one per row
+        """
+        self.graph = get_quest_graph(quest_data_dict)
+        self.levels = np.asarray(levels, dtype=np.int64)
+        self.completed = np.asarray(completed, dtype=np.uint64)
+        self.active = np.asarray(active, dtype=np.uint64)
+        self.names = names
+
+    @classmethod
+    def from_characters(cls, characters, quest_data_dict):
+        """
+        Encode character dictionaries into a population
+
+        Returns: QuestPopulation
+        """
+        graph = get_quest_graph(quest_data_dict)
+        words = num_words(len(quest_data_dict))
+        levels = np.fromiter((c.get("level", 1) for c in characters), dtype=np.int64, count=len(characters))
+        completed = _pack_rows([graph.quest_bits(c.get("completed_quests", ())) for c in characters], words)
+        active = _pack_rows([graph.quest_bits(c.get("active_quests", ())) for c in characters], words)
+        names = [c.get("name", "") for c in characters]
+        return cls(levels, completed, active, quest_data_dict, names)
+
+    def __len__(self):
+        return len(self.levels)
+
+    def has_bit(self, bitsets, quest_id):
+        """Boolean array: which characters have quest_id's bit set in bitsets"""
+        index = self.graph.position.get(quest_id)
+        if index is None:
+            raise QuestNotFoundError(f"Quest '{quest_id}' not found.")
+        word, bit = divmod(index, 64)
+        return (bitsets[:, word] & np.uint64(1 << bit)) != 0
+
+# ============================================================================
+# ELIGIBILITY
+# ============================================================================
+
+def eligible_for_quest(population, quest_id):
+    """
+    Which characters can accept a quest
+
+    Applies can_accept_quest's rules to every character at once: level at
+    least the quest's required_level, prerequisite completed, and the quest
+    neither completed nor active. A prerequisite missing from the catalog can
+    never be completed, so no one is eligible for quests that need one.
+
+    Args:
+        population: QuestPopulation
+        quest_id: Quest to check
+
+    Returns: Boolean array, one entry per character
+    Raises: QuestNotFoundError if quest_id is not in the catalog
+    """
+    graph = population.graph
+    eligible = population.levels >= graph.required_level.get(quest_id, 1)
+    eligible &= ~population.has_bit(population.completed, quest_id)
+    eligible &= ~population.has_bit(population.active, quest_id)
+
+    if quest_id in graph.missing:
+        eligible[:] = False
+    elif quest_id in graph.parents:
+        eligible &= population.has_bit(population.completed, graph.parents[quest_id])
+
+    return eligible
+
+
+def count_eligible(population, quest_ids=None):
+    """
+    Number of characters who can accept each quest
+
+    Args:
+        population: QuestPopulation
+        quest_ids: Quests to count (every quest in the catalog if None)
+
+    Returns: Dictionary {quest_id: count}
+    """
+    if quest_ids is None:
+        quest_ids = population.graph.order
+    return {quest_id: int(np.count_nonzero(eligible_for_quest(population, quest_id)))
+            for quest_id in quest_ids}
+
+# ============================================================================
+# ELIGIBILITY MATRIX
+# ============================================================================
+
+def iter_eligibility_matrix(population, quest_ids=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream the characters x quests eligibility matrix in row chunks
+
+    Uses the same rules as eligible_for_quest (and can_accept_quest). Only
+    one chunk of rows is unpacked at a time, so memory use depends on
+    chunk_size and the number of quests, not the population size.
+
+    Args:
+        population: QuestPopulation
+        quest_ids: Quests to use as columns (whole catalog, in catalog order, if None)
+        chunk_size: Rows per chunk
+
+    Yields: (start_row, matrix) where matrix is a boolean array of shape
+            (rows in chunk, len(quest_ids))
+    Raises: QuestNotFoundError if a quest_id is not in the catalog
+    """
+    graph = population.graph
+    if quest_ids is None:
+        quest_ids = list(graph.quest_data_dict)
+
+    for quest_id in quest_ids:
+        if quest_id not in graph.position:
+            raise QuestNotFoundError(f"Quest '{quest_id}' not found.")
+
+    position = graph.position
+    num_quests = len(position)
+
+    # Prerequisites are read from the completed bits plus two extra columns:
+    # one always set (no prerequisite) and one never set (missing prerequisite)
+    always, never = num_quests, num_quests + 1
+
+    def prerequisite_column(quest_id):
+        if quest_id in graph.parents:
+            return position[graph.parents[quest_id]]
+        return never if quest_id in graph.missing else always
+
+    columns = np.array([position[q] for q in quest_ids], dtype=np.intp)
+    required = np.array([graph.required_level[q] for q in quest_ids], dtype=np.int64)
+    prerequisite_columns = np.array([prerequisite_column(q) for q in quest_ids], dtype=np.intp)
+
+    for start in range(0, len(population), chunk_size):
+        stop = start + chunk_size
+        done = _unpack_bits(population.completed[start:stop], num_quests)
+        active = _unpack_bits(population.active[start:stop], num_quests)
+
+        done_or_fixed = np.empty((len(done), num_quests + 2), dtype=bool)
+        done_or_fixed[:, :num_quests] = done
+        done_or_fixed[:, always] = True
+        done_or_fixed[:, never] = False
+
+        # take() keeps rows contiguous; fancy column indexing would not
+        matrix = population.levels[start:stop, None] >= required
+        matrix &= ~done.take(columns, axis=1)
+        matrix &= ~active.take(columns, axis=1)
+        matrix &= done_or_fixed.take(prerequisite_columns, axis=1)
+        yield start, matrix
+
+
+def eligibility_matrix(population, quest_ids=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Full characters x quests eligibility matrix
+
+    Builds the matrix chunk by chunk into one array of
+    len(population) * len(quest_ids) bytes; use iter_eligibility_matrix
+    when that is too large to hold.
+
+    Returns: Boolean array of shape (len(population), len(quest_ids))
+    """
+    num_columns = len(population.graph.position) if quest_ids is None else len(quest_ids)
+    result = np.empty((len(population), num_columns), dtype=bool)
+    for start, matrix in iter_eligibility_matrix(population, quest_ids, chunk_size):
+        result[start:start + len(matrix)] = matrix
+    return result
+
+
+def iter_saved_populations(quest_data_dict, save_directory="data/save_games", chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Load saved characters as QuestPopulations, chunk_size characters at a time
+
+    Saves that cannot be loaded are skipped.
+
+    Yields: QuestPopulation (with names) for each chunk
+    """
+    from character_manager import list_saved_characters, load_character
+    from custom_exceptions import GameError
+
+    characters = []
+    for name in list_saved_characters(save_directory):
+        try:
+            characters.append(load_character(name, save_directory))
+        except GameError:
+            continue
+        if len(characters) == chunk_size:
+            yield QuestPopulation.from_characters(characters, quest_data_dict)
+            characters = []
+    if characters:
+        yield QuestPopulation.from_characters(characters, quest_data_dict)
+
+
+def saved_eligibility_counts(quest_data_dict, save_directory="data/save_games", chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Number of saved characters who can accept each quest
+
+    Streams the save population through the eligibility matrix one chunk
+    at a time.
+
+    Returns: Dictionary {quest_id: count} in catalog order
+    """
+    totals = np.zeros(len(quest_data_dict), dtype=np.int64)
+    for population in iter_saved_populations(quest_data_dict, save_directory, chunk_size):
+        for _, matrix in iter_eligibility_matrix(population, chunk_size=chunk_size):
+            totals += matrix.sum(axis=0)
+    return dict(zip(quest_data_dict, totals.tolist()))
+
+# ============================================================================
+# HELPER FUNCTIONS
+# ============================================================================
+
+def num_words(num_quests):
+    """Number of 64-bit words needed for one bit per quest"""
+    return max(1, (num_quests + 63) // 64)
+
+
+def _unpack_bits(bitsets, num_bits):
+    """Turn (rows, words) uint64 bitsets into a (rows, num_bits) boolean array"""
+    as_bytes = np.ascontiguousarray(bitsets, dtype="<u8").view(np.uint8)
+    return np.unpackbits(as_bytes, axis=1, count=num_bits, bitorder="little").view(bool)
+
+
+def _pack_rows(bitsets, words):
+    """Turn integer bitsets into a (len(bitsets), words) uint64 array"""
+    size = words * 8
+    buffer = b"".join(bits.to_bytes(size, "little") for bits in bitsets)
+    return np.frombuffer(buffer, dtype="<u8").reshape(len(bitsets), words).astype(np.uint64)
+
+
+# ============================================================================
+# TESTING
+# ============================================================================
+
+if __name__ == "__main__":
+    import time
+
+    import game_data
+
+    print("=== QUEST ANALYTICS TEST ===")
+
+    quests = game_data.load_quests()
+    quest_ids = list(quests)
+    rng = np.random.default_rng(0)
+
+    n = 200_000
+    words = num_words(len(quests))
+    population = QuestPopulation(
+        rng.integers(1, 20, size=n),
+        rng.integers(0, 2 ** 63, size=(n, words), dtype=np.uint64),
+        np.zeros((n, words), dtype=np.uint64),
+        quests
+    )
+
+    start = time.perf_counter()
+    counts = count_eligible(population)
+    elapsed = time.perf_counter() - start
+    print(f"Checked {len(quests)} quests for {n:,} characters in {elapsed * 1000:.1f} ms")
+    for quest_id in quest_ids:
+        print(f"  {quest_id}: {counts[quest_id]:,}")
+
+    # Synthetic 1000-quest catalog: ten chains of 100
+    big_catalog = {
+        f"quest_{i}": {
+            "required_level": 1 + (i % 100) // 5,
+            "prerequisite": f"quest_{i - 1}" if i % 100 else "NONE"
+        }
+        for i in range(1000)
+    }
+    n = 100_000
+    words = num_words(len(big_catalog))
+    population = QuestPopulation(
+        rng.integers(1, 21, size=n),
+        rng.integers(0, 2 ** 63, size=(n, words), dtype=np.uint64),
+        np.zeros((n, words), dtype=np.uint64),
+        big_catalog
+    )
+
+    start = time.perf_counter()
+    eligible = 0
+    for _, matrix in iter_eligibility_matrix(population):
+        eligible += int(matrix.sum())
+    elapsed = time.perf_counter() - start
+    print(f"Streamed {n:,} x {len(big_catalog):,} eligibility matrix in {elapsed:.2f}s ({eligible:,} eligible)")
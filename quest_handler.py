@@ -11,14 +11,104 @@ Through these contributions, AI helped streamline the development process, ensur
 This module handles quest management, dependencies, and completion.
 """
 
+from bisect import bisect_right
+from collections.abc import MutableSequence
+
 from custom_exceptions import (
     QuestNotFoundError,
     QuestRequirementsNotMetError,
     QuestAlreadyCompletedError,
     QuestNotActiveError,
+    QuestCycleError,
     InsufficientLevelError
 )
 
+# ============================================================================
+# QUEST STORAGE
+# ============================================================================
+
+class QuestLog(MutableSequence):
+    """
+    Ordered set of quest IDs, used for active and completed quests
+
+    Backed by an insertion-ordered dict, so membership checks, appends and
+    removals are O(1) while iteration keeps the order quests were added in.
+    Reads behave like a list; appending a quest that is already present
+    does nothing. Saved as a plain comma-separated list.
+    """
+
+    __slots__ = ("_quests",)
+
+    def __init__(self, quest_ids=()):
+        self._quests = dict.fromkeys(quest_ids)
+
+    # --- list-like reads ---
+
+    def __len__(self):
+        return len(self._quests)
+
+    def __iter__(self):
+        return iter(self._quests)
+
+    def __reversed__(self):
+        return reversed(self._quests)
+
+    def __contains__(self, quest_id):
+        return quest_id in self._quests
+
+    def __getitem__(self, position):
+        return list(self._quests)[position]
+
+    def count(self, quest_id):
+        return 1 if quest_id in self._quests else 0
+
+    def index(self, quest_id, *args):
+        return list(self._quests).index(quest_id, *args)
+
+    def __eq__(self, other):
+        if isinstance(other, QuestLog):
+            return list(self._quests) == list(other._quests)
+        if isinstance(other, list):
+            return list(self._quests) == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"QuestLog({list(self._quests)!r})"
+
+    # --- list-like writes ---
+
+    def append(self, quest_id):
+        self._quests[quest_id] = None
+
+    def remove(self, quest_id):
+        try:
+            del self._quests[quest_id]
+        except KeyError:
+            raise ValueError(f"{quest_id!r} not in quest log") from None
+
+    def clear(self):
+        self._quests.clear()
+
+    # Positional edits are rare; they go through a plain list
+
+    def __setitem__(self, position, value):
+        quests = list(self._quests)
+        quests[position] = value
+        self._quests = dict.fromkeys(quests)
+
+    def __delitem__(self, position):
+        quests = list(self._quests)
+        del quests[position]
+        self._quests = dict.fromkeys(quests)
+
+    def insert(self, position, quest_id):
+        quests = list(self._quests)
+        quests.insert(position, quest_id)
+        self._quests = dict.fromkeys(quests)
+
+
 # ============================================================================
 # QUEST MANAGEMENT
 # ============================================================================
@@ -79,7 +169,12 @@ def accept_quest(character, quest_id, quest_data_dict):
         )
 
     # 6. Accept quest
+    tracker = _synced_tracker(character)
+    objectives = get_objective_tracker(character, quest_data_dict)
     character["active_quests"].append(quest_id)
+    if tracker is not None:
+        tracker.quest_accepted(character, quest_id)
+    objectives.quest_accepted(character, quest_id)
     return True
 
     # TODO: Implement quest acceptance
@@ -123,8 +218,14 @@ def complete_quest(character, quest_id, quest_data_dict):
         )
 
     # Remove from active, move to completed
+    tracker = _synced_tracker(character)
+    objectives = _synced_tracker(character, "_objectives")
     character["active_quests"].remove(quest_id)
     character["completed_quests"].append(quest_id)
+    if tracker is not None:
+        tracker.quest_completed(character, quest_id)
+    if objectives is not None:
+        objectives.quest_finished(character, quest_id)
 
     # Grant rewards
     xp = quest.get("reward_xp", 0)
@@ -132,8 +233,15 @@ def complete_quest(character, quest_id, quest_data_dict):
 
     # Use character manager systems
     from character_manager import gain_experience, add_gold
+    from gold_ledger import REASON_QUEST_REWARD
     gain_experience(character, xp)
-    add_gold(character, gold)
+    add_gold(character, gold, REASON_QUEST_REWARD)
+
+    # Running totals (characters from older saves don't have them yet)
+    if "quests_completed" in character:
+        character["quests_completed"] += 1
+        character["quest_xp_earned"] += xp
+        character["quest_gold_earned"] += gold
 
     # Return what was awarded
     return {
@@ -164,7 +272,13 @@ def abandon_quest(character, quest_id):
             f"Cannot abandon '{quest_id}' because it is not active."
         )
 
+    tracker = _synced_tracker(character)
+    objectives = _synced_tracker(character, "_objectives")
     character["active_quests"].remove(quest_id)
+    if tracker is not None:
+        tracker.quest_abandoned(character, quest_id)
+    if objectives is not None:
+        objectives.quest_finished(character, quest_id)
     return True
 
     # TODO: Implement quest abandonment
@@ -217,34 +331,8 @@ def get_available_quests(character, quest_data_dict):
     
     Returns: List of quest dictionaries
     """
-
-    available = []
-    level = character.get("level", 1)
-
-    for quest_id, quest in quest_data_dict.items():
-        required_level = quest.get("required_level", 1)
-        prereq = quest.get("prerequisite", "NONE")
-
-        # Skip if completed
-        if quest_id in character["completed_quests"]:
-            continue
-        
-        # Skip if already active
-        if quest_id in character["active_quests"]:
-            continue
-        
-        # Level requirement
-        if level < required_level:
-            continue
-        
-        # Prerequisite check
-        if prereq != "NONE" and prereq not in character["completed_quests"]:
-            continue
-
-        # If all requirements met, it's available
-        available.append(quest)
-
-    return available
+    # The tracker keeps this set current as quests and levels change
+    return get_quest_tracker(character, quest_data_dict).available_quests()
 
     # TODO: Implement available quest search
     # Filter all quests by requirements
@@ -330,28 +418,434 @@ def get_quest_prerequisite_chain(quest_id, quest_data_dict):
     if quest_id not in quest_data_dict:
         raise QuestNotFoundError(f"Quest '{quest_id}' not found.")
 
-    chain = []
-    current = quest_id
+    graph = get_quest_graph(quest_data_dict)
 
-    while True:
-        if current not in quest_data_dict:
-            raise QuestNotFoundError(f"Quest '{current}' not found in chain tracing.")
+    missing = graph.missing_prerequisite(quest_id)
+    if missing is not None:
+        raise QuestNotFoundError(f"Quest '{missing}' not found in chain tracing.")
 
-        chain.append(current)
-        prereq = quest_data_dict[current].get("prerequisite", "NONE")
+    return list(graph.chain(quest_id))
 
-        if prereq == "NONE":
-            break  # No more prerequisites
 
-        current = prereq  # Move to next prereq in chain
+# ============================================================================
+# QUEST GRAPH
+# ============================================================================
 
-    chain.reverse()  # Put in correct chronological order
-    return chain
+class QuestGraph:
+    """
+    Prerequisite graph for a quest catalog
+
+    Every quest has at most one prerequisite, so the graph is a forest. It is
+    built once per catalog in linear time: quests are put in topological
+    order (each prerequisite before the quests that need it) and cycles are
+    reported. A quest's prerequisite chain is stored as a tuple the first
+    time it is asked for, reusing the nearest stored chain above it.
+
+    Prerequisites that name a quest not in the catalog do not stop the graph
+    from being built; the chain simply starts at the quest that names them.
+    """
+
+    def __init__(self, quest_data_dict):
+        """
+        Args:
+            quest_data_dict: Dictionary of all quest data
+
+        Raises: QuestCycleError if prerequisites loop back on themselves
+        """
+        self.quest_data_dict = quest_data_dict
+        self.size = len(quest_data_dict)
+
+        parents = {}
+        missing = {}
+        for quest_id, quest in quest_data_dict.items():
+            prereq = quest.get("prerequisite", "NONE")
+            if prereq == "NONE":
+                continue
+            if prereq in quest_data_dict:
+                parents[quest_id] = prereq
+            else:
+                missing[quest_id] = prereq
+
+        self.order = _topological_order(quest_data_dict, parents)
+
+        # Broken links are inherited from the prerequisite, which the
+        # topological order has already handled
+        self._missing = {}
+        for quest_id in self.order:
+            parent = parents.get(quest_id)
+            if parent is None:
+                if quest_id in missing:
+                    self._missing[quest_id] = missing[quest_id]
+            elif parent in self._missing:
+                self._missing[quest_id] = self._missing[parent]
+
+        self.parents = parents
+        self.missing = missing
+        self._chains = {}
+
+        # Reverse prerequisite map: {quest_id: [quests that require it]}
+        self.children = {}
+        for quest_id, prereq in parents.items():
+            self.children.setdefault(prereq, []).append(quest_id)
+        for quest_id, prereq in missing.items():
+            self.children.setdefault(prereq, []).append(quest_id)
+
+        # Catalog position of each quest (also its bit in quest_bits), and
+        # quests sorted by required level
+        self.position = {quest_id: i for i, quest_id in enumerate(quest_data_dict)}
+        self.required_level = {
+            quest_id: quest.get("required_level", 1) for quest_id, quest in quest_data_dict.items()
+        }
+        self.by_level = sorted(quest_data_dict, key=self.required_level.__getitem__)
+        self.levels = [self.required_level[quest_id] for quest_id in self.by_level]
+
+    def __contains__(self, quest_id):
+        return quest_id in self.quest_data_dict
+
+    def chain(self, quest_id):
+        """
+        Prerequisite chain for a quest
+
+        Returns: Tuple of quest IDs [earliest_prereq, ..., quest_id]
+        Raises: QuestNotFoundError if quest doesn't exist
+        """
+        chain = self._chains.get(quest_id)
+        if chain is not None:
+            return chain
+        if quest_id not in self.quest_data_dict:
+            raise QuestNotFoundError(f"Quest '{quest_id}' not found.")
+
+        # Walk up only as far as the nearest stored chain
+        walked = []
+        current = quest_id
+        while current is not None and current not in self._chains:
+            walked.append(current)
+            current = self.parents.get(current)
+
+        walked.reverse()
+        chain = (self._chains[current] if current is not None else ()) + tuple(walked)
+        self._chains[quest_id] = chain
+        return chain
+
+    def missing_prerequisite(self, quest_id):
+        """
+        First prerequisite in the quest's chain that is not in the catalog
+
+        Returns: Quest ID of the missing prerequisite, or None
+        """
+        return self._missing.get(quest_id)
+
+    def quest_bits(self, quest_ids):
+        """
+        Encode quest IDs as an integer bitset
+
+        Bit i is set when the quest at catalog position i is in quest_ids.
+        IDs not in the catalog are ignored.
+
+        Returns: Integer bitset
+        """
+        position = self.position
+        bits = 0
+        for quest_id in quest_ids:
+            index = position.get(quest_id)
+            if index is not None:
+                bits |= 1 << index
+        return bits
+
+    def prerequisite(self, quest_id):
+        """Prerequisite quest ID (even if missing from the catalog), or None"""
+        return self.parents.get(quest_id) or self.missing.get(quest_id)
+
+    def matches(self, quest_data_dict):
+        """True if the graph was built from this catalog (same dict, same size)"""
+        return quest_data_dict is self.quest_data_dict and len(quest_data_dict) == self.size
+
+
+# Most recently built graph (the game only ever uses one catalog at a time)
+_graph_cache = None
+
+
+def get_quest_graph(quest_data_dict):
+    """
+    Get the QuestGraph for a catalog, building it if the catalog changed
+
+    Returns: QuestGraph
+    Raises: QuestCycleError if prerequisites loop back on themselves
+    """
+    global _graph_cache
+    graph = _graph_cache
+    if graph is None or not graph.matches(quest_data_dict):
+        graph = _graph_cache = QuestGraph(quest_data_dict)
+    return graph
+
+
+def _topological_order(quest_data_dict, parents):
+    """
+    Order quests so every prerequisite comes first
+
+    Each quest is visited once: walk up the prerequisite links until reaching
+    a quest that is already placed, then place the walked path from the top.
+
+    Raises: QuestCycleError if a walk comes back to a quest on its own path
+    """
+    order = []
+    placed = set()
+    for quest_id in quest_data_dict:
+        path = []
+        on_path = {}
+        current = quest_id
+        while current is not None and current not in placed:
+            if current in on_path:
+                raise QuestCycleError(path[on_path[current]:])
+            on_path[current] = len(path)
+            path.append(current)
+            current = parents.get(current)
+        for walked_id in reversed(path):
+            placed.add(walked_id)
+            order.append(walked_id)
+    return tuple(order)
+
+
+# ============================================================================
+# QUEST AVAILABILITY
+# ============================================================================
+
+class QuestTracker:
+    """
+    Set of quests a character can accept, kept up to date as they play
+
+    Stored on the character under '_quest_tracker' (not saved). accept_quest,
+    complete_quest, abandon_quest and level-ups in gain_experience update it,
+    touching only the quests each change can affect. Reading it costs
+    O(result size).
+
+    The tracker remembers the lengths of the quest lists and the level it
+    last saw. If the character was changed some other way, it no longer
+    matches and get_available_quests builds a new one.
+    """
+
+    def __init__(self, character, quest_data_dict):
+        self.graph = get_quest_graph(quest_data_dict)
+        self.completed = set(character.get("completed_quests", []))
+        self.active = set(character.get("active_quests", []))
+        self.level = character.get("level", 1)
+        self.available = {quest_id for quest_id in quest_data_dict if self._eligible(quest_id)}
+        self._seen = self._state(character)
+
+    @staticmethod
+    def _state(character):
+        return (
+            len(character.get("completed_quests", [])),
+            len(character.get("active_quests", [])),
+            character.get("level", 1)
+        )
+
+    def in_sync(self, character):
+        """True if every change to the character's quests went through the tracker"""
+        return self._seen == self._state(character)
+
+    def _eligible(self, quest_id):
+        if quest_id in self.completed or quest_id in self.active:
+            return False
+        if self.graph.required_level.get(quest_id, 1) > self.level:
+            return False
+        prereq = self.graph.prerequisite(quest_id)
+        return prereq is None or prereq in self.completed
+
+    def quest_accepted(self, character, quest_id):
+        self.active.add(quest_id)
+        self.available.discard(quest_id)
+        self._seen = self._state(character)
+
+    def quest_abandoned(self, character, quest_id):
+        self.active.discard(quest_id)
+        if quest_id in self.graph and self._eligible(quest_id):
+            self.available.add(quest_id)
+        self._seen = self._state(character)
+
+    def quest_completed(self, character, quest_id):
+        self.active.discard(quest_id)
+        self.completed.add(quest_id)
+        self.available.discard(quest_id)
+        # Only quests that needed this one can have become available
+        for child in self.graph.children.get(quest_id, ()):
+            if self._eligible(child):
+                self.available.add(child)
+        self._seen = self._state(character)
+
+    def level_changed(self, character, old_level):
+        """Called by gain_experience after the character levels up"""
+        if self._seen != self._state(character)[:2] + (old_level,):
+            return  # Already stale; get_quest_tracker will rebuild it
+        new_level = character["level"]
+        self.level = new_level
+        graph = self.graph
+        if new_level > old_level:
+            # Quests with old_level < required_level <= new_level
+            start = bisect_right(graph.levels, old_level)
+            end = bisect_right(graph.levels, new_level)
+            for quest_id in graph.by_level[start:end]:
+                if self._eligible(quest_id):
+                    self.available.add(quest_id)
+        else:
+            self.available = {q for q in self.available if graph.required_level[q] <= new_level}
+        self._seen = self._state(character)
+
+    def available_quests(self):
+        """Available quest dictionaries in catalog order"""
+        data = self.graph.quest_data_dict
+        return [data[quest_id] for quest_id in sorted(self.available, key=self.graph.position.__getitem__)]
+
+
+def get_quest_tracker(character, quest_data_dict):
+    """
+    Get the character's QuestTracker, building a new one if it is stale
+
+    Returns: QuestTracker
+    """
+    tracker = character.get("_quest_tracker")
+    if tracker is None or not tracker.graph.matches(quest_data_dict) or not tracker.in_sync(character):
+        tracker = character["_quest_tracker"] = QuestTracker(character, quest_data_dict)
+    return tracker
+
+
+def _synced_tracker(character, key="_quest_tracker"):
+    """The character's tracker if it has seen every change so far, else None"""
+    tracker = character.get(key)
+    if tracker is not None and tracker.in_sync(character):
+        return tracker
+    return None
+
+
+# ============================================================================
+# QUEST OBJECTIVES
+# ============================================================================
+
+# Events that advance objectives (the first part of a quest's OBJECTIVE)
+EVENT_ENEMY_DEFEATED = "enemy_defeated"
+EVENT_ITEM_PURCHASED = "item_purchased"
+
+# Objective target that matches every event of its type
+ANY_TARGET = "*"
+
+
+class ObjectiveTracker:
+    """
+    Progress on the objectives of a character's active quests
+
+    Stored on the character under '_objectives' (not saved); the progress
+    counts themselves live in character['quest_progress'] and are saved.
+    Active quests with an objective are indexed by (event, target), so an
+    event only touches the objectives that care about it. When an
+    objective's count is reached the quest is completed with complete_quest.
+    """
+
+    def __init__(self, character, quest_data_dict):
+        self.quest_data_dict = quest_data_dict
+        self.rebuild(character)
+
+    def rebuild(self, character):
+        """Re-index the character's active quests"""
+        self.index = {}
+        self.progress = character.setdefault("quest_progress", {})
+        for quest_id in character.get("active_quests", []):
+            self._watch(quest_id)
+        self._seen = len(character.get("active_quests", []))
+
+    def in_sync(self, character):
+        """True if every accept, completion and abandon went through the tracker"""
+        return self._seen == len(character.get("active_quests", []))
+
+    def _watch(self, quest_id):
+        objective = self.quest_data_dict.get(quest_id, {}).get("objective")
+        if objective is None:
+            return
+        for target in objective["targets"]:
+            self.index.setdefault((objective["event"], target), []).append(quest_id)
+        self.progress.setdefault(quest_id, 0)
+
+    def _unwatch(self, quest_id):
+        objective = self.quest_data_dict.get(quest_id, {}).get("objective")
+        if objective is None:
+            return
+        for target in objective["targets"]:
+            watchers = self.index.get((objective["event"], target))
+            if watchers and quest_id in watchers:
+                watchers.remove(quest_id)
+        self.progress.pop(quest_id, None)
+
+    def quest_accepted(self, character, quest_id):
+        self._watch(quest_id)
+        self._seen = len(character["active_quests"])
+
+    def quest_finished(self, character, quest_id):
+        """Called when a quest is completed or abandoned"""
+        self._unwatch(quest_id)
+        self._seen = len(character["active_quests"])
+
+    def notify(self, character, event, targets, amount=1):
+        """
+        Advance the objectives an event matches
+
+        Args:
+            character: Character dictionary
+            event: One of the EVENT_* names
+            targets: What the event was about, e.g. ("goblin",) or
+                     (item_id, item_type); matched case-insensitively
+            amount: How many times the event happened
+
+        Returns: List of reward dictionaries from quests it completed
+        """
+        if not self.in_sync(character):
+            self.rebuild(character)
+
+        index = self.index
+        matched = {}
+        for target in tuple(targets) + (ANY_TARGET,):
+            for quest_id in index.get((event, str(target).lower()), ()):
+                matched[quest_id] = None
+
+        finished = []
+        for quest_id in matched:
+            count = self.progress.get(quest_id, 0) + amount
+            self.progress[quest_id] = count
+            if count >= self.quest_data_dict[quest_id]["objective"]["count"]:
+                finished.append(quest_id)
+
+        return [complete_quest(character, quest_id, self.quest_data_dict) for quest_id in finished]
+
+
+def get_objective_tracker(character, quest_data_dict):
+    """
+    Get the character's ObjectiveTracker, building one if needed
+
+    Call this when a character is loaded so events are tracked right away;
+    accept_quest also creates it.
+
+    Returns: ObjectiveTracker
+    """
+    tracker = character.get("_objectives")
+    if tracker is None or tracker.quest_data_dict is not quest_data_dict:
+        tracker = character["_objectives"] = ObjectiveTracker(character, quest_data_dict)
+    elif not tracker.in_sync(character):
+        tracker.rebuild(character)
+    return tracker
+
+
+def notify_quest_event(character, event, targets, amount=1):
+    """
+    Report a game event to the character's quest objectives
+
+    Does nothing until the character has an objective tracker (see
+    get_objective_tracker).
+
+    Returns: List of reward dictionaries from quests the event completed
+    """
+    tracker = character.get("_objectives")
+    if tracker is None:
+        return []
+    return tracker.notify(character, event, targets, amount)
 
-    # TODO: Implement prerequisite chain tracing
-    # Follow prerequisite links backwards
-    # Build list in reverse order
-    
 
 # ============================================================================
 # QUEST STATISTICS
@@ -382,9 +876,31 @@ def get_total_quest_rewards_earned(character, quest_data_dict):
     """
     Calculate total XP and gold earned from completed quests
     
+    Uses the character's running totals when it has them, so this does
+    not depend on how many quests were completed.
+
     Returns: Dictionary with 'total_xp' and 'total_gold'
     """
+    if "quests_completed" in character:
+        return {
+            "total_xp": character["quest_xp_earned"],
+            "total_gold": character["quest_gold_earned"]
+        }
+
+    totals = recompute_quest_totals(character, quest_data_dict)
+    return {
+        "total_xp": totals["quest_xp_earned"],
+        "total_gold": totals["quest_gold_earned"]
+    }
+
 
+def recompute_quest_totals(character, quest_data_dict):
+    """
+    Sum the quest totals from scratch over the completed quests
+
+    Returns: Dictionary with 'quests_completed', 'quest_xp_earned' and
+             'quest_gold_earned'
+    """
     total_xp = 0
     total_gold = 0
 
@@ -395,13 +911,37 @@ def get_total_quest_rewards_earned(character, quest_data_dict):
             total_gold += quest.get("reward_gold", 0)
 
     return {
-        "total_xp": total_xp,
-        "total_gold": total_gold
+        "quests_completed": len(character.get("completed_quests", [])),
+        "quest_xp_earned": total_xp,
+        "quest_gold_earned": total_gold
     }
 
-    # TODO: Implement reward calculation
-    # Sum up reward_xp and reward_gold for all completed quests
-    
+
+def verify_quest_totals(character, quest_data_dict, repair=False):
+    """
+    Check a character's running quest totals against a full recount
+
+    Meant for migrations: older saves have no totals, and totals drift if
+    quest lists are edited directly or quest rewards change.
+
+    Args:
+        character: Character dictionary
+        quest_data_dict: Dictionary of all quest data
+        repair: If True, overwrite the stored totals with the recount
+
+    Returns: Dictionary {field: (stored, recomputed)} of fields that differ
+             (empty if the totals are correct); missing totals count as None
+    """
+    recomputed = recompute_quest_totals(character, quest_data_dict)
+    mismatches = {
+        field: (character.get(field), value)
+        for field, value in recomputed.items()
+        if character.get(field) != value
+    }
+    if repair:
+        character.update(recomputed)
+    return mismatches
+
 
 def get_quests_by_level(quest_data_dict, min_level, max_level):
     """
@@ -510,13 +1050,21 @@ def display_character_quest_progress(character, quest_data_dict):
 # ============================================================================
 
 def validate_quest_prerequisites(quest_data_dict):
-    for quest_id, quest_data in quest_data_dict.items():
-        prerequisite = quest_data.get('prerequisite', 'NONE')
-        
-        if prerequisite != 'NONE':
-            
-            if prerequisite not in quest_data_dict:
-                raise QuestNotFoundError(f"Prerequisite quest '{prerequisite}' not found for quest '{quest_id}'.")
+    """
+    Validate that all quest prerequisites exist and form no cycles
+
+    Runs in time linear in the number of quests.
+
+    Returns: True if valid
+    Raises:
+        QuestNotFoundError if a prerequisite doesn't exist
+        QuestCycleError if prerequisites loop back on themselves
+    """
+    graph = get_quest_graph(quest_data_dict)
+
+    if graph.missing:
+        quest_id, prerequisite = next(iter(graph.missing.items()))
+        raise QuestNotFoundError(f"Prerequisite quest '{prerequisite}' not found for quest '{quest_id}'.")
 
     return True
 
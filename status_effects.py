@@ -0,0 +1,248 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Status Effects Module
+
+This module runs effects that last over several turns of a battle, such as
+poison, burn and regeneration. Each effect changes its target's health once
+a turn until it expires.
+
+Active effects are kept in a dictionary, so a turn only ticks the effects
+that exist. Their expiry turns are kept in a timing wheel: a ring of slots
+indexed by turn, where slot (turn % size) holds the effects ending on that
+turn. Ending effects is then a look at one slot instead of a search.
+"""
+
+# ============================================================================
+# EFFECT DEFINITIONS
+# ============================================================================
+
+# Sign of each turn's health change, by effect name
+EFFECT_SIGNS = {
+    "poison": -1,
+    "burn": -1,
+    "regen": 1
+}
+
+# Effects that hurt, so they are put on the enemy rather than the user
+HARMFUL_EFFECTS = frozenset(name for name, sign in EFFECT_SIGNS.items() if sign < 0)
+
+# Slots in the timing wheel; effects lasting longer wait in their slot for
+# another lap
+DEFAULT_WHEEL_SIZE = 16
+
+
+def parse_status_effect(effect_string):
+    """
+    Parse a status effect string
+
+    Args:
+        effect_string: String in format "effect:amount:turns", e.g.
+                       "poison:3:4" for 3 damage a turn for 4 turns
+
+    Returns: Tuple of (effect, amount, turns)
+    Raises: ValueError if the string is malformed, names an unknown effect,
+            or amount or turns is not positive
+    """
+    parts = effect_string.split(":")
+    if len(parts) != 3:
+        raise ValueError(f"Status effect must be 'effect:amount:turns', got '{effect_string}'")
+    effect = parts[0].strip()
+    if effect not in EFFECT_SIGNS:
+        raise ValueError(f"Unknown status effect '{effect}'")
+    amount, turns = int(parts[1]), int(parts[2])
+    if amount < 1 or turns < 1:
+        raise ValueError(f"Status effect amount and turns must be positive, got '{effect_string}'")
+    return effect, amount, turns
+
+
+def compile_status_effect(effect_string):
+    """
+    Get the status effect an effect string describes, if it describes one
+
+    Results are cached by effect string, so items and abilities using the
+    same effect never parse it twice.
+
+    Returns: Tuple of (effect, amount, turns), or None for other effects
+             (e.g. "health:20")
+    Raises: ValueError if the string names a status effect but is malformed
+    """
+    try:
+        return _compiled_effects[effect_string]
+    except KeyError:
+        pass
+
+    status = None
+    if effect_string.split(":", 1)[0].strip() in EFFECT_SIGNS:
+        status = parse_status_effect(effect_string)
+    _compiled_effects[effect_string] = status
+    return status
+
+
+# Compiled effects: {effect_string: (effect, amount, turns) or None}
+_compiled_effects = {}
+
+# ============================================================================
+# STATUS EFFECT ENGINE
+# ============================================================================
+
+class ActiveEffect:
+    """One effect on one target"""
+
+    __slots__ = ("target", "effect", "change", "expires")
+
+    def __init__(self, target, effect, change, expires):
+        self.target = target
+        self.effect = effect
+        self.change = change      # health change each turn (negative = damage)
+        self.expires = expires    # last turn it ticks on
+
+
+class StatusEffects:
+    """
+    Timed effects on every combatant in one battle
+
+    Effects are keyed by (target, effect), so a target has at most one of
+    each effect; putting it on again replaces it. An effect of n turns
+    applied on turn t ticks on turns t + 1 to t + n.
+    """
+
+    def __init__(self, turn=0, wheel_size=DEFAULT_WHEEL_SIZE):
+        """
+        Args:
+            turn: Current battle turn
+            wheel_size: Slots in the expiry wheel
+        """
+        if wheel_size < 1:
+            raise ValueError("Timing wheel size must be at least 1")
+        self.turn = turn
+        # {(id(target), effect): ActiveEffect}; battles check it every turn
+        # to skip tick() while it is empty
+        self.active = {}
+        self._wheel = [[] for _ in range(wheel_size)]   # ActiveEffects by expiry turn % size
+
+    def __len__(self):
+        """Number of active effects"""
+        return len(self.active)
+
+    def apply(self, target, effect, amount, turns):
+        """
+        Put an effect on a target from this turn
+
+        Args:
+            target: Character or enemy dictionary (or Combatant)
+            effect: Effect name (see EFFECT_SIGNS)
+            amount: Health lost or gained each turn
+            turns: Turns the effect lasts
+        """
+        if turns < 1:
+            return
+        active = ActiveEffect(target, effect, EFFECT_SIGNS[effect] * amount, self.turn + turns)
+        self.active[(id(target), effect)] = active
+        wheel = self._wheel
+        wheel[active.expires % len(wheel)].append(active)
+
+    def apply_from(self, user, opponent, status):
+        """
+        Put a compiled status effect on whoever it is meant for
+
+        Harmful effects (HARMFUL_EFFECTS) go on the opponent, others on the
+        user.
+
+        Args:
+            user: Combatant using the ability or item
+            opponent: The other combatant
+            status: Tuple of (effect, amount, turns), see compile_status_effect
+
+        Returns: The target the effect was put on
+        """
+        effect, amount, turns = status
+        target = opponent if effect in HARMFUL_EFFECTS else user
+        self.apply(target, effect, amount, turns)
+        return target
+
+    def has(self, target, effect):
+        """Check whether a target has an effect"""
+        return (id(target), effect) in self.active
+
+    def remaining(self, target, effect):
+        """
+        Turns an effect will still tick on a target
+
+        Returns: 0 if the target doesn't have it
+        """
+        active = self.active.get((id(target), effect))
+        if active is None:
+            return 0
+        return active.expires - self.turn
+
+    def effects_on(self, target):
+        """
+        Effects on a target
+
+        Returns: Dictionary {effect: turns remaining}
+        """
+        return {
+            active.effect: active.expires - self.turn
+            for active in self.active.values() if active.target is target
+        }
+
+    def remove(self, target, effect):
+        """
+        Take an effect off a target early
+
+        Returns: True if the target had it
+        """
+        return self.active.pop((id(target), effect), None) is not None
+
+    def tick(self, turn=None):
+        """
+        Move the battle to a later turn and tick every active effect
+
+        Effects tick once per call. Ticking costs one step per active
+        effect; ending effects only looks at the wheel slots for the turns
+        moved through.
+
+        Args:
+            turn: Turn to move to (the next turn if None)
+
+        Returns: List of (target, effect, health change) for each tick
+        """
+        previous = self.turn
+        self.turn = turn = previous + 1 if turn is None else turn
+        if not self.active:
+            return []
+
+        ticks = []
+        for active in self.active.values():
+            target = active.target
+            health = target["health"] + active.change
+            if health < 0:
+                health = 0
+            elif health > target["max_health"]:
+                health = target["max_health"]
+            ticks.append((target, active.effect, health - target["health"]))
+            target["health"] = health
+
+        wheel = self._wheel
+        active_effects = self.active
+        for passed in range(max(previous + 1, turn - len(wheel) + 1), turn + 1):
+            slot = wheel[passed % len(wheel)]
+            if not slot:
+                continue
+            waiting = []
+            for active in slot:
+                key = (id(active.target), active.effect)
+                if active_effects.get(key) is not active:
+                    continue   # replaced or removed since
+                if active.expires <= turn:
+                    del active_effects[key]
+                else:
+                    waiting.append(active)   # ends on a later lap
+            slot[:] = waiting
+        return ticks
+
+    def clear(self):
+        """End every effect"""
+        self.active.clear()
+        for slot in self._wheel:
+            slot.clear()
@@ -139,6 +139,22 @@ def test_quest_not_active_exception():
     with pytest.raises(QuestNotActiveError):
         quest_handler.complete_quest(char, "test_quest", quests)
 
+def test_quest_cycle_exception():
+    """Test that QuestCycleError reports a prerequisite loop instead of hanging"""
+    quests = {
+        'start': {'quest_id': 'start', 'prerequisite': 'NONE'},
+        'a': {'quest_id': 'a', 'prerequisite': 'c'},
+        'b': {'quest_id': 'b', 'prerequisite': 'a'},
+        'c': {'quest_id': 'c', 'prerequisite': 'b'}
+    }
+
+    with pytest.raises(QuestCycleError) as info:
+        quest_handler.get_quest_prerequisite_chain('b', quests)
+    assert set(info.value.cycle) == {'a', 'b', 'c'}
+
+    with pytest.raises(QuestCycleError):
+        quest_handler.validate_quest_prerequisites(quests)
+
 # ============================================================================
 # GAME DATA EXCEPTION TESTS
 # ============================================================================
@@ -160,6 +176,36 @@ def test_invalid_data_format_exception():
     finally:
         os.remove("test_bad_data.txt")
 
+def test_invalid_quest_objective_exception():
+    """Test that InvalidDataFormatError is raised for a malformed OBJECTIVE"""
+    for objective in ["enemy_defeated:goblin", "enemy_defeated:goblin:many", "enemy_defeated:goblin:0"]:
+        with pytest.raises(InvalidDataFormatError):
+            game_data.parse_quest_objective(objective)
+
+def test_invalid_enemy_data_exception(tmp_path):
+    """Test that InvalidDataFormatError is raised for bad enemy templates"""
+    path = tmp_path / "enemies.txt"
+    path.write_text("ENEMY_ID: slime\nNAME: Slime\nHEALTH: lots\n")
+    with pytest.raises(InvalidDataFormatError):
+        game_data.load_enemies(str(path))
+
+    path.write_text("ENEMY_ID: slime\nNAME: Slime\nHEALTH: 10\n")
+    with pytest.raises(InvalidDataFormatError):
+        game_data.load_enemies(str(path))
+
+def test_invalid_ability_data_exception(tmp_path):
+    """Test that InvalidDataFormatError is raised for a bad COOLDOWN or EFFECT"""
+    path = tmp_path / "abilities.txt"
+    for cooldown in ["soon", "-1"]:
+        path.write_text(f"ABILITY_ID: smite\nCLASS: Cleric\nNAME: Smite\nCOOLDOWN: {cooldown}\n")
+        with pytest.raises(InvalidDataFormatError):
+            game_data.load_abilities(str(path))
+
+    for effect in ["poison:3", "frostbite:3:3", "burn:0:2"]:
+        path.write_text(f"ABILITY_ID: smite\nCLASS: Cleric\nNAME: Smite\nCOOLDOWN: 1\nEFFECT: {effect}\n")
+        with pytest.raises(InvalidDataFormatError):
+            game_data.load_abilities(str(path))
+
 # ============================================================================
 # COMBAT EXCEPTION TESTS
 # ============================================================================
@@ -184,6 +230,17 @@ def test_combat_not_active_exception():
     with pytest.raises(CombatNotActiveError):
         battle.player_turn()
 
+def test_ability_on_cooldown_exception():
+    """Test that AbilityOnCooldownError is raised for a special used too soon"""
+    import combat_system
+
+    char = character_manager.create_character("CooldownTest", "Mage")
+    battle = combat_system.SimpleBattle(char, combat_system.create_enemy("dragon"))
+    combat_system.use_special_ability(battle.player, battle.foe, battle.cooldowns)
+
+    with pytest.raises(AbilityOnCooldownError):
+        combat_system.use_special_ability(battle.player, battle.foe, battle.cooldowns)
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
 
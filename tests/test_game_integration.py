@@ -14,6 +14,7 @@ import inventory_system
 import quest_handler
 import combat_system
 import game_data
+import gold_ledger
 
 # ============================================================================
 # CHARACTER INTEGRATION TESTS
@@ -40,6 +41,75 @@ def test_character_creation_and_saving():
     # Cleanup
     character_manager.delete_character("IntegrationTest")
 
+def test_inventory_save_load_round_trip(tmp_path):
+    """Test that the compact inventory is saved as item IDs and restored"""
+    game_data.load_items("data/items.txt")  # health potions stack, swords don't
+    char = character_manager.create_character("PackedTest", "Rogue")
+    assert isinstance(char['inventory'], inventory_system.Inventory)
+
+    for item_id in ["health_potion", "iron_sword", "health_potion"]:
+        inventory_system.add_item_to_inventory(char, item_id)
+    assert inventory_system.count_item(char, "health_potion") == 2
+
+    character_manager.save_character(char, str(tmp_path))
+    assert "inventory:health_potion*2,iron_sword" in (tmp_path / "PackedTest_save.txt").read_text()
+
+    loaded = character_manager.load_character("PackedTest", str(tmp_path))
+    assert isinstance(loaded['inventory'], inventory_system.Inventory)
+    assert loaded['inventory'] == ["health_potion", "health_potion", "iron_sword"]
+
+    # A single saved item comes back as a one-item inventory, not a string
+    char['inventory'].clear()
+    char['inventory'].append("iron_sword")
+    character_manager.save_character(char, str(tmp_path))
+    assert character_manager.load_character("PackedTest", str(tmp_path))['inventory'] == ["iron_sword"]
+
+def test_quest_log_save_load_round_trip(tmp_path):
+    """Test that quest lists are ordered sets in memory and plain lists on disk"""
+    char = character_manager.create_character("QuestLogTest", "Mage")
+    assert isinstance(char['completed_quests'], quest_handler.QuestLog)
+
+    for quest_id in ["c_quest", "a_quest", "b_quest", "a_quest"]:
+        char['completed_quests'].append(quest_id)
+    char['active_quests'].append("d_quest")
+    assert char['completed_quests'] == ["c_quest", "a_quest", "b_quest"]
+    assert "b_quest" in char['completed_quests'] and char['completed_quests'][-1] == "b_quest"
+
+    character_manager.save_character(char, str(tmp_path))
+    text = (tmp_path / "QuestLogTest_save.txt").read_text()
+    assert "completed_quests:c_quest,a_quest,b_quest\n" in text
+    assert "active_quests:d_quest\n" in text
+
+    loaded = character_manager.load_character("QuestLogTest", str(tmp_path))
+    assert isinstance(loaded['active_quests'], quest_handler.QuestLog)
+    assert loaded['active_quests'] == ["d_quest"]
+    assert loaded['completed_quests'] == char['completed_quests']
+    assert character_manager.validate_character_data(loaded)
+
+def test_stackable_inventory_slots():
+    """Test that stackable items share slots up to their stack size"""
+    from custom_exceptions import InventoryFullError
+    items = game_data.load_items("data/items.txt")
+    stack = items['health_potion']['stack_size']
+    char = character_manager.create_character("StackTest", "Cleric")
+    char['gold'] = 10000
+
+    # A full inventory of potion stacks...
+    for _ in range(stack * inventory_system.MAX_INVENTORY_SIZE):
+        inventory_system.purchase_item(char, 'health_potion', items['health_potion'])
+
+    assert inventory_system.count_item(char, 'health_potion') == stack * inventory_system.MAX_INVENTORY_SIZE
+    assert inventory_system.get_inventory_space_remaining(char) == 0
+    assert inventory_system.get_inventory_slots(char)[0] == ('health_potion', stack)
+    with pytest.raises(InventoryFullError):
+        inventory_system.add_item_to_inventory(char, 'health_potion')
+
+    # ...frees room on a stack when one is used
+    inventory_system.remove_item_from_inventory(char, 'health_potion')
+    inventory_system.add_item_to_inventory(char, 'health_potion')
+    with pytest.raises(InventoryFullError):
+        inventory_system.add_item_to_inventory(char, 'iron_sword')
+
 def test_character_leveling_system():
     """Test that character leveling works correctly"""
     char = character_manager.create_character("LevelTest", "Mage")
@@ -89,6 +159,31 @@ def test_inventory_item_management():
     assert "health_potion" not in char['inventory']  # Consumed
     assert char['health'] == 70  # Healed
 
+def test_compiled_item_effects():
+    """Test that compiled effects heal up to max_health and add other stats"""
+    char = character_manager.create_character("EffectTest", "Mage")
+    items = {
+        'big_potion': {'type': 'consumable', 'effect': 'health:500'},
+        'elixir': {'type': 'consumable', 'effect': 'magic:4'}
+    }
+    inventory_system.compile_item_effects(items)
+
+    heal = inventory_system.compile_item_effect('health:500')[2]
+    assert inventory_system.compile_item_effect('health:500')[:2] == ('health', 500)
+
+    char['health'] = 1
+    heal(char)
+    assert char['health'] == char['max_health']
+
+    magic = char['magic']
+    inventory_system.add_item_to_inventory(char, 'elixir')
+    inventory_system.use_item(char, 'elixir', items['elixir'])
+    assert char['magic'] == magic + 4
+
+    inventory_system.apply_stat_effect(char, 'health', -5)
+    inventory_system.apply_stat_effect(char, 'health', 100)
+    assert char['health'] == char['max_health']
+
 def test_equipment_system():
     """Test equipping weapons and armor"""
     char = character_manager.create_character("EquipTest", "Warrior")
@@ -123,6 +218,198 @@ def test_shop_system():
     assert gold_received == 12  # Half of cost (25 // 2)
     assert "health_potion" not in char['inventory']
 
+def test_shop_transaction_basket():
+    """Test buying and selling a basket of items in one transaction"""
+    char = character_manager.create_character("BasketTest", "Warrior")
+    items = {
+        'health_potion': {'cost': 10, 'type': 'consumable'},
+        'iron_sword': {'cost': 100, 'type': 'weapon'}
+    }
+    char['inventory'].append('iron_sword')
+
+    # Selling the sword (50 gold) pays for part of the potions
+    summary = inventory_system.process_shop_transaction(
+        char, items, buy={'health_potion': 15}, sell={'iron_sword': 1}
+    )
+
+    assert summary['gold_spent'] == 150
+    assert summary['gold_received'] == 50
+    assert char['gold'] == 0
+    assert inventory_system.count_item(char, 'health_potion') == 15
+    assert 'iron_sword' not in char['inventory']
+
+def test_shop_transaction_all_or_nothing():
+    """Test that a failing basket leaves the character untouched"""
+    from custom_exceptions import InsufficientResourcesError, InventoryFullError
+    char = character_manager.create_character("AtomicTest", "Mage")
+    items = {'health_potion': {'cost': 10, 'type': 'consumable'}}
+
+    with pytest.raises(InsufficientResourcesError):
+        inventory_system.process_shop_transaction(char, items, buy={'health_potion': 11})
+    with pytest.raises(InventoryFullError):
+        inventory_system.process_shop_transaction(
+            char, {'iron_sword': {'cost': 0}}, buy={'iron_sword': 21}
+        )
+    for quantity in [True, 0, 1.0]:
+        with pytest.raises(ValueError):
+            inventory_system.process_shop_transaction(char, items, buy={'health_potion': quantity})
+
+    assert char['gold'] == 100
+    assert char['inventory'] == []
+
+def test_shop_index_queries():
+    """Test cost-sorted shop index lookups and paging"""
+    items = game_data.load_items("data/items.txt")
+    index = inventory_system.ShopIndex(items)
+
+    affordable = index.affordable(100)
+    assert affordable == sorted(
+        (i for i in items if items[i]['cost'] <= 100), key=lambda i: (items[i]['cost'], i)
+    )
+
+    weapons = index.affordable(200, 'weapon')
+    assert weapons == ['iron_sword', 'fire_staff']
+
+    # Pages cover the filtered listing without overlap
+    pages = [index.page(p, 3, max_cost=100) for p in range(3)]
+    assert [item_id for page in pages for item_id, _ in page] == affordable
+    assert index.count(100) == len(affordable)
+    assert index.page(10, 3) == []
+
+def test_gold_ledger_records_and_flushes(tmp_path):
+    """Test that the ledger batches entries to disk and aggregates per hour"""
+    path = tmp_path / "ledger.csv"
+    ledger = gold_ledger.GoldLedger(str(path), batch_size=3)
+
+    ledger.record("Hero", 50, gold_ledger.REASON_QUEST_REWARD)
+    ledger.record("Hero", -25, gold_ledger.REASON_PURCHASE)
+    assert len(ledger) == 2
+    assert not path.exists()  # Nothing written before a full batch
+
+    ledger.record("Hero", 12, gold_ledger.REASON_SALE)
+    assert len(ledger) == 0
+    assert len(path.read_text().splitlines()) == 3
+
+    ledger.record("Sidekick", -10, gold_ledger.REASON_PURCHASE)
+    flow = ledger.gold_flow_by_reason_per_hour()
+    purchases = [v for (hour, reason), v in flow.items() if reason == "purchase"]
+    assert sum(v['gold_out'] for v in purchases) == 35
+    assert sum(v['net'] for v in flow.values()) == 27
+
+def test_gold_changes_are_ledgered(monkeypatch):
+    """Test that shop and reward gold changes land in the default ledger"""
+    ledger = gold_ledger.GoldLedger(None)
+    monkeypatch.setattr(gold_ledger, "default_ledger", ledger)
+
+    char = character_manager.create_character("LedgerTest", "Rogue")
+    inventory_system.purchase_item(char, "health_potion", {'cost': 25})
+    inventory_system.sell_item(char, "health_potion", {'cost': 25})
+    character_manager.add_gold(char, 10, gold_ledger.REASON_BATTLE_REWARD)
+
+    flow = ledger.gold_flow_by_reason_per_hour()
+    by_reason = {reason: v['net'] for (hour, reason), v in flow.items()}
+    assert by_reason == {'purchase': -25, 'sale': 12, 'battle_reward': 10}
+
+def test_economy_simulation_conserves_gold():
+    """Test that simulated gold only moves through shop and quest rules"""
+    pytest.importorskip("numpy")
+    import economy_simulator
+
+    items = game_data.load_items("data/items.txt")
+    quests = game_data.load_quests("data/quests.txt")
+    report = economy_simulator.simulate_economy(2000, 30, items, quests, seed=7)
+
+    created = report['gold_created'].sum()
+    destroyed = report['gold_destroyed'].sum()
+    assert report['money_supply'][-1] == 2000 * 100 + created - destroyed
+    assert report['final_gold'].min() >= 0
+    assert len(report['inflation']) == 30
+
+    # Same seed, same economy
+    again = economy_simulator.simulate_economy(2000, 30, items, quests, seed=7)
+    assert (again['final_gold'] == report['final_gold']).all()
+
+def test_economy_simulation_counts_stacked_slots():
+    """Test that simulated inventories fill by slots, as in the game"""
+    pytest.importorskip("numpy")
+    import economy_simulator
+
+    policy = economy_simulator.EconomyPolicy(buy_chance=1, sell_chance=0, quest_chance=0, starting_gold=1000)
+    for stack in [1, 10]:
+        items = {'pebble': {'cost': 1, 'stack_size': stack}}
+        report = economy_simulator.simulate_economy(10, 300, items, {}, policy)
+        assert report['gold_destroyed'].sum() == 10 * inventory_system.MAX_INVENTORY_SIZE * stack
+
+def test_locked_character_can_be_copied():
+    """Test that a character's lock doesn't stop it being copied or pickled"""
+    import copy
+    import pickle
+    import threading
+
+    char = character_manager.create_character("CopyTest", "Rogue")
+    lock = character_manager.character_lock(char)
+    with lock:
+        for clone in [copy.deepcopy(char), pickle.loads(pickle.dumps(char))]:
+            assert clone['name'] == "CopyTest"
+            clone_lock = character_manager.character_lock(clone)
+            assert clone_lock is not lock
+            # The copy's lock is free even while the original is held
+            acquired = []
+            def try_lock():
+                acquired.append(clone_lock.acquire(blocking=False))
+                clone_lock.release()
+            worker = threading.Thread(target=try_lock)
+            worker.start()
+            worker.join()
+            assert acquired == [True]
+
+def test_concurrent_shop_preserves_totals(monkeypatch):
+    """Test that 32 threads buying and selling for one character lose no gold"""
+    import threading
+    from custom_exceptions import InventoryError
+
+    monkeypatch.setattr(gold_ledger, "default_ledger", gold_ledger.GoldLedger(None))
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Switch threads as often as possible
+
+    char = character_manager.create_character("ThreadTest", "Warrior")
+    char['gold'] = 1000
+    item = {'cost': 10, 'type': 'weapon', 'effect': 'strength:1'}
+    bought, sold, granted = [], [], []
+
+    def worker():
+        b = s = g = 0
+        for _ in range(200):
+            try:
+                inventory_system.purchase_item(char, 'stress_sword', item)
+                b += 1
+            except InventoryError:
+                pass
+            try:
+                inventory_system.sell_item(char, 'stress_sword', item)
+                s += 1
+            except InventoryError:
+                pass
+            character_manager.add_gold(char, 1)
+            g += 1
+        bought.append(b)
+        sold.append(s)
+        granted.append(g)
+
+    threads = [threading.Thread(target=worker) for _ in range(32)]
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert char['gold'] == 1000 - 10 * sum(bought) + 5 * sum(sold) + sum(granted)
+    assert inventory_system.count_item(char, 'stress_sword') == sum(bought) - sum(sold)
+    ledger = gold_ledger.default_ledger
+    assert len(ledger) + ledger.flushed_count == sum(bought) + sum(sold) + sum(granted)
+
 # ============================================================================
 # QUEST INTEGRATION TESTS
 # ============================================================================
@@ -187,10 +474,238 @@ def test_quest_prerequisite_system():
     quest_handler.accept_quest(char, 'second_quest', quests)
     assert 'second_quest' in char['active_quests']
 
+def test_quest_graph_chains_and_order():
+    """Test that the quest graph orders prerequisites first and stores chains"""
+    quests = {
+        'c': {'quest_id': 'c', 'prerequisite': 'b'},
+        'b': {'quest_id': 'b', 'prerequisite': 'a'},
+        'a': {'quest_id': 'a', 'prerequisite': 'NONE'},
+        'side': {'quest_id': 'side', 'prerequisite': 'lost_quest'},
+        'after_side': {'quest_id': 'after_side', 'prerequisite': 'side'}
+    }
+
+    graph = quest_handler.get_quest_graph(quests)
+    assert quest_handler.get_quest_graph(quests) is graph
+    assert graph.order.index('a') < graph.order.index('b') < graph.order.index('c')
+    assert graph.chain('c') == ('a', 'b', 'c')
+    assert graph.missing_prerequisite('after_side') == 'lost_quest'
+
+    assert quest_handler.get_quest_prerequisite_chain('c', quests) == ['a', 'b', 'c']
+    from custom_exceptions import QuestNotFoundError
+    with pytest.raises(QuestNotFoundError):
+        quest_handler.get_quest_prerequisite_chain('after_side', quests)
+    with pytest.raises(QuestNotFoundError):
+        quest_handler.validate_quest_prerequisites(quests)
+
+    del quests['side'], quests['after_side']
+    assert quest_handler.validate_quest_prerequisites(quests)
+
+def test_available_quests_tracked_incrementally():
+    """Test that the availability tracker follows accepts, completions and level-ups"""
+    char = character_manager.create_character("TrackerTest", "Warrior")
+    quests = {
+        'intro': {'quest_id': 'intro', 'required_level': 1, 'prerequisite': 'NONE',
+                  'reward_xp': 150, 'reward_gold': 0},
+        'road': {'quest_id': 'road', 'required_level': 1, 'prerequisite': 'intro',
+                 'reward_xp': 0, 'reward_gold': 0},
+        'keep': {'quest_id': 'keep', 'required_level': 2, 'prerequisite': 'intro',
+                 'reward_xp': 0, 'reward_gold': 0},
+        'side': {'quest_id': 'side', 'required_level': 3, 'prerequisite': 'NONE',
+                 'reward_xp': 0, 'reward_gold': 0}
+    }
+
+    def available_ids():
+        return [q['quest_id'] for q in quest_handler.get_available_quests(char, quests)]
+
+    assert available_ids() == ['intro']
+    tracker = char['_quest_tracker']
+
+    quest_handler.accept_quest(char, 'intro', quests)
+    assert available_ids() == []
+
+    # Completing intro levels the character to 2, unlocking road and keep
+    quest_handler.complete_quest(char, 'intro', quests)
+    assert char['level'] == 2
+    assert available_ids() == ['road', 'keep']
+
+    quest_handler.accept_quest(char, 'keep', quests)
+    quest_handler.abandon_quest(char, 'keep')
+    assert available_ids() == ['road', 'keep']
+
+    character_manager.gain_experience(char, 200)
+    assert available_ids() == ['road', 'keep', 'side']
+    assert char['_quest_tracker'] is tracker  # Kept up to date, never rebuilt
+
+    # Changing the lists directly makes the tracker rebuild itself
+    char['completed_quests'].append('road')
+    assert available_ids() == ['keep', 'side']
+    assert char['_quest_tracker'] is not tracker
+
+def test_quest_running_totals(tmp_path):
+    """Test that complete_quest keeps running totals that survive saving"""
+    char = character_manager.create_character("TotalsTest", "Cleric")
+    quests = {
+        'a': {'quest_id': 'a', 'required_level': 1, 'prerequisite': 'NONE', 'reward_xp': 30, 'reward_gold': 10},
+        'b': {'quest_id': 'b', 'required_level': 1, 'prerequisite': 'NONE', 'reward_xp': 20, 'reward_gold': 5}
+    }
+    for quest_id in quests:
+        quest_handler.accept_quest(char, quest_id, quests)
+        quest_handler.complete_quest(char, quest_id, quests)
+
+    assert quest_handler.get_total_quest_rewards_earned(char, quests) == {'total_xp': 50, 'total_gold': 15}
+    assert quest_handler.verify_quest_totals(char, quests) == {}
+
+    character_manager.save_character(char, str(tmp_path))
+    loaded = character_manager.load_character("TotalsTest", str(tmp_path))
+    assert (loaded['quests_completed'], loaded['quest_xp_earned'], loaded['quest_gold_earned']) == (2, 50, 15)
+
+    # Older saves have no totals; the verifier reports and fills them in
+    for field in ('quests_completed', 'quest_xp_earned', 'quest_gold_earned'):
+        del loaded[field]
+    assert quest_handler.verify_quest_totals(loaded, quests, repair=True)['quest_xp_earned'] == (None, 50)
+    assert loaded['quest_gold_earned'] == 15
+
+def test_quest_objectives_auto_complete(tmp_path, monkeypatch):
+    """Test that combat and shop events advance objectives and complete quests"""
+    monkeypatch.setattr(gold_ledger, "default_ledger", gold_ledger.GoldLedger(None))
+    quests = game_data.load_quests("data/quests.txt")
+    assert quests['goblin_hunter']['objective'] == {'event': 'enemy_defeated', 'targets': ('goblin',), 'count': 3}
+
+    char = character_manager.create_character("ObjectiveTest", "Warrior")
+    char['level'] = 2
+    char['completed_quests'].append('first_steps')
+    quest_handler.accept_quest(char, 'goblin_hunter', quests)
+    quest_handler.accept_quest(char, 'equipment_upgrade', quests)
+
+    # Only matching events count
+    assert quest_handler.notify_quest_event(char, quest_handler.EVENT_ENEMY_DEFEATED, ('Orc',)) == []
+    quest_handler.notify_quest_event(char, quest_handler.EVENT_ENEMY_DEFEATED, ('Goblin',), 2)
+    assert char['quest_progress'] == {'goblin_hunter': 2, 'equipment_upgrade': 0}
+
+    # Progress is saved and picked up again after loading
+    character_manager.save_character(char, str(tmp_path))
+    char = character_manager.load_character("ObjectiveTest", str(tmp_path))
+    assert char['quest_progress'] == {'goblin_hunter': 2, 'equipment_upgrade': 0}
+    quest_handler.get_objective_tracker(char, quests)
+
+    rewards = quest_handler.notify_quest_event(char, quest_handler.EVENT_ENEMY_DEFEATED, ('goblin',))
+    assert [r['quest_id'] for r in rewards] == ['goblin_hunter']
+    assert 'goblin_hunter' in char['completed_quests']
+
+    # Buying a consumable doesn't count; buying a weapon completes the quest
+    gold = char['gold']
+    inventory_system.purchase_item(char, 'health_potion', {'cost': 25, 'type': 'consumable'})
+    assert 'equipment_upgrade' in char['active_quests']
+    inventory_system.purchase_item(char, 'iron_sword', {'cost': 50, 'type': 'weapon'})
+    assert 'equipment_upgrade' in char['completed_quests']
+    assert char['gold'] == gold - 75 + quests['equipment_upgrade']['reward_gold']
+    assert char['quest_progress'] == {}
+
+def test_batch_quest_eligibility_matches_can_accept():
+    """Test that bitset eligibility agrees with can_accept_quest for every character"""
+    pytest.importorskip("numpy")
+    import random
+    import quest_analytics
+
+    quests = game_data.load_quests("data/quests.txt")
+    quest_ids = list(quests)
+    rng = random.Random(3)
+    chars = [
+        {
+            'level': rng.randint(1, 15),
+            'completed_quests': quest_handler.QuestLog(q for q in quest_ids if rng.random() < 0.5),
+            'active_quests': [q for q in quest_ids if rng.random() < 0.1]
+        }
+        for _ in range(300)
+    ]
+
+    population = quest_analytics.QuestPopulation.from_characters(chars, quests)
+    for quest_id in quest_ids:
+        expected = [quest_handler.can_accept_quest(c, quest_id, quests) for c in chars]
+        assert quest_analytics.eligible_for_quest(population, quest_id).tolist() == expected
+
+    counts = quest_analytics.count_eligible(population)
+    assert counts[quest_ids[0]] == sum(quest_handler.can_accept_quest(c, quest_ids[0], quests) for c in chars)
+
+def test_eligibility_matrix_streams_in_chunks(tmp_path):
+    """Test that the streamed matrix matches can_accept_quest, including saved characters"""
+    pytest.importorskip("numpy")
+    import random
+    import quest_analytics
+
+    quests = dict(game_data.load_quests("data/quests.txt"))
+    quests['lost_sequel'] = {'quest_id': 'lost_sequel', 'required_level': 1, 'prerequisite': 'lost_quest'}
+    quest_ids = list(quests)
+    rng = random.Random(5)
+    chars = [
+        {
+            'name': f"Hero{i}",
+            'level': rng.randint(1, 12),
+            'completed_quests': [q for q in quest_ids if rng.random() < 0.5],
+            'active_quests': [q for q in quest_ids if rng.random() < 0.1]
+        }
+        for i in range(150)
+    ]
+    expected = [[quest_handler.can_accept_quest(c, q, quests) for q in quest_ids] for c in chars]
+
+    population = quest_analytics.QuestPopulation.from_characters(chars, quests)
+    chunks = list(quest_analytics.iter_eligibility_matrix(population, chunk_size=64))
+    assert [start for start, _ in chunks] == [0, 64, 128]
+    assert quest_analytics.eligibility_matrix(population, chunk_size=64).tolist() == expected
+
+    # A column subset keeps the requested order
+    subset = quest_analytics.eligibility_matrix(population, ['orc_menace', 'first_steps'])
+    assert subset[:, 1].tolist() == [row[0] for row in expected]
+
+    # Counts over a directory of saves
+    for i in range(3):
+        char = character_manager.create_character(f"Saved{i}", "Mage")
+        char['level'] = 2
+        if i:
+            char['completed_quests'].append('first_steps')
+        character_manager.save_character(char, str(tmp_path))
+    counts = quest_analytics.saved_eligibility_counts(quests, str(tmp_path), chunk_size=2)
+    assert counts['first_steps'] == 1
+    assert counts['goblin_hunter'] == 2
+    assert counts['lost_sequel'] == 0
+
 # ============================================================================
 # COMBAT INTEGRATION TESTS
 # ============================================================================
 
+def test_enemy_registry_clones_prototypes():
+    """Test that enemies come from data/enemies.txt and are independent copies"""
+    registry = combat_system.load_enemy_registry(filename="data/enemies.txt")
+    assert set(registry) == set(game_data.load_enemies("data/enemies.txt"))
+    with pytest.raises(TypeError):
+        registry['goblin']['health'] = 1
+
+    dragon = combat_system.get_random_enemy_for_level(6)
+    assert dragon['name'] == "Dragon" and dragon['health'] == dragon['max_health'] == 200
+    dragon['health'] = 0
+    assert combat_system.create_enemy("DRAGON")['health'] == 200
+
+    # Prototypes keep their ID, which quest objectives are written against
+    # even when the display name differs
+    troll = {'name': "Cave Troll", 'health': 80, 'strength': 14, 'magic': 0, 'xp_reward': 40, 'gold_reward': 20}
+    try:
+        combat_system.load_enemy_registry({'cave_troll': troll})
+        assert combat_system.create_enemy("cave_troll")['enemy_id'] == "cave_troll"
+    finally:
+        combat_system.load_enemy_registry()
+
+def test_default_enemies_file(tmp_path, monkeypatch):
+    """Test that the default enemies.txt has every enemy type"""
+    monkeypatch.chdir(tmp_path)
+    game_data.create_default_data_files()
+    try:
+        combat_system.load_enemy_registry(filename="data/enemies.txt")
+        for enemy_type, health in [("goblin", 30), ("orc", 50), ("dragon", 200)]:
+            assert combat_system.create_enemy(enemy_type)['health'] == health
+    finally:
+        monkeypatch.undo()
+        combat_system.load_enemy_registry()
+
 def test_combat_system_basic_battle():
     """Test basic combat functionality"""
     char = character_manager.create_character("CombatTest", "Warrior")
@@ -204,6 +719,366 @@ def test_combat_system_basic_battle():
     assert battle.character == char
     assert battle.enemy == enemy
 
+def test_headless_battle_policies(capsys):
+    """Test that battles run to the end without input or output"""
+    import random
+
+    char = character_manager.create_character("HeadlessTest", "Warrior")
+    goblin = combat_system.create_enemy("goblin")
+
+    # Warrior hits a goblin for 15 - 5 // 4 = 14: dead on the third round
+    battle = combat_system.SimpleBattle(char, goblin)
+    result = battle.run(combat_system.AttackPolicy())
+    assert result == {'winner': 'player', 'xp_gained': goblin['xp_reward'],
+                      'gold_gained': goblin['gold_reward'], 'turns': 3}
+    assert goblin['health'] == 0
+    assert char['health'] == char['max_health'] - 2 * 2
+    assert not battle.combat_active
+    assert capsys.readouterr().out == ""
+
+    # simulate_battle leaves its inputs alone and is reproducible with a seeded policy
+    orc = combat_system.create_enemy("orc")
+    mage = character_manager.create_character("SimTest", "Mage")
+    first = combat_system.simulate_battle(mage, orc, combat_system.RandomPolicy(random.Random(7), 0.5))
+    again = combat_system.simulate_battle(mage, orc, combat_system.RandomPolicy(random.Random(7), 0.5))
+    assert first == again
+    assert orc['health'] == orc['max_health'] and mage['health'] == mage['max_health']
+
+    # A Mage (magic 20) out-magics an orc's strength (12), so running away works
+    fled = combat_system.simulate_battle(mage, orc, combat_system.RandomPolicy(special_chance=0, flee_chance=1))
+    assert fled['winner'] == 'none' and fled['turns'] == 1
+
+def test_battle_combatants_write_back():
+    """Test that battles fight on Combatants and copy health back at the end"""
+    char = character_manager.create_character("SlotTest", "Mage")
+    orc = combat_system.create_enemy("orc")
+    battle = combat_system.SimpleBattle(char, orc)
+
+    fighter = battle.player
+    assert not hasattr(fighter, '__dict__')
+    assert (fighter['class'], fighter['strength'], fighter.get('gold')) == ('Mage', char['strength'], char['gold'])
+    with pytest.raises(KeyError):
+        fighter['gold'] = 0
+
+    # A fireball is worked out on the Combatant and only lands in the dict afterwards
+    combat_system.use_special_ability(fighter, battle.foe)
+    assert battle.foe.health == orc['max_health'] - 2 * char['magic'] and orc['health'] == orc['max_health']
+    battle.run(combat_system.AttackPolicy())
+    assert orc['health'] == battle.foe.health == 0
+    assert char['health'] == battle.player.health
+
+def test_predict_battle_matches_simulation():
+    """Test that the closed-form prediction agrees with fought battles"""
+    import random
+    import battle_simulator
+
+    class SpecialPolicy:
+        def choose_action(self, battle):
+            return combat_system.ACTION_SPECIAL if battle.special_ready() else combat_system.ACTION_ATTACK
+
+    for character_class in ("Warrior", "Mage", "Rogue"):
+        char = character_manager.create_character("PredictTest", character_class)
+        for enemy_type in ("goblin", "orc", "dragon"):
+            enemy = combat_system.create_enemy(enemy_type)
+            for max_turns in (1000, 2):
+                predicted = combat_system.predict_battle(char, enemy, max_turns=max_turns)
+                fought = combat_system.simulate_battle(char, enemy, max_turns=max_turns)
+                assert {key: predicted[key] for key in fought} == fought
+                if combat_system.can_predict_special(character_class):
+                    predicted = combat_system.predict_battle(char, enemy, True, max_turns)
+                    fought = combat_system.simulate_battle(char, enemy, SpecialPolicy(), max_turns)
+                    assert {key: predicted[key] for key in fought} == fought
+
+    with pytest.raises(ValueError):
+        combat_system.predict_battle(char, enemy, use_special=True)
+
+    # A fixed-damage special that also burns can't be predicted, so the
+    # simulator fights those battles instead
+    abilities = game_data.load_abilities("data/abilities.txt")
+    abilities['fireball']['effect'] = "burn:5:2"
+    try:
+        combat_system.load_ability_registry(abilities)
+        assert not combat_system.can_predict_special("Mage")
+        mage = character_manager.create_character("BurnTest", "Mage")
+        with pytest.raises(ValueError):
+            combat_system.predict_battle(mage, enemy, use_special=True)
+        outcomes, turns, _ = battle_simulator.fight_battles(mage, enemy, 3, random.Random(0), special_chance=1)
+        fought = combat_system.simulate_battle(mage, enemy, SpecialPolicy())
+        assert outcomes[fought['winner']] == 3
+    finally:
+        combat_system.load_ability_registry()
+
+    # The simulator's fast path reports every battle the same way
+    result = battle_simulator.simulate_combination("Warrior", 2, "orc", 40, special_chance=0)
+    char = character_manager.create_character("SimWarrior", "Warrior")
+    character_manager.gain_experience(char, 100)
+    fought = combat_system.simulate_battle(char, combat_system.create_enemy("orc"))
+    assert result['wins'] == 40 and result['turns'] == {fought['turns']: 40}
+
+def test_battle_log_ring_buffer(capsys):
+    """Test that the battle log keeps the last events and formats them on demand"""
+    import battle_log
+
+    char = character_manager.create_character("LogTest", "Warrior")
+    goblin = combat_system.create_enemy("goblin")
+
+    # Warrior kills a goblin on round 3: appear, 3 attacks, 2 enemy attacks, victory
+    log = battle_log.BattleLog(capacity=4)
+    combat_system.simulate_battle(char, goblin, log=log)
+    assert len(log) == 4
+    assert log.events(1) == [(3, battle_log.ACTOR_PLAYER, battle_log.EVENT_VICTORY, None)]
+    assert log.messages(2) == ["LogTest attacks for 14 damage.", "The Goblin has been defeated!"]
+
+    results = battle_log.BattleLog(verbosity=battle_log.LOG_RESULTS)
+    combat_system.simulate_battle(char, goblin, log=results)
+    assert [event[2] for event in results] == [battle_log.EVENT_APPEAR, battle_log.EVENT_VICTORY]
+    assert capsys.readouterr().out == ""
+
+    # A battle that goes wrong dumps its last events
+    class BrokenPolicy:
+        def choose_action(self, battle):
+            if battle.turn_counter == 2:
+                return "dance"
+            return combat_system.ACTION_ATTACK
+
+    log = battle_log.BattleLog(dump_on_error=2)
+    with pytest.raises(ValueError):
+        combat_system.simulate_battle(char, goblin, BrokenPolicy(), log=log)
+    assert capsys.readouterr().err.splitlines() == [
+        "[turn 1] LogTest attacks for 14 damage.", "[turn 1] The Goblin attacks you for 2 damage!"]
+
+def test_special_ability_cooldowns():
+    """Test that specials wait out the cooldown from data/abilities.txt"""
+    from cooldowns import CooldownScheduler
+    from custom_exceptions import AbilityOnCooldownError
+
+    abilities = game_data.load_abilities("data/abilities.txt")
+    cooldown = abilities['power_strike']['cooldown']
+    assert combat_system.get_class_ability("Warrior")['cooldown'] == cooldown
+
+    battle = combat_system.SimpleBattle(character_manager.create_character("CooldownTest", "Warrior"),
+                                        combat_system.create_enemy("dragon"))
+    combat_system.use_special_ability(battle.player, battle.foe, battle.cooldowns)
+    for turn in range(1, cooldown + 1):
+        battle.cooldowns.advance()
+        assert not battle.special_ready() and battle.special_turns_left() == cooldown + 1 - turn
+        with pytest.raises(AbilityOnCooldownError):
+            combat_system.use_special_ability(battle.player, battle.foe, battle.cooldowns)
+    battle.cooldowns.advance()
+    assert battle.special_ready()
+
+    # Advancing only pops what has expired, including for many owners at once
+    scheduler = CooldownScheduler()
+    for owner in range(100):
+        scheduler.start(owner, "heal", owner % 5)
+    assert len(scheduler) == 80
+    assert sorted(scheduler.advance(3)) == [(owner, "heal") for owner in range(100) if owner % 5 in (1, 2)]
+    assert scheduler.is_ready(1, "heal") and not scheduler.is_ready(4, "heal")
+
+    # A restarted cooldown leaves a stale heap entry that advance skips
+    scheduler.start(4, "heal", 10)
+    assert sorted(scheduler.advance(5)) == [(owner, "heal") for owner in range(3, 100) if owner % 5 in (3, 4) and owner != 4]
+    assert scheduler.remaining(4, "heal") == 9 and len(scheduler) == 1
+
+def test_status_effects_tick_and_expire():
+    """Test that effects tick once a turn and leave the timing wheel on time"""
+    from status_effects import StatusEffects
+
+    effects = StatusEffects(wheel_size=4)
+    hero = {'name': 'Hero', 'health': 50, 'max_health': 60}
+    foe = {'name': 'Foe', 'health': 100, 'max_health': 100}
+
+    effects.apply_from(hero, foe, ("poison", 3, 2))
+    effects.apply_from(hero, foe, ("regen", 4, 10))   # longer than the wheel
+    assert effects.effects_on(foe) == {'poison': 2} and effects.has(hero, 'regen')
+
+    for _ in range(2):
+        effects.tick()
+    assert foe['health'] == 94 and not effects.has(foe, 'poison')
+    assert hero['health'] == 58 and effects.remaining(hero, 'regen') == 8
+
+    # Reapplying replaces the old effect; regen never goes past max_health
+    effects.apply(hero, 'regen', 4, 1)
+    assert effects.tick() == [(hero, 'regen', 2)] and hero['health'] == 60
+    assert len(effects) == 0
+    for _ in range(8):
+        assert effects.tick() == []
+
+def test_status_effects_in_battle():
+    """Test status effects from abilities and items during a battle"""
+    import battle_log
+    from custom_exceptions import CombatNotActiveError
+
+    items = game_data.load_items("data/items.txt")
+    poison = combat_system.get_class_ability("Rogue")['status_effect']
+    assert poison[0] == 'poison'
+
+    # The Rogue's special poisons the enemy, which ticks at the start of turns
+    rogue = character_manager.create_character("PoisonTest", "Rogue")
+    log = battle_log.BattleLog(capacity=256)
+    dragon = combat_system.create_enemy("dragon")
+    combat_system.simulate_battle(rogue, dragon, combat_system.RandomPolicy(special_chance=1), log=log, max_turns=2)
+    ticks = [event for event in log.events() if event[2] == battle_log.EVENT_STATUS_DAMAGE]
+    assert ticks == [(2, battle_log.ACTOR_ENEMY, battle_log.EVENT_STATUS_DAMAGE, ('poison', poison[1]))]
+    assert "The Dragon takes 3 poison damage." in log.messages()
+
+    # Status items only work in battle, where they go on the right combatant
+    warrior = character_manager.create_character("ItemTest", "Warrior")
+    for item_id in ["fire_flask", "regen_potion"]:
+        inventory_system.add_item_to_inventory(warrior, item_id)
+    with pytest.raises(CombatNotActiveError):
+        inventory_system.use_item(warrior, "fire_flask", items['fire_flask'])
+
+    class ItemPolicy:
+        def choose_action(self, battle):
+            for item_id in ["fire_flask", "regen_potion"]:
+                if item_id in warrior['inventory']:
+                    battle.selected_item = (item_id, items[item_id])
+                    return combat_system.ACTION_ITEM
+            return combat_system.ACTION_ATTACK
+
+    orc = combat_system.create_enemy("orc")
+    battle = combat_system.SimpleBattle(warrior, orc)
+    result = battle.run(ItemPolicy(), max_turns=2)
+    assert result['winner'] == 'none' and len(warrior['inventory']) == 0
+    assert orc['health'] == orc['max_health'] - 6   # one burn tick
+    assert battle.status_effects.effects_on(battle.foe) == {'burn': 2}
+    assert battle.status_effects.effects_on(battle.player) == {'regen': 4}
+
+    # A tick on the turn the player escapes still counts
+    class FleePolicy:
+        def choose_action(self, battle):
+            return combat_system.ACTION_FLEE
+
+    mage = character_manager.create_character("FleeTest", "Mage")
+    goblin = combat_system.create_enemy("goblin")
+    battle = combat_system.SimpleBattle(mage, goblin)
+    battle.status_effects.apply(battle.foe, "poison", 3, 3)
+    battle.player_turn(FleePolicy())
+    assert not battle.combat_active and goblin['health'] == goblin['max_health'] - 3
+
+def test_stat_items_in_battle_are_kept():
+    """Test that items used in battle change the character, not just the battle"""
+    items = game_data.load_items("data/items.txt")
+    warrior = character_manager.create_character("ElixirTest", "Warrior")
+    strength = warrior['strength']
+    inventory_system.add_item_to_inventory(warrior, "strength_elixir")
+
+    class ElixirPolicy:
+        def choose_action(self, battle):
+            if "strength_elixir" in warrior['inventory']:
+                battle.selected_item = ("strength_elixir", items['strength_elixir'])
+                return combat_system.ACTION_ITEM
+            return combat_system.ACTION_ATTACK
+
+    battle = combat_system.SimpleBattle(warrior, combat_system.create_enemy("goblin"))
+    assert battle.run(ElixirPolicy())['winner'] == 'player'
+    assert warrior['strength'] == strength + 3
+
+    # Once the battle is over, items go straight to the character
+    warrior['health'] = 50
+    inventory_system.add_item_to_inventory(warrior, "health_potion")
+    inventory_system.use_item(warrior, "health_potion", items['health_potion'], battle)
+    assert warrior['health'] == 70 and "health_potion" not in warrior['inventory']
+
+def test_cleric_heal_and_draw():
+    """Test the Cleric heal and that endless battles end in a draw"""
+    cleric = character_manager.create_character("HealTest", "Cleric")
+    cleric['health'] = cleric['max_health'] - 10
+    assert "10" in combat_system.cleric_heal(cleric)
+    assert cleric['health'] == cleric['max_health']
+
+    # Healing 30 every 4 rounds outpaces a goblin's 3 a round, so against
+    # one that can't be killed in time only max_turns ends it
+    healer = combat_system.RandomPolicy(special_chance=1)
+    goblin = combat_system.create_enemy("goblin")
+    goblin['health'] = 10 ** 6
+    result = combat_system.simulate_battle(cleric, goblin, healer, max_turns=50)
+    assert result['winner'] == 'none' and result['turns'] == 50
+
+def test_battle_simulator_reproducible_and_exported(tmp_path):
+    """Test that simulation results don't depend on the worker count and export to CSV"""
+    import csv
+    import battle_simulator
+
+    kwargs = dict(levels=[1, 3], classes=("Warrior", "Cleric"), enemies=("goblin", "orc"), seed=11)
+    in_process = battle_simulator.run_simulation(200, max_workers=1, **kwargs)
+    pooled = battle_simulator.run_simulation(200, max_workers=2, **kwargs)
+    assert in_process == pooled
+    assert [(r['class'], r['level'], r['enemy']) for r in in_process][:3] == [
+        ('Warrior', 1, 'goblin'), ('Warrior', 1, 'orc'), ('Warrior', 3, 'goblin')]
+
+    for result in in_process:
+        assert result['wins'] + result['losses'] + result['draws'] == 200
+        assert sum(result['turns'].values()) == result['wins']
+
+    path = tmp_path / "balance.csv"
+    assert battle_simulator.export_csv(in_process, str(path)) == 8
+    rows = list(csv.DictReader(path.open()))
+    assert rows[0]['class'] == 'Warrior' and float(rows[0]['win_rate']) == in_process[0]['win_rate']
+
+def test_balance_tuner_prunes_and_reports():
+    """Test that tuning screens every candidate, prunes most and reports sensitivity"""
+    import balance_tuner
+
+    space = {"Mage.health": [40, 80, 120], "dragon.strength": [15, 25]}
+    targets = ((range(1, 3), "goblin", 0.9), (range(6, 8), "dragon", 0.5))
+    kwargs = dict(battles=20, targets=targets, screening_battles=10, keep_fraction=0.3, top=2, seed=4)
+    tuning = balance_tuner.tune(space, max_workers=1, **kwargs)
+    assert tuning == balance_tuner.tune(space, max_workers=2, **kwargs)
+
+    assert tuning['screened'] == 6 and tuning['pruned'] == 4
+    best = tuning['best']
+    assert len(best) == 2 and best[0]['score'] <= best[1]['score']
+    assert set(best[0]['win_rates']) == {(c, e) for c in character_manager.CLASS_BASE_STATS for e in ("goblin", "dragon")}
+    assert {row['parameter'] for row in tuning['sensitivity']} == set(space)
+
+    # Overrides don't leak into the game's own tables
+    assert character_manager.CLASS_BASE_STATS['Mage']['health'] == 80
+    assert combat_system.create_enemy("dragon")['strength'] == 25
+
+    with pytest.raises(ValueError):
+        balance_tuner.tune({"Bard.health": [1]})
+    with pytest.raises(ValueError):
+        balance_tuner.tune({"orc.gold_reward": [1]})
+
+def test_batch_battles_match_simple_battle():
+    """Test that the batch resolver gives the same results as SimpleBattle with basic attacks"""
+    np = pytest.importorskip("numpy")
+    import batch_combat
+    from custom_exceptions import CharacterDeadError
+
+    rng = np.random.default_rng(2)
+    n = 500
+    stats = (rng.integers(1, 200, n), rng.integers(0, 40, n), rng.integers(1, 200, n), rng.integers(0, 40, n))
+    for max_turns in (1000, 4):
+        result = batch_combat.resolve_battles(*stats, max_turns=max_turns)
+        for i in range(n):
+            player = {'name': "P", 'health': int(stats[0][i]), 'strength': int(stats[1][i])}
+            enemy = {'name': "E", 'health': int(stats[2][i]), 'strength': int(stats[3][i])}
+            expected = combat_system.SimpleBattle(player, enemy).run(combat_system.AttackPolicy(), max_turns=max_turns)
+            assert batch_combat.WINNER_NAMES[result['winner'][i]] == expected['winner']
+            assert result['turns'][i] == expected['turns']
+            assert (result['player_health'][i], result['enemy_health'][i]) == (player['health'], enemy['health'])
+
+    # One round takes exactly attack_damage off each side
+    strength = np.arange(0, 60)
+    player_strength, enemy_strength = np.repeat(strength, 60), np.tile(strength, 60)
+    health = np.full(len(player_strength), 1000)
+    result = batch_combat.resolve_battles(health, player_strength, health, enemy_strength, max_turns=1)
+    for i in range(len(health)):
+        p, e = int(player_strength[i]), int(enemy_strength[i])
+        assert 1000 - result['enemy_health'][i] == combat_system.attack_damage(p, e)
+        assert 1000 - result['player_health'][i] == combat_system.attack_damage(e, p)
+
+    chars = [character_manager.create_character("BatchTest", "Warrior")]
+    result = batch_combat.resolve_character_battles(chars, [combat_system.create_enemy("goblin")])
+    assert result['winner'].tolist() == [batch_combat.WINNER_PLAYER] and result['turns'].tolist() == [3]
+
+    chars[0]['health'] = 0
+    with pytest.raises(CharacterDeadError):
+        batch_combat.resolve_character_battles(chars, [combat_system.create_enemy("goblin")])
+
 def test_combat_victory_rewards():
     """Test that winning combat grants rewards"""
     char = character_manager.create_character("RewardTest", "Mage")